@@ -0,0 +1,254 @@
+"""
+Local stand-in for the Cloudflare Pages deployments API.
+
+Serves the listing and delete endpoints from an in-memory project with a
+configurable per-request latency, over HTTP/1.1 or plain-text HTTP/2 (h2c with
+prior knowledge). It counts connections and peak in-flight requests so
+transports can be compared without network access. HTTP/2 needs the ``h2``
+package.
+
+    api = StandinAPI(deployments=200, latency=0.02)
+    with StandinServer(api, protocol="h2c") as server:
+        deleter = CloudflareDeploymentDeleter(..., base_url=server.base_url)
+"""
+
+import asyncio
+import json
+import re
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+# Bound at import so callers that patch time.sleep to skip the deleter's pacing
+# still get the simulated latency
+from time import sleep
+
+DEPLOYMENTS_PATH = re.compile(r"^/client/v4/accounts/[^/]+/pages/projects/[^/]+/deployments(?:/(?P<id>[^/]+))?$")
+
+
+class StandinAPI:
+    """In-memory Pages project that answers listing and delete requests."""
+
+    def __init__(self, deployments: int = 100, latency: float = 0.02):
+        self.latency = latency
+        self.deployments: List[Dict] = [
+            {
+                "id": f"deployment{index:06d}",
+                "environment": "production" if index % 10 == 0 else "preview",
+                "created_on": f"2024-01-01T00:00:{index % 60:02d}.{index:06d}Z",
+                "aliases": None,
+            }
+            for index in range(deployments, 0, -1)
+        ]
+        self.requests = 0
+        self.connections = 0
+        self.peak_in_flight = 0
+        self._in_flight = 0
+        self._lock = threading.Lock()
+
+    def connection_opened(self):
+        with self._lock:
+            self.connections += 1
+
+    def begin(self):
+        with self._lock:
+            self.requests += 1
+            self._in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self._in_flight)
+
+    def end(self):
+        with self._lock:
+            self._in_flight -= 1
+
+    def handle(self, method: str, target: str) -> Tuple[int, bytes]:
+        """Return the status and JSON body for a request."""
+        parts = urlsplit(target)
+        match = DEPLOYMENTS_PATH.match(parts.path)
+        if not match:
+            return 404, json.dumps({"success": False, "errors": [{"code": 7003, "message": "No route"}]}).encode()
+
+        deployment_id = match.group("id")
+        with self._lock:
+            if method == "GET" and deployment_id is None:
+                query = parse_qs(parts.query)
+                page = int(query.get("page", ["1"])[0])
+                per_page = int(query.get("per_page", ["25"])[0])
+                env = query.get("env", [None])[0]
+                listed = [d for d in self.deployments if env is None or d["environment"] == env]
+                total_pages = max(1, -(-len(listed) // per_page))
+                result = listed[(page - 1) * per_page:page * per_page]
+                body = {
+                    "success": True,
+                    "result": result,
+                    "result_info": {
+                        "page": page, "per_page": per_page,
+                        "count": len(result), "total_count": len(listed), "total_pages": total_pages,
+                    },
+                }
+                return 200, json.dumps(body).encode()
+
+            if method == "DELETE" and deployment_id is not None:
+                before = len(self.deployments)
+                self.deployments = [d for d in self.deployments if d["id"] != deployment_id]
+                if len(self.deployments) == before:
+                    return 404, json.dumps({"success": False, "errors": [{"code": 8000009, "message": "Not found"}]}).encode()
+                return 200, json.dumps({"success": True, "result": None}).encode()
+
+        return 405, json.dumps({"success": False, "errors": [{"code": 10405, "message": "Method not allowed"}]}).encode()
+
+
+class StandinServer:
+    """Run a ``StandinAPI`` on a local port over HTTP/1.1 or h2c."""
+
+    def __init__(self, api: StandinAPI, protocol: str = "http1", host: str = "127.0.0.1"):
+        if protocol not in ("http1", "h2c"):
+            raise ValueError("protocol must be 'http1' or 'h2c'")
+        self.api = api
+        self.protocol = protocol
+        self.host = host
+        self.port: Optional[int] = None
+        self._thread: Optional[threading.Thread] = None
+        self._http1: Optional[ThreadingHTTPServer] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._h2_server = None
+
+    @property
+    def base_url(self) -> str:
+        return f"http://{self.host}:{self.port}/client/v4"
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+    def start(self):
+        if self.protocol == "http1":
+            self._start_http1()
+        else:
+            self._start_h2c()
+
+    def stop(self):
+        if self._http1:
+            self._http1.shutdown()
+            self._http1.server_close()
+        if self._loop:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join()
+
+    def _start_http1(self):
+        api = self.api
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            # Headers and body are written separately; without this, delayed ACKs add ~40ms per request
+            disable_nagle_algorithm = True
+
+            def setup(self):
+                super().setup()
+                api.connection_opened()
+
+            def _respond(self):
+                api.begin()
+                try:
+                    sleep(api.latency)
+                    status, body = api.handle(self.command, self.path)
+                finally:
+                    api.end()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            do_GET = _respond
+            do_DELETE = _respond
+
+            def log_message(self, format, *args):
+                pass
+
+        self._http1 = ThreadingHTTPServer((self.host, 0), Handler)
+        self._http1.daemon_threads = True
+        self.port = self._http1.server_address[1]
+        self._thread = threading.Thread(target=self._http1.serve_forever, daemon=True)
+        self._thread.start()
+
+    def _start_h2c(self):
+        import h2.config  # noqa: F401 - fail early if h2 is missing
+
+        ready = threading.Event()
+
+        def run_loop():
+            self._loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(self._loop)
+            self._h2_server = self._loop.run_until_complete(
+                asyncio.start_server(self._serve_h2_connection, self.host, 0)
+            )
+            self.port = self._h2_server.sockets[0].getsockname()[1]
+            ready.set()
+            self._loop.run_forever()
+            self._h2_server.close()
+            pending = asyncio.all_tasks(self._loop)
+            for task in pending:
+                task.cancel()
+            self._loop.run_until_complete(asyncio.gather(*pending, return_exceptions=True))
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run_loop, daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    async def _serve_h2_connection(self, reader, writer):
+        import h2.config
+        import h2.connection
+        import h2.events
+
+        api = self.api
+        api.connection_opened()
+        conn = h2.connection.H2Connection(h2.config.H2Configuration(client_side=False, header_encoding="utf-8"))
+        conn.initiate_connection()
+        writer.write(conn.data_to_send())
+        requests = {}
+
+        async def respond(stream_id, headers):
+            api.begin()
+            try:
+                await asyncio.sleep(api.latency)
+                status, body = api.handle(headers[":method"], headers[":path"])
+            finally:
+                api.end()
+            conn.send_headers(stream_id, [
+                (":status", str(status)),
+                ("content-type", "application/json"),
+                ("content-length", str(len(body))),
+            ])
+            chunk = conn.max_outbound_frame_size
+            for offset in range(0, len(body), chunk):
+                conn.send_data(stream_id, body[offset:offset + chunk])
+            conn.end_stream(stream_id)
+            writer.write(conn.data_to_send())
+            await writer.drain()
+
+        try:
+            while True:
+                data = await reader.read(65535)
+                if not data:
+                    break
+                for event in conn.receive_data(data):
+                    if isinstance(event, h2.events.RequestReceived):
+                        requests[event.stream_id] = dict(event.headers)
+                    elif isinstance(event, h2.events.DataReceived):
+                        conn.acknowledge_received_data(event.flow_controlled_length, event.stream_id)
+                    elif isinstance(event, h2.events.StreamEnded):
+                        asyncio.ensure_future(respond(event.stream_id, requests.pop(event.stream_id)))
+                    elif isinstance(event, h2.events.ConnectionTerminated):
+                        return
+                writer.write(conn.data_to_send())
+                await writer.drain()
+        except asyncio.CancelledError:
+            # The server is shutting down
+            pass
+        finally:
+            writer.close()
@@ -0,0 +1,109 @@
+#!/usr/bin/env python3
+"""
+Startup-time benchmark for the command-line entry points.
+
+Measures, over several fresh interpreters:
+
+- wall time of ``delete_deployments.py --version``, ``--help`` and a run that
+  fails argument validation
+- in-process import latency of ``deleter.src.delete_deployments``
+- argument-parsing latency of ``build_parser().parse_args()``
+
+and reports whether ``requests`` was loaded along the way, which it shouldn't be.
+
+Usage:
+    python benchmarks/startup.py [--repeat N] [--json]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import time
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+WRAPPER = os.path.join(ROOT_DIR, "delete_deployments.py")
+
+# Runs inside a fresh interpreter and prints its own timings as JSON
+IN_PROCESS_PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import deleter.src.delete_deployments as module
+imported = time.perf_counter()
+module.build_parser().parse_args(["--account-id", "acc", "--project-name", "proj", "--dry-run"])
+parsed = time.perf_counter()
+print(json.dumps({
+    "import_ms": (imported - started) * 1000,
+    "parse_ms": (parsed - imported) * 1000,
+    "requests_loaded": "requests" in sys.modules,
+}))
+"""
+
+
+def clean_env():
+    """Environment without Cloudflare settings so validation fails fast."""
+    env = {key: value for key, value in os.environ.items() if not key.startswith(("CF_", "CLOUDFLARE_"))}
+    env["PYTHONPATH"] = ROOT_DIR
+    return env
+
+
+def time_command(args, repeat):
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        subprocess.run(args, cwd=ROOT_DIR, env=clean_env(), stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+        timings.append((time.perf_counter() - started) * 1000)
+    return timings
+
+
+def summarize(timings):
+    ordered = sorted(timings)
+    return {
+        "median_ms": round(statistics.median(ordered), 2),
+        "p90_ms": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.9))], 2),
+        "min_ms": round(ordered[0], 2),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark CLI startup latency")
+    parser.add_argument("--repeat", type=int, default=20, help="Fresh interpreters per measurement (default: 20)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = {
+        "python_baseline": summarize(time_command([sys.executable, "-c", "pass"], args.repeat)),
+        "cli_version": summarize(time_command([sys.executable, WRAPPER, "--version"], args.repeat)),
+        "cli_help": summarize(time_command([sys.executable, WRAPPER, "--help"], args.repeat)),
+        "cli_validation_error": summarize(
+            time_command([sys.executable, WRAPPER, "--env-file", os.devnull], args.repeat)
+        ),
+    }
+
+    probes = []
+    for _ in range(args.repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", IN_PROCESS_PROBE], cwd=ROOT_DIR, env=clean_env(),
+            capture_output=True, text=True, check=True,
+        ).stdout
+        probes.append(json.loads(output))
+    results["module_import"] = summarize([probe["import_ms"] for probe in probes])
+    results["argument_parsing"] = summarize([probe["parse_ms"] for probe in probes])
+    results["requests_loaded_at_startup"] = any(probe["requests_loaded"] for probe in probes)
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    for name, value in results.items():
+        if isinstance(value, dict):
+            print(f"{name:<28} median {value['median_ms']:>8.2f} ms   p90 {value['p90_ms']:>8.2f} ms   "
+                  f"min {value['min_ms']:>8.2f} ms")
+        else:
+            print(f"{name:<28} {value}")
+
+
+if __name__ == "__main__":
+    main()
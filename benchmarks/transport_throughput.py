@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Throughput benchmark for the HTTP transports.
+
+Runs a full listing and delete pass against a local stand-in API
+(``benchmarks/standin_server.py``) for each transport and concurrency level,
+and reports wall time, deletions per second, connections opened and the peak
+number of requests the server saw in flight. The stand-in adds a fixed latency
+per request to mimic the round trip to the Cloudflare API.
+
+The HTTP/2 rows need ``httpx[http2]``; they are skipped when it is missing.
+
+Usage:
+    python benchmarks/transport_throughput.py [--deployments N] [--latency S] [--concurrency 1,8,32] [--json]
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from unittest.mock import patch
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if ROOT_DIR not in sys.path:
+    sys.path.insert(0, ROOT_DIR)
+
+from benchmarks.standin_server import StandinAPI, StandinServer  # noqa: E402
+from deleter.src.delete_deployments import CloudflareDeploymentDeleter  # noqa: E402
+from deleter.src.hooks import DeletionHooks  # noqa: E402
+from deleter.src.transport import create_transport  # noqa: E402
+
+PROTOCOLS = {"http1": "http1", "http2": "h2c"}
+
+
+def run_once(transport_name, concurrency, deployments, latency):
+    api = StandinAPI(deployments=deployments, latency=latency)
+    transport = create_transport(transport_name, concurrency=concurrency)
+    # The deleter's pacing sleeps would dominate the measurement; the stand-in latency replaces them
+    with StandinServer(api, protocol=PROTOCOLS[transport_name]) as server, \
+            patch("deleter.src.delete_deployments.time.sleep"):
+        deleter = CloudflareDeploymentDeleter(
+            account_id="bench-account",
+            project_name="bench-project",
+            api_token="bench-token",
+            hooks=DeletionHooks(),
+            concurrency=concurrency,
+            transport=transport,
+            base_url=server.base_url,
+        )
+        started = time.perf_counter()
+        report = deleter.run()
+        elapsed = time.perf_counter() - started
+        transport.close()
+
+    return {
+        "transport": transport_name,
+        "concurrency": concurrency,
+        "seconds": round(elapsed, 3),
+        "deletes_per_second": round(report.deleted_count / elapsed, 1),
+        "deleted": report.deleted_count,
+        "failed": report.failed_count,
+        "requests": api.requests,
+        "connections": api.connections,
+        "peak_in_flight": api.peak_in_flight,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare HTTP/1.1 and HTTP/2 deletion throughput")
+    parser.add_argument("--deployments", type=int, default=300, help="Deployments in the stand-in project (default: 300)")
+    parser.add_argument("--latency", type=float, default=0.05, help="Simulated per-request latency in seconds (default: 0.05)")
+    parser.add_argument("--concurrency", default="1,8,32", help="Comma-separated concurrency levels (default: 1,8,32)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    transports = ["http1"]
+    try:
+        create_transport("http2").close()
+        transports.append("http2")
+    except ValueError as e:
+        print(f"Skipping HTTP/2: {e}", file=sys.stderr)
+
+    results = [
+        run_once(name, int(level), args.deployments, args.latency)
+        for level in args.concurrency.split(",")
+        for name in transports
+    ]
+
+    if args.json:
+        print(json.dumps(results, indent=2))
+        return
+
+    print(f"{'transport':<10} {'conc':>5} {'seconds':>9} {'deletes/s':>10} {'conns':>6} {'in-flight':>10} {'failed':>7}")
+    for row in results:
+        print(f"{row['transport']:<10} {row['concurrency']:>5} {row['seconds']:>9.3f} {row['deletes_per_second']:>10.1f} "
+              f"{row['connections']:>6} {row['peak_in_flight']:>10} {row['failed']:>7}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,20 +1,25 @@
 #!/usr/bin/env python3
 import os
 import sys
-import argparse
+
+
+def main():
+    """Import and run the command-line entry point from the deleter package."""
+    try:
+        from deleter.src.delete_deployments import main as deleter_main
+    except ImportError as e:
+        print(f"Error: Could not import the delete_deployments module: {e}")
+        print("Make sure you're running this script from the project root directory.")
+        sys.exit(1)
+    deleter_main()
+
 
 def main_wrapper():
-    # Add the deleter directory to the Python path
-    deleter_dir = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'deleter')
-    src_dir = os.path.join(deleter_dir, 'src')
-    sys.path.insert(0, deleter_dir)
-    sys.path.insert(0, src_dir)
-    
-    # First check if there's an envfile in the current directory or parent
-    # and copy any arguments related to envfile location
-    root_envfile = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'envfile')
-    deleter_envfile = os.path.join(deleter_dir, 'envfile')
-    
+    # Make the deleter package importable when running from a checkout
+    root_dir = os.path.dirname(os.path.abspath(__file__))
+    if root_dir not in sys.path:
+        sys.path.insert(0, root_dir)
+
     # If we have args relating to env-file, adjust paths before passing to real script
     new_args = []
     i = 0
@@ -29,30 +34,11 @@ def main_wrapper():
         else:
             new_args.append(sys.argv[i])
             i += 1
-    
+
     # Replace sys.argv with our potentially modified arguments
     sys.argv = new_args
-    
-    # Import and run the main function from the implementation
-    try:
-        # Try from deleter.src module (preferred path)
-        from deleter.src.delete_deployments import main
-        main()
-    except ImportError as e:
-        try:
-            # Try with direct src import
-            sys.path.insert(0, src_dir)
-            from delete_deployments import main as src_main
-            src_main()
-        except ImportError:
-            try:
-                # Legacy path for backward compatibility
-                from deleter.delete_deployments import main
-                main()
-            except ImportError:
-                print(f"Error: Could not import the delete_deployments module: {e}")
-                print("Make sure you're running this script from the project root directory.")
-                sys.exit(1)
+
+    main()
 
 if __name__ == "__main__":
-    main_wrapper() 
\ No newline at end of file
+    main_wrapper()
\ No newline at end of file
@@ -2,10 +2,58 @@
 Cloudflare Pages Deployment Deleter
 
 Top-level package for the Cloudflare Pages deployment deletion utility.
+
+The library API is importable from here, e.g.::
+
+    from deleter import CloudflareDeploymentDeleter, DeletionHooks
+
+    report = CloudflareDeploymentDeleter(account_id, project, api_token=token,
+                                         hooks=DeletionHooks()).run()
 """
 
+import importlib
+
 # Import version from the src module
 try:
     from deleter.src import __version__
 except ImportError:
-    __version__ = '1.0.0'  # Default version if not importable 
\ No newline at end of file
+    __version__ = '1.0.0'  # Default version if not importable
+
+# Public names and the modules that define them, loaded on first access
+_LAZY_EXPORTS = {
+    "CloudflareDeploymentDeleter": "deleter.src.delete_deployments",
+    "DeletionReport": "deleter.src.report",
+    "DeploymentOutcome": "deleter.src.report",
+    "DeletionEstimate": "deleter.src.report",
+    "VerificationResult": "deleter.src.report",
+    "DeletionHooks": "deleter.src.hooks",
+    "ConsoleHooks": "deleter.src.hooks",
+    "DeleterError": "deleter.src.errors",
+    "APIError": "deleter.src.errors",
+    "AuthenticationError": "deleter.src.errors",
+    "PermissionDeniedError": "deleter.src.errors",
+    "ProjectNotFoundError": "deleter.src.errors",
+    "RateLimitError": "deleter.src.errors",
+    "NetworkError": "deleter.src.errors",
+    "CircuitOpenError": "deleter.src.errors",
+    "CassetteError": "deleter.src.errors",
+    "RequestBudgetError": "deleter.src.errors",
+    "DeadlineExceededError": "deleter.src.errors",
+    "ResourceBackend": "deleter.src.backends",
+    "PagesBackend": "deleter.src.backends",
+    "WorkersBackend": "deleter.src.backends",
+    "RecordingTransport": "deleter.src.cassette",
+    "ReplayTransport": "deleter.src.cassette",
+    "EnvironmentPolicy": "deleter.src.environments",
+    "InventorySummary": "deleter.src.report",
+    "export_inventory": "deleter.src.export",
+    "open_writer": "deleter.src.export",
+    "RequestLedger": "deleter.src.accounting",
+    "Tracer": "deleter.src.tracing",
+}
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        return getattr(importlib.import_module(_LAZY_EXPORTS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
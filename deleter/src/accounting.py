@@ -0,0 +1,125 @@
+"""
+Request accounting and API-call budgets.
+
+Every request the deleter sends goes through a ``RequestLedger``, which counts
+it by endpoint, method and status and enforces two optional budgets:
+
+- ``max_requests``: a hard cap on requests over the ledger's lifetime. The
+  deletion scheduler reserves a request before it schedules a deletion, so the
+  run stops scheduling once the budget is used up instead of failing deletions
+  half way. Other requests, such as listing pages, claim from the same budget
+  when they are sent and raise ``RequestBudgetError`` if none is left.
+- ``window_requests`` per ``window`` seconds: a sliding-window throttle. A
+  request that would exceed it waits until the oldest request in the window
+  ages out, or raises ``DeadlineExceededError`` if that would be after the
+  caller's deadline.
+
+Share one ledger between deleters to put them under a common budget.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from typing import Callable, Dict, List, Optional, Tuple
+
+from .errors import DeadlineExceededError, RequestBudgetError
+
+# Status recorded for requests that got no response
+NO_RESPONSE = "error"
+
+
+class RequestLedger:
+    """Count API requests and enforce request budgets."""
+
+    def __init__(
+        self,
+        max_requests: Optional[int] = None,
+        window_requests: Optional[int] = None,
+        window: float = 300.0,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if max_requests is not None and max_requests < 0:
+            raise ValueError("max_requests cannot be negative")
+        if window_requests is not None and window_requests < 1:
+            raise ValueError("window_requests must be at least 1")
+        if window <= 0:
+            raise ValueError("window must be positive")
+        self.max_requests = max_requests
+        self.window_requests = window_requests
+        self.window = window
+        self._clock = clock
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._committed = 0
+        self._sent = deque()
+        self.counts: Counter = Counter()
+
+    @property
+    def total(self) -> int:
+        """Requests recorded so far."""
+        return sum(self.counts.values())
+
+    def remaining(self) -> Optional[int]:
+        """Requests left in the hard budget, counting reservations, or ``None`` without one."""
+        if self.max_requests is None:
+            return None
+        with self._lock:
+            return max(0, self.max_requests - self._committed)
+
+    def reserve(self) -> bool:
+        """Claim one request from the hard budget ahead of sending it; False if none is left."""
+        with self._lock:
+            if self.max_requests is not None and self._committed >= self.max_requests:
+                return False
+            self._committed += 1
+            return True
+
+    def acquire(self, reserved: bool = False, deadline: Optional[float] = None):
+        """Wait until a request may be sent.
+
+        Requests that were not ``reserved`` claim from the hard budget here and
+        raise ``RequestBudgetError`` when it is used up. Waiting past
+        ``deadline``, a time on the ledger's clock, raises
+        ``DeadlineExceededError`` instead.
+        """
+        if not reserved and not self.reserve():
+            raise RequestBudgetError(f"request budget of {self.max_requests} used up")
+
+        if self.window_requests is None:
+            return
+        while True:
+            with self._lock:
+                now = self._clock()
+                while self._sent and self._sent[0] <= now - self.window:
+                    self._sent.popleft()
+                if len(self._sent) < self.window_requests:
+                    self._sent.append(now)
+                    return
+                wait = self._sent[0] + self.window - now
+            if deadline is not None and now + wait > deadline:
+                raise DeadlineExceededError("deadline reached while waiting for the request window")
+            self._sleep(wait)
+
+    def record(self, endpoint: str, method: str, status):
+        """Count a finished request; ``status`` is the HTTP status or ``NO_RESPONSE``."""
+        with self._lock:
+            self.counts[(endpoint, method, str(status))] += 1
+
+    def snapshot(self) -> Counter:
+        """Copy of the counts, to measure the requests of one run with ``breakdown``."""
+        with self._lock:
+            return Counter(self.counts)
+
+    def breakdown(self, since: Optional[Counter] = None) -> List[Dict]:
+        """Request counts by endpoint, method and status, optionally only those after ``since``."""
+        counts = self.snapshot()
+        if since is not None:
+            counts.subtract(since)
+        rows: List[Tuple[Tuple[str, str, str], int]] = sorted(
+            (key, count) for key, count in counts.items() if count > 0
+        )
+        return [
+            {"endpoint": endpoint, "method": method, "status": status, "count": count}
+            for (endpoint, method, status), count in rows
+        ]
@@ -0,0 +1,126 @@
+"""
+Resource backends for the deletion engine.
+
+``CloudflareDeploymentDeleter`` does the listing, pacing, retries, circuit
+breaking and concurrency; a backend only knows where one kind of resource
+lives in the Cloudflare API and what its responses look like. Listing pages
+are normalised to the Pages response shape (``result`` holding a list of
+deployments with ``id`` and ``created_on``, and ``result_info.total_pages``)
+so everything downstream works the same for every backend.
+
+Backends:
+
+- ``pages``: deployments of a Pages project
+- ``workers``: deployments of a Workers script. The active (newest) deployment
+  cannot be deleted through the API, so it is never scheduled.
+"""
+
+from typing import Dict, List, Optional, Set, Union
+
+BACKENDS = ("pages", "workers")
+
+
+class ResourceBackend:
+    """Describe how to list and delete deployments of one resource type."""
+
+    name = "base"
+    # What the deleter's ``project_name`` refers to, used in messages
+    label = "resource"
+    # Token permissions needed, used in error messages
+    permissions = ""
+    # Whether listings can be filtered by environment
+    supports_environments = True
+
+    def list_path(self, account_id: str, resource: str) -> str:
+        """Path of the listing endpoint, relative to the API base URL."""
+        raise NotImplementedError
+
+    def list_params(self, page: int, per_page: int, env: Optional[str] = None) -> Dict:
+        """Query parameters for one listing page."""
+        return {}
+
+    def normalize_page(self, data: Dict) -> Dict:
+        """Convert a decoded listing response to the Pages response shape."""
+        return data
+
+    def delete_path(self, account_id: str, resource: str, deployment_id: str, force: bool = False) -> str:
+        """Path of the delete endpoint for one deployment, relative to the API base URL."""
+        raise NotImplementedError
+
+    def deployment_path(self, account_id: str, resource: str, deployment_id: str) -> str:
+        """Path for looking up one deployment, relative to the API base URL."""
+        return self.delete_path(account_id, resource, deployment_id)
+
+    def protected_ids(self, deployments: List[Dict]) -> Set[str]:
+        """IDs of deployments the API will refuse to delete, so they are never scheduled."""
+        return set()
+
+
+class PagesBackend(ResourceBackend):
+    """Deployments of a Cloudflare Pages project."""
+
+    name = "pages"
+    label = "project"
+    permissions = "Pages:Read and Pages:Edit"
+
+    def list_path(self, account_id, resource):
+        return f"/accounts/{account_id}/pages/projects/{resource}/deployments"
+
+    def list_params(self, page, per_page, env=None):
+        params = {
+            "page": page,
+            "per_page": min(per_page, 25)  # Cloudflare API limit is 25 per page for this endpoint
+        }
+        if env:
+            params["env"] = env
+        return params
+
+    def delete_path(self, account_id, resource, deployment_id, force=False):
+        path = f"/accounts/{account_id}/pages/projects/{resource}/deployments/{deployment_id}"
+        # Aliased deployments can only be deleted with force
+        return f"{path}?force=true" if force else path
+
+
+class WorkersBackend(ResourceBackend):
+    """Deployments of a Workers script.
+
+    The endpoint returns every deployment in one unpaginated response. Workers
+    deployments have no environment, so ``env`` cannot be used.
+    """
+
+    name = "workers"
+    label = "script"
+    permissions = "Workers Scripts:Read and Workers Scripts:Edit"
+    supports_environments = False
+
+    def list_path(self, account_id, resource):
+        return f"/accounts/{account_id}/workers/scripts/{resource}/deployments"
+
+    def normalize_page(self, data):
+        deployments = (data.get("result") or {}).get("deployments") or []
+        return {
+            **data,
+            "result": deployments,
+            "result_info": {"page": 1, "total_count": len(deployments), "total_pages": 1},
+        }
+
+    def delete_path(self, account_id, resource, deployment_id, force=False):
+        return f"/accounts/{account_id}/workers/scripts/{resource}/deployments/{deployment_id}"
+
+    def protected_ids(self, deployments):
+        if not deployments:
+            return set()
+        # The newest deployment is the one serving traffic
+        active = max(deployments, key=lambda deployment: deployment.get("created_on") or "")
+        return {active["id"]}
+
+
+def get_backend(backend: Union[str, ResourceBackend] = "pages") -> ResourceBackend:
+    """Return a backend instance for a name, or the backend itself."""
+    if isinstance(backend, ResourceBackend):
+        return backend
+    if backend == "pages":
+        return PagesBackend()
+    if backend == "workers":
+        return WorkersBackend()
+    raise ValueError(f"Unknown backend {backend!r}; expected one of {', '.join(BACKENDS)}")
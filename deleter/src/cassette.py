@@ -0,0 +1,160 @@
+"""
+Record and replay HTTP traffic for reproducible offline runs.
+
+``RecordingTransport`` wraps another transport and appends every request and
+response to a cassette file, one JSON object per line, along with how long the
+response took. Credentials are redacted before anything is written. Each line
+is written as soon as its response arrives, so an interrupted run still leaves
+a usable cassette.
+
+``ReplayTransport`` serves a cassette back without touching the network. Each
+request gets the next recorded response for the same method and URL, so page
+sizes, error mixes and retries replay as they happened even when deletions run
+in a different order. The recorded latency is reproduced, scaled by ``speed``.
+"""
+
+import json
+import threading
+import time
+from collections import defaultdict, deque
+from typing import Callable, Dict, List, Optional
+from urllib.parse import urlencode
+
+from .errors import CassetteError, NetworkError
+from .transport import Transport
+
+REDACTED = "REDACTED"
+# Request headers that carry credentials
+SENSITIVE_HEADERS = ("authorization", "x-auth-key", "x-auth-email")
+
+
+def request_key(method: str, url: str, params: Optional[Dict] = None) -> str:
+    """Identify a request by its method and full URL."""
+    if params:
+        url = f"{url}{'&' if '?' in url else '?'}{urlencode(params)}"
+    return f"{method.upper()} {url}"
+
+
+def redact_headers(headers: Optional[Dict]) -> Dict:
+    return {
+        name: REDACTED if name.lower() in SENSITIVE_HEADERS else value
+        for name, value in (headers or {}).items()
+    }
+
+
+def load_cassette(path: str) -> List[Dict]:
+    """Read the interactions recorded in a cassette file."""
+    with open(path) as f:
+        return [json.loads(line) for line in f if line.strip()]
+
+
+class CassetteResponse:
+    """Response rebuilt from a cassette, with the parts of the API the deleter uses."""
+
+    def __init__(self, status_code: int, text: str, headers: Optional[Dict] = None):
+        self.status_code = status_code
+        self.text = text
+        self.headers = headers or {}
+
+    @property
+    def content(self) -> bytes:
+        return self.text.encode()
+
+    def json(self):
+        return json.loads(self.text)
+
+
+class RecordingTransport(Transport):
+    """Pass requests through to another transport and record them to a cassette."""
+
+    def __init__(self, transport: Transport, path: str, clock: Callable[[], float] = time.monotonic):
+        self.transport = transport
+        self.name = transport.name
+        self.path = path
+        self._clock = clock
+        self._started = clock()
+        self._lock = threading.Lock()
+        self._file = open(path, "w")
+
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        started = self._clock()
+        interaction = {
+            "offset": round(started - self._started, 6),
+            "request": {
+                "method": method.upper(),
+                "url": request_key(method, url, params).split(" ", 1)[1],
+                "headers": redact_headers(headers),
+            },
+        }
+        try:
+            response = self.transport.request(method, url, headers=headers, params=params, timeout=timeout)
+        except NetworkError as e:
+            interaction["elapsed"] = round(self._clock() - started, 6)
+            interaction["error"] = str(e)
+            self._write(interaction)
+            raise
+
+        interaction["elapsed"] = round(self._clock() - started, 6)
+        interaction["response"] = {
+            "status_code": response.status_code,
+            "headers": {name: value for name, value in response.headers.items() if name.lower() != "set-cookie"},
+            "body": response.text,
+        }
+        self._write(interaction)
+        return response
+
+    def _write(self, interaction: Dict):
+        line = json.dumps(interaction)
+        with self._lock:
+            self._file.write(line + "\n")
+            self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if not self._file.closed:
+                self._file.close()
+        self.transport.close()
+
+
+class ReplayTransport(Transport):
+    """Answer requests from a cassette instead of the network.
+
+    ``speed`` scales the recorded latency: 2.0 replays twice as fast and 0
+    returns responses immediately.
+    """
+
+    name = "replay"
+
+    def __init__(self, path: str, speed: float = 1.0, sleep: Callable[[float], None] = time.sleep):
+        if speed < 0:
+            raise ValueError("Replay speed must not be negative")
+        self.path = path
+        self.speed = speed
+        self._sleep = sleep
+        self._lock = threading.Lock()
+        self._interactions = defaultdict(deque)
+        for interaction in load_cassette(path):
+            request = interaction["request"]
+            self._interactions[f"{request['method']} {request['url']}"].append(interaction)
+
+    def remaining(self) -> int:
+        """Number of recorded interactions not replayed yet."""
+        with self._lock:
+            return sum(len(queue) for queue in self._interactions.values())
+
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        key = request_key(method, url, params)
+        with self._lock:
+            queue = self._interactions.get(key)
+            if not queue:
+                raise CassetteError(f"No recorded response left in {self.path} for {key}")
+            interaction = queue.popleft()
+
+        if self.speed:
+            self._sleep(interaction.get("elapsed", 0) / self.speed)
+
+        if "error" in interaction:
+            raise NetworkError(interaction["error"])
+
+        response = interaction["response"]
+        return CassetteResponse(response["status_code"], response["body"], response.get("headers"))
@@ -0,0 +1,157 @@
+"""
+Circuit breaker for the Cloudflare API request paths.
+
+The breaker opens after too many consecutive failures or when the failure
+rate over a sliding window gets too high. While open, callers are paused
+until the cooldown elapses, after which a limited number of half-open probe
+requests decide whether to close the circuit again. After ``max_trips``
+failed recoveries in a row the failure is treated as persistent and every
+further request raises ``CircuitOpenError``. A successful recovery starts the
+count again, so separate outages never add up, and ``reset`` starts over
+after the breaker has given up.
+"""
+
+import threading
+import time
+from collections import deque
+from typing import Callable, Optional
+
+from .errors import CircuitOpenError, DeadlineExceededError
+
+
+class CircuitBreaker:
+    """Track request outcomes and pause or abort on persistent failure."""
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        failure_rate: float = 0.5,
+        window_size: int = 20,
+        min_calls: int = 10,
+        reset_timeout: float = 30.0,
+        half_open_max_calls: int = 1,
+        max_trips: int = 3,
+        clock: Callable[[], float] = time.monotonic,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        if failure_threshold < 1:
+            raise ValueError("failure_threshold must be at least 1")
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be between 0 and 1")
+
+        self.failure_threshold = failure_threshold
+        self.failure_rate = failure_rate
+        self.window_size = window_size
+        self.min_calls = min_calls
+        self.reset_timeout = reset_timeout
+        self.half_open_max_calls = half_open_max_calls
+        self.max_trips = max_trips
+        self._clock = clock
+        self._sleep = sleep
+
+        self._lock = threading.Lock()
+        self._window = deque(maxlen=window_size)
+        self.reset()
+
+    def reset(self):
+        """Close the circuit and forget earlier failures, including having given up.
+
+        Long-running callers reset the breaker before each run, so one outage
+        does not block every later run.
+        """
+        with self._lock:
+            self._window.clear()
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+            self.trips = 0
+            self.exhausted = False
+            self._opened_at = 0.0
+            self._half_open_in_flight = 0
+            self.last_reason: Optional[str] = None
+
+    def before_request(self, deadline: Optional[float] = None):
+        """Block until a request may be sent.
+
+        Sleeps while the circuit is open and raises ``CircuitOpenError`` once
+        the breaker has decided the failure is not transient. Raises
+        ``DeadlineExceededError`` if the circuit is still open at ``deadline``,
+        a time on the breaker's clock.
+        """
+        while True:
+            with self._lock:
+                if self.exhausted:
+                    raise CircuitOpenError(self._give_up_message())
+
+                if self.state == self.CLOSED:
+                    return
+
+                if self.state == self.OPEN:
+                    remaining = self._opened_at + self.reset_timeout - self._clock()
+                    if remaining <= 0:
+                        self.state = self.HALF_OPEN
+                        self._half_open_in_flight = 0
+                        continue
+                else:
+                    if self._half_open_in_flight < self.half_open_max_calls:
+                        self._half_open_in_flight += 1
+                        return
+                    # Another caller is probing; check back shortly
+                    remaining = min(1.0, self.reset_timeout) or 0.1
+
+                if deadline is not None:
+                    if self._clock() >= deadline:
+                        raise DeadlineExceededError("deadline reached while the circuit breaker was open")
+                    remaining = min(remaining, deadline - self._clock())
+
+            self._sleep(remaining)
+
+    def record_success(self):
+        """Record a successful request."""
+        with self._lock:
+            self._window.append(True)
+            self.consecutive_failures = 0
+            if self.state == self.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self.state = self.CLOSED
+                self._window.clear()
+                # Recovered; only failed recoveries in a row count towards giving up
+                self.trips = 0
+
+    def record_failure(self, reason: Optional[str] = None):
+        """Record a failed request and open the circuit if needed."""
+        with self._lock:
+            self._window.append(False)
+            self.consecutive_failures += 1
+            if reason:
+                self.last_reason = reason
+
+            if self.state == self.HALF_OPEN:
+                self._half_open_in_flight = max(0, self._half_open_in_flight - 1)
+                self._trip()
+            elif self.state == self.CLOSED and self._should_trip():
+                self._trip()
+
+    def _should_trip(self) -> bool:
+        if self.consecutive_failures >= self.failure_threshold:
+            return True
+        if len(self._window) >= self.min_calls:
+            failures = sum(1 for ok in self._window if not ok)
+            return failures / len(self._window) >= self.failure_rate
+        return False
+
+    def _trip(self):
+        self.trips += 1
+        self.state = self.OPEN
+        self._opened_at = self._clock()
+        if self.trips > self.max_trips:
+            self.exhausted = True
+
+    def _give_up_message(self) -> str:
+        message = f"Circuit breaker opened {self.trips} times without recovering; giving up on the Cloudflare API"
+        if self.last_reason:
+            message += f" (last failure: {self.last_reason})"
+        return message
@@ -0,0 +1,321 @@
+"""
+Long-running scheduled pruning service.
+
+Instead of paying for interpreter startup, env-file parsing and a full listing
+on every cron run, the daemon keeps one HTTP session and a deployment index per
+project warm and applies retention on a fixed interval. The configuration file
+is re-read whenever it changes, a small HTTP server exposes ``/healthz``, and
+SIGINT/SIGTERM stop the loop after draining the current project's in-flight
+deletions.
+
+Configuration uses the same envfile format as the CLI::
+
+    CF_ACCOUNT_ID=...
+    CF_API_TOKEN=...
+    CF_PAGES_PROJECT_NAMES=site-a,site-b
+    PRUNE_INTERVAL=3600
+    PRUNE_KEEP=10
+
+Set ``PRUNE_BACKEND=workers`` and ``CF_WORKER_SCRIPT_NAMES`` to prune Workers
+script deployments instead.
+"""
+
+import json
+import os
+import signal
+import threading
+import time
+from dataclasses import dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+
+import requests
+
+from .backends import BACKENDS
+from .delete_deployments import CloudflareDeploymentDeleter, load_env_file
+from .errors import DeleterError
+from .hooks import ConsoleHooks, DeletionHooks
+from .index import DeploymentIndex
+from .retry_queue import NOT_FOUND
+
+# How often to check the configuration file for changes, in seconds
+CONFIG_POLL_INTERVAL = 5.0
+
+
+def _parse_bool(value: Optional[str]) -> bool:
+    return (value or "").strip().lower() in ("1", "true", "yes", "on")
+
+
+@dataclass
+class DaemonConfig:
+    """Settings for the pruning daemon."""
+
+    account_id: str
+    projects: List[str]
+    api_token: Optional[str] = None
+    email: Optional[str] = None
+    api_key: Optional[str] = None
+    interval: float = 3600.0
+    keep: int = 10
+    env: Optional[str] = None
+    force: bool = False
+    dry_run: bool = False
+    backend: str = "pages"
+    webhook_secret: Optional[str] = None
+
+    @classmethod
+    def from_env(cls, env_vars: Dict[str, str]) -> "DaemonConfig":
+        """Build the configuration from envfile values, falling back to environment variables."""
+        def lookup(*keys):
+            for source in (env_vars, os.environ):
+                for key in keys:
+                    if source.get(key):
+                        return source[key]
+            return None
+
+        account_id = lookup('CF_ACCOUNT_ID')
+        backend = lookup('PRUNE_BACKEND') or "pages"
+        if backend == "workers":
+            projects = lookup('CF_WORKER_SCRIPT_NAMES', 'CF_WORKER_SCRIPT_NAME')
+        else:
+            projects = lookup('CF_PAGES_PROJECT_NAMES', 'CF_PAGES_PROJECT_NAME')
+        api_token = lookup('CF_API_TOKEN', 'CLOUDFLARE_API_TOKEN')
+        email = lookup('CF_EMAIL', 'CLOUDFLARE_EMAIL')
+        api_key = lookup('CF_API_KEY', 'CLOUDFLARE_API_KEY')
+
+        if not account_id:
+            raise ValueError("CF_ACCOUNT_ID is required")
+        if backend not in BACKENDS:
+            raise ValueError(f"PRUNE_BACKEND must be one of {', '.join(BACKENDS)}")
+        if not projects:
+            if backend == "workers":
+                raise ValueError("CF_WORKER_SCRIPT_NAMES or CF_WORKER_SCRIPT_NAME is required")
+            raise ValueError("CF_PAGES_PROJECT_NAMES or CF_PAGES_PROJECT_NAME is required")
+        if not (api_token or (email and api_key)):
+            raise ValueError("CF_API_TOKEN or CF_EMAIL+CF_API_KEY is required")
+        if backend == "workers" and lookup('PRUNE_ENV'):
+            raise ValueError("PRUNE_ENV cannot be used with the workers backend")
+
+        return cls(
+            account_id=account_id,
+            projects=[name.strip() for name in projects.split(',') if name.strip()],
+            api_token=api_token,
+            email=email,
+            api_key=api_key,
+            interval=float(lookup('PRUNE_INTERVAL') or 3600),
+            keep=int(lookup('PRUNE_KEEP') or 10),
+            env=lookup('PRUNE_ENV'),
+            force=_parse_bool(lookup('PRUNE_FORCE')),
+            dry_run=_parse_bool(lookup('PRUNE_DRY_RUN')),
+            backend=backend,
+            webhook_secret=lookup('PRUNE_WEBHOOK_SECRET'),
+        )
+
+
+class PruningDaemon:
+    """Apply retention to a set of projects on a schedule."""
+
+    def __init__(
+        self,
+        config_path: str,
+        health_host: str = "127.0.0.1",
+        health_port: int = 8080,
+        hooks: Optional[DeletionHooks] = None,
+        session: Optional[requests.Session] = None,
+        verbose: bool = False,
+    ):
+        self.config_path = config_path
+        self.health_host = health_host
+        self.health_port = health_port
+        self.hooks = hooks or ConsoleHooks()
+        self.session = session or requests.Session()
+        self.verbose = verbose
+
+        self.config: Optional[DaemonConfig] = None
+        self._config_mtime: Optional[float] = None
+        self._deleters: Dict[str, CloudflareDeploymentDeleter] = {}
+        self._indexes: Dict[str, DeploymentIndex] = {}
+        self._next_run: Dict[str, float] = {}
+        self.status: Dict[str, Dict] = {}
+        self._stop = threading.Event()
+        self._server: Optional[ThreadingHTTPServer] = None
+
+    @property
+    def stopping(self) -> bool:
+        return self._stop.is_set()
+
+    def reload_config(self) -> bool:
+        """Re-read the configuration file if it changed. Returns True if a new config was applied."""
+        try:
+            mtime = os.path.getmtime(self.config_path)
+        except OSError as e:
+            if self.config is None:
+                raise ValueError(f"Cannot read daemon configuration {self.config_path}: {e}")
+            return False
+
+        if mtime == self._config_mtime:
+            return False
+
+        try:
+            config = DaemonConfig.from_env(load_env_file(self.config_path))
+        except ValueError as e:
+            if self.config is None:
+                raise
+            self.hooks.on_message(f"Ignoring invalid configuration change in {self.config_path}: {e}")
+            self._config_mtime = mtime
+            return False
+
+        self.config = config
+        self._config_mtime = mtime
+        # Rebuild deleters with the new settings; the session and indexes stay warm
+        self._deleters.clear()
+        for project in list(self._indexes):
+            if project not in config.projects:
+                del self._indexes[project]
+                self._next_run.pop(project, None)
+                self.status.pop(project, None)
+        for project in config.projects:
+            self._next_run.setdefault(project, time.monotonic())
+
+        self.hooks.on_message(f"Loaded configuration for {len(config.projects)} projects from {self.config_path}")
+        return True
+
+    def _deleter(self, project: str) -> CloudflareDeploymentDeleter:
+        if project not in self._deleters:
+            config = self.config
+            self._deleters[project] = CloudflareDeploymentDeleter(
+                account_id=config.account_id,
+                project_name=project,
+                email=config.email,
+                api_key=config.api_key,
+                api_token=config.api_token,
+                env=config.env,
+                dry_run=config.dry_run,
+                verbose=self.verbose,
+                force=config.force,
+                limit=25,
+                hooks=self.hooks,
+                keep=config.keep,
+                session=self.session,
+                backend=config.backend,
+            )
+        return self._deleters[project]
+
+    def prune(self, project: str):
+        """Refresh a project's index and delete everything outside the retention window."""
+        index = self._indexes.setdefault(project, DeploymentIndex())
+        deleter = self._deleter(project)
+        # An outage that made an earlier run give up must not block this one
+        deleter.circuit_breaker.reset()
+
+        new = index.refresh(deleter)
+        self.hooks.on_message(f"{project}: {len(new)} new deployments, {len(index)} known")
+
+        report = deleter.run(deployments=index.deployments())
+        if not deleter.dry_run:
+            index.remove(
+                deployment_id
+                for deployment_id, outcome in report.outcomes.items()
+                if outcome.success or outcome.error_class == NOT_FOUND
+            )
+        return report
+
+    def run_pending(self):
+        """Prune every project whose scheduled time has come."""
+        for project in list(self.config.projects):
+            if self.stopping or self._next_run.get(project, 0) > time.monotonic():
+                continue
+
+            status = self.status.setdefault(project, {})
+            status["last_run"] = time.time()
+            try:
+                report = self.prune(project)
+            except DeleterError as e:
+                self.hooks.on_message(f"{project}: pruning failed: {e}")
+                status.update(ok=False, error=str(e))
+            else:
+                status.update(
+                    ok=not report.aborted,
+                    error=report.abort_reason,
+                    deleted=report.deleted_count,
+                    failed=report.failed_count,
+                    requests=report.request_count,
+                    known_deployments=len(self._indexes[project]),
+                )
+            self._next_run[project] = time.monotonic() + self.config.interval
+            status["next_run"] = time.time() + self.config.interval
+
+    def health(self) -> Dict:
+        """Health payload served on ``/healthz``."""
+        return {
+            "status": "stopping" if self.stopping else "ok",
+            "config_path": self.config_path,
+            "projects": self.status,
+        }
+
+    def serve_forever(self):
+        """Run the scheduling loop until ``stop`` is called or a signal arrives."""
+        self.reload_config()
+        previous_handlers = self._install_signal_handlers()
+        self._start_health_server()
+
+        try:
+            while not self.stopping:
+                self.reload_config()
+                self.run_pending()
+
+                due = min(self._next_run.values(), default=time.monotonic() + CONFIG_POLL_INTERVAL)
+                self._stop.wait(max(0.0, min(due - time.monotonic(), CONFIG_POLL_INTERVAL)))
+        finally:
+            self.hooks.on_message("Shutting down pruning daemon")
+            if self._server:
+                self._server.shutdown()
+                self._server.server_close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self):
+        """Ask the scheduling loop to exit once the current project's in-flight deletions are done."""
+        self._stop.set()
+        for deleter in list(self._deleters.values()):
+            deleter.request_stop("daemon shutting down")
+
+    def _install_signal_handlers(self) -> Dict:
+        if threading.current_thread() is not threading.main_thread():
+            return {}
+
+        previous = {}
+        for signum in (signal.SIGINT, signal.SIGTERM):
+            previous[signum] = signal.signal(signum, lambda signum, frame: self.stop())
+        return previous
+
+    def _handler_class(self):
+        """Request handler for the daemon's HTTP server."""
+        daemon = self
+
+        class HealthHandler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                if self.path not in ("/health", "/healthz"):
+                    self.send_error(404)
+                    return
+                body = json.dumps(daemon.health()).encode()
+                self.send_response(503 if daemon.stopping else 200)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                # Health checks would flood the console otherwise
+                pass
+
+        return HealthHandler
+
+    def _start_health_server(self):
+        if self.health_port is None:
+            return
+
+        self._server = ThreadingHTTPServer((self.health_host, self.health_port), self._handler_class())
+        self.health_port = self._server.server_address[1]
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        self.hooks.on_message(f"Health endpoint listening on http://{self.health_host}:{self.health_port}/healthz")
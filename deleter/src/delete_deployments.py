@@ -1,11 +1,38 @@
-#!/usr/bin/env python3
 import argparse
 import json
 import os
-import requests
+import queue
+import signal
 import sys
+import threading
 import time
-from typing import Dict, List, Optional, Union
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import TYPE_CHECKING, Callable, Dict, Iterator, List, Optional, Tuple, Union
+
+from .accounting import NO_RESPONSE, RequestLedger
+from .backends import BACKENDS, ResourceBackend, get_backend
+from .cassette import RecordingTransport, ReplayTransport
+from .circuit_breaker import CircuitBreaker
+from .environments import EnvironmentPolicy, EnvSpec, parse_environments, parse_policy, total_concurrency
+from .errors import (
+    APIError, AuthenticationError, CircuitOpenError, DeadlineExceededError, DeleterError,
+    NetworkError, PermissionDeniedError, ProjectNotFoundError, RateLimitError, RequestBudgetError,
+)
+from .export import EXPORT_FORMATS, export_format, export_inventory, open_writer
+from .hooks import ConsoleHooks, DeletionHooks, EnvironmentHooks
+from .preflight import start_preflight
+from .report import DeletionEstimate, DeletionReport, DeploymentOutcome, VerificationResult
+from .retry_queue import ALIASED, NETWORK, OTHER, DeferredRetryQueue, classify_response
+from .tracing import MIN_WAIT, NullTracer, Tracer
+from .transport import TRANSPORTS, Transport, create_transport
+from .verification import count_deployments, verify_deletions
+
+# requests is imported where it is used so --help, --version and argument
+# errors don't pay for loading it
+if TYPE_CHECKING:
+    import requests
 
 # Import version from package if available
 try:
@@ -36,10 +63,136 @@ def load_env_file(file_path):
     return env_vars
 
 
+def select_expired(
+    deployments: List[Dict],
+    keep: int,
+    key: Callable[[Dict], object] = lambda deployment: deployment.get("environment"),
+) -> List[Dict]:
+    """Return the deployments outside the ``keep`` newest of each group.
+    
+    Deployments are grouped by ``key`` (the environment by default) and ordered
+    by ``created_on``. The result keeps the input order.
+    """
+    if keep <= 0:
+        return list(deployments)
+    
+    newest_first = sorted(deployments, key=lambda deployment: deployment.get("created_on") or "", reverse=True)
+    kept = set()
+    per_group = Counter()
+    for deployment in newest_first:
+        group = key(deployment)
+        if per_group[group] < keep:
+            per_group[group] += 1
+            kept.add(deployment["id"])
+    
+    return [deployment for deployment in deployments if deployment["id"] not in kept]
+
+
+ORDERS = ("api", "oldest-first", "preview-first")
+
+# Cloudflare's global API rate limit: 1200 requests per five minutes
+API_RATE_LIMIT = 1200 / 300
+
+
+def _in_background(function: Callable, *args) -> Future:
+    """Call ``function`` on a daemon thread and return a future for its result."""
+    future = Future()
+    
+    def target():
+        try:
+            future.set_result(function(*args))
+        except BaseException as e:
+            future.set_exception(e)
+    
+    threading.Thread(target=target, name="hedged-listing", daemon=True).start()
+    return future
+
+
+class _DaemonThreadPool:
+    """Run tasks on ``workers`` daemon threads.
+    
+    ``ThreadPoolExecutor`` joins its threads when the interpreter exits, so a
+    deletion abandoned at the drain deadline would hold up the process until
+    its request timed out. These threads are simply dropped at exit.
+    """
+    
+    def __init__(self, workers: int, name: str):
+        self._tasks = queue.Queue()
+        self._threads = [
+            threading.Thread(target=self._work, name=f"{name}_{index}", daemon=True) for index in range(workers)
+        ]
+        for thread in self._threads:
+            thread.start()
+    
+    def submit(self, function: Callable, *args) -> Future:
+        future = Future()
+        self._tasks.put((future, function, args))
+        return future
+    
+    def shutdown(self, wait: bool = True):
+        for _ in self._threads:
+            self._tasks.put(None)
+        if wait:
+            for thread in self._threads:
+                thread.join()
+    
+    def _work(self):
+        while True:
+            task = self._tasks.get()
+            if task is None:
+                return
+            future, function, args = task
+            if not future.set_running_or_notify_cancel():
+                continue
+            try:
+                future.set_result(function(*args))
+            except BaseException as e:
+                future.set_exception(e)
+
+
+def sample_page_numbers(total_pages: int, samples: int) -> List[int]:
+    """Pick up to ``samples`` page numbers spread evenly from the first to the last page."""
+    if samples <= 1 or total_pages <= 1:
+        return [1]
+    samples = min(samples, total_pages)
+    return sorted({1 + round(i * (total_pages - 1) / (samples - 1)) for i in range(samples)})
+
+
+def order_deployments(deployments: List[Dict], order: str = "api") -> List[Dict]:
+    """Sort deployments so a bounded run deletes the most valuable ones first.
+    
+    ``api`` keeps the listing order, ``oldest-first`` sorts by ``created_on`` and
+    ``preview-first`` puts preview deployments before production, oldest first.
+    """
+    if order == "api":
+        return list(deployments)
+    if order == "oldest-first":
+        return sorted(deployments, key=lambda deployment: deployment.get("created_on") or "")
+    if order == "preview-first":
+        return sorted(
+            deployments,
+            key=lambda deployment: (deployment.get("environment") != "preview", deployment.get("created_on") or ""),
+        )
+    raise ValueError(f"Unknown order {order!r}; expected one of {', '.join(ORDERS)}")
+
+
 class CloudflareDeploymentDeleter:
-    """Delete all deployments from a Cloudflare Pages project."""
+    """Delete all deployments from a Cloudflare Pages project.
+    
+    Other resources are handled through ``backend``; with ``backend="workers"``,
+    ``project_name`` is the Workers script name. ``env`` may name several
+    environments, each listed and deleted by its own queue in parallel (see
+    ``environments.EnvironmentPolicy``).
+    """
     
     BASE_URL = "https://api.cloudflare.com/client/v4"
+    # Pauses that keep a run under the API rate limit, in seconds
+    LISTING_DELAY = 0.3
+    DELETE_DELAY = 0.5
+    
+    # Listing pages timed before hedging starts, and how many recent ones are kept
+    HEDGE_MIN_SAMPLES = 3
+    HEDGE_WINDOW = 50
     
     def __init__(
         self,
@@ -48,237 +201,1065 @@ class CloudflareDeploymentDeleter:
         email: Optional[str] = None,
         api_key: Optional[str] = None,
         api_token: Optional[str] = None,
-        env: Optional[str] = None,
+        env: EnvSpec = None,
         dry_run: bool = False,
         verbose: bool = False,
         force: bool = False,
         limit: int = 50,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        state_file: Optional[str] = None,
+        retry_queue: Optional[DeferredRetryQueue] = None,
+        hooks: Optional[DeletionHooks] = None,
+        keep: int = 0,
+        session: Optional["requests.Session"] = None,
+        order: str = "api",
+        max_duration: Optional[float] = None,
+        max_deletes: Optional[int] = None,
+        concurrency: int = 1,
+        transport: Optional[Transport] = None,
+        base_url: Optional[str] = None,
+        drain_timeout: float = 30.0,
+        backend: Union[str, ResourceBackend] = "pages",
+        ledger: Optional[RequestLedger] = None,
+        preflight: bool = False,
+        connect_timeout: float = 10.0,
+        read_timeout: float = 60.0,
+        deadline: Optional[float] = None,
+        hedge_percentile: Optional[float] = None,
+        tracer: Optional[Tracer] = None,
+        verify: bool = False,
+        verify_sample: int = 10,
     ):
         self.account_id = account_id
         self.project_name = project_name
         self.email = email
         self.api_key = api_key
         self.api_token = api_token
-        self.env = env
+        self.environments = parse_environments(env)
+        self.env = ",".join(self.environments) or None
+        if len(self.environments) == 1:
+            # A single environment's policy applies to this deleter directly
+            policy = next(iter(self.environments.values()))
+            force = force if policy.force is None else policy.force
+            keep = keep if policy.keep is None else policy.keep
+            concurrency = concurrency if policy.concurrency is None else policy.concurrency
         self.dry_run = dry_run
         self.verbose = verbose
         self.force = force
         self.limit = limit
+        self.circuit_breaker = circuit_breaker or CircuitBreaker()
+        self.state_file = state_file
+        self.retry_queue = retry_queue or DeferredRetryQueue()
+        self.hooks = hooks or ConsoleHooks()
+        self.keep = keep
+        if concurrency < 1 or any(policy.concurrency is not None and policy.concurrency < 1
+                                  for policy in self.environments.values()):
+            raise ValueError("concurrency must be at least 1")
+        self.concurrency = concurrency
+        if connect_timeout <= 0 or read_timeout <= 0:
+            raise ValueError("timeouts must be positive")
+        if hedge_percentile is not None and not 0 < hedge_percentile < 100:
+            raise ValueError("hedge_percentile must be between 0 and 100")
+        self.connect_timeout = connect_timeout
+        self.read_timeout = read_timeout
+        self.deadline = deadline
+        # Duplicate listing requests slower than this percentile of recent page latencies
+        self.hedge_percentile = hedge_percentile
+        # Share a session or transport between deleters to reuse pooled connections
+        self.transport = transport or create_transport(
+            "http1", session=session,
+            concurrency=total_concurrency(self.environments, concurrency) + (1 if hedge_percentile else 0),
+        )
+        self.base_url = base_url or self.BASE_URL
+        self.backend = get_backend(backend)
+        if self.environments and not self.backend.supports_environments:
+            raise ValueError(f"The {self.backend.name} backend has no environments to filter by")
+        # Share a ledger between deleters to put them under one request budget
+        self.ledger = ledger or RequestLedger()
+        resource = "{" + self.backend.label + "}"
+        self._list_endpoint = self.backend.list_path("{account_id}", resource)
+        self._delete_endpoint = self.backend.delete_path("{account_id}", resource, "{deployment_id}")
+        self._lock = threading.Lock()
+        if order not in ORDERS:
+            raise ValueError(f"Unknown order {order!r}; expected one of {', '.join(ORDERS)}")
+        self.order = order
+        self.max_duration = max_duration
+        self.max_deletes = max_deletes
+        self.drain_timeout = drain_timeout
+        # Verify credentials and the delete permission alongside the first listing page
+        self.preflight = preflight
+        self._stop_requested: Optional[str] = None
+        self._stop_deadline = 0.0
+        self._deadline_at: Optional[float] = None
+        self._listing_latencies = deque(maxlen=self.HEDGE_WINDOW)
+        self.hedged_requests = 0
+        # Share a tracer between deleters to see their runs on one timeline
+        self.tracer = tracer or NullTracer()
+        self._run_span = None
+        if verify_sample < 0:
+            raise ValueError("verify_sample must not be negative")
+        # Check deletions took effect from listing counts and a sample of lookups
+        self.verify = verify
+        self.verify_sample = verify_sample
+        self.listed_total: Optional[int] = None
+        self._environment_deleters: List["CloudflareDeploymentDeleter"] = []
+        self._run_started = time.monotonic()
+        self._delete_attempts = 0
+        self.request_counts = Counter()
+        self._ledger_mark = Counter()
+        self.pages_fetched = 0
         
         # Validate auth
         if api_token:
             self.headers = {"Authorization": f"Bearer {api_token}"}
             if self.verbose:
-                print(f"Using API token authentication")
+                self.hooks.on_message(f"Using API token authentication")
                 # Don't print the full token for security reasons
-                print(f"Token: {api_token[:5]}...{api_token[-5:] if len(api_token) > 10 else ''}")
+                self.hooks.on_message(f"Token: {api_token[:5]}...{api_token[-5:] if len(api_token) > 10 else ''}")
         elif email and api_key:
             self.headers = {
                 "X-Auth-Email": email,
                 "X-Auth-Key": api_key
             }
             if self.verbose:
-                print(f"Using Email+API key authentication")
-                print(f"Email: {email}")
+                self.hooks.on_message(f"Using Email+API key authentication")
+                self.hooks.on_message(f"Email: {email}")
                 # Don't print the full API key for security reasons
-                print(f"API Key: {api_key[:5]}...{api_key[-5:] if len(api_key) > 10 else ''}")
+                self.hooks.on_message(f"API Key: {api_key[:5]}...{api_key[-5:] if len(api_key) > 10 else ''}")
         else:
             raise ValueError("Either API token or Email+API key must be provided")
     
     def get_deployments_paginated(self) -> List[Dict]:
-        """Get all deployments for the project with pagination."""
-        url = f"{self.BASE_URL}/accounts/{self.account_id}/pages/projects/{self.project_name}/deployments"
+        """Get all deployments for the project with pagination.
         
+        Raises a ``DeleterError`` subclass if the listing fails.
+        """
         all_deployments = []
+        for data in self.iter_deployment_pages():
+            all_deployments.extend(data["result"])
+            if self.stop_requested:
+                break
+        return all_deployments
+    
+    def iter_deployment_pages(self) -> Iterator[Dict]:
+        """Yield the decoded API response for each listing page, newest deployments first.
+        
+        Stopping the iteration early skips the remaining pages.
+        """
         page = 1
+        checks = start_preflight(self) if self.preflight else None
         
         while True:
-            params = {
-                "page": page,
-                "per_page": min(self.limit, 25)  # Cloudflare API limit is 25 per page for this endpoint
-            }
+            try:
+                data = self.fetch_deployments_page(page)
+            except DeleterError:
+                # A failed pre-flight check explains the failure better
+                if checks is not None:
+                    checks.result()
+                raise
+            if checks is not None:
+                # Fail before spending requests on the remaining pages
+                try:
+                    checks.result()
+                except AuthenticationError as e:
+                    # The page just listed with these credentials, so the verify endpoint is not the last word
+                    self.hooks.on_message(f"Pre-flight credential check inconclusive, continuing: {e}")
+                checks = None
+            total_pages = data.get("result_info", {}).get("total_pages", 1)
+            self.hooks.on_listing_page(page, total_pages, len(data["result"]))
             
-            if self.env:
-                params["env"] = self.env
+            yield data
             
+            # Check if we have more pages
+            if total_pages > page:
+                page += 1
+                # Short delay to avoid rate limiting
+                with self.tracer.span("pause", "wait"):
+                    time.sleep(self.LISTING_DELAY)
+            else:
+                break
+    
+    def fetch_deployments_page(self, page: int, per_page: Optional[int] = None) -> Dict:
+        """Fetch one listing page, retrying transient failures through the circuit breaker."""
+        with self.tracer.span("listing page", "listing", page=page) as span:
+            data = self._fetch_deployments_page(page, per_page)
+            span.attributes["deployments"] = len(data["result"])
+            return data
+    
+    def _fetch_deployments_page(self, page: int, per_page: Optional[int]) -> Dict:
+        url = f"{self.base_url}{self.backend.list_path(self.account_id, self.project_name)}"
+        # Several environments are listed separately by their own queues, or together when estimating
+        listing_env = self.env if len(self.environments) == 1 else None
+        params = self.backend.list_params(page, per_page or self.limit, listing_env)
+        
+        while True:
             if self.verbose:
-                print(f"Making GET request to: {url} (page {page})")
-                print(f"Request headers: {json.dumps({k: '***' if k.lower() in ['authorization', 'x-auth-key'] else v for k, v in self.headers.items()})}")
-                print(f"Request params: {json.dumps(params)}")
+                self.hooks.on_message(f"Making GET request to: {url} (page {page})")
+                masked = {k: '***' if k.lower() in ['authorization', 'x-auth-key'] else v for k, v in self.headers.items()}
+                self.hooks.on_message(f"Request headers: {json.dumps(masked)}")
+                self.hooks.on_message(f"Request params: {json.dumps(params)}")
             
             try:
-                response = requests.get(url, headers=self.headers, params=params)
-                
-                if self.verbose:
-                    print(f"Response status: {response.status_code}")
-                
-                if response.status_code != 200:
-                    print(f"Error getting deployments: {response.status_code}")
-                    print(response.text)
-                    self._handle_error_response(response)
-                    sys.exit(1)
-                    
-                data = response.json()
-                
-                if not data["success"]:
-                    print(f"API returned unsuccessful response: {data}")
-                    sys.exit(1)
-                
-                deployments = data["result"]
-                all_deployments.extend(deployments)
-                
-                # Check if we have more pages
-                if "result_info" in data and data["result_info"].get("total_pages", 1) > page:
-                    page += 1
-                    print(f"Fetching page {page} of {data['result_info'].get('total_pages', 'unknown')}...")
-                    # Short delay to avoid rate limiting
-                    time.sleep(0.3)
-                else:
-                    break
-                
-            except requests.exceptions.RequestException as e:
-                print(f"Network error when contacting Cloudflare API: {e}")
-                sys.exit(1)
-            except json.JSONDecodeError:
-                print("Error decoding API response - received invalid JSON")
-                print(f"Raw response: {response.text}")
-                sys.exit(1)
-        
-        return all_deployments
-    
-    def _handle_error_response(self, response):
-        """Handle common error responses with helpful messages."""
-        try:
-            if response.status_code == 400:
-                data = response.json()
-                if "errors" in data and len(data["errors"]) > 0:
-                    for error in data["errors"]:
-                        if error.get("code") == 10001 and "authenticate" in error.get("message", "").lower():
-                            print("\nAuthentication Error: Your API token or key may be invalid or expired.")
-                            print("Please check that:")
-                            print("1. Your API token is correct and has not expired")
-                            print("2. The token has the necessary permissions (Pages:Read and Pages:Edit)")
-                            print("3. There are no extra spaces or characters in your token")
-                            print("4. Your account ID is correct\n")
+                response = self._list_request(url, params)
+            except NetworkError as e:
+                # The circuit breaker paces these retries and gives up if the failure persists
+                self.hooks.on_message(f"{e}, retrying page {page}...")
+                continue
             
-            elif response.status_code == 403:
-                print("\nPermission Error: Your API token does not have permission to access this resource.")
-                print("Please ensure your token has the Pages:Read and Pages:Edit permissions.\n")
+            if self.verbose:
+                self.hooks.on_message(f"Response status: {response.status_code}")
             
-            elif response.status_code == 404:
-                print(f"\nNot Found Error: The project '{self.project_name}' was not found in account '{self.account_id}'.")
-                print("Please check that both the project name and account ID are correct.\n")
+            if self._is_transient_failure(response):
+                self.hooks.on_message(f"Transient error getting deployments: {response.status_code}, retrying page {page}...")
+                continue
             
-            elif response.status_code == 429:
-                print("\nRate Limit Error: You've exceeded Cloudflare's API rate limits.")
-                print("Please wait a few minutes before trying again or reduce the frequency of requests.\n")
+            break
         
-        except (json.JSONDecodeError, KeyError):
+        if response.status_code != 200:
+            self.hooks.on_message(f"Error getting deployments: {response.status_code}")
+            self.hooks.on_message(response.text)
+            raise self._error_for_response(response)
+        
+        try:
+            data = response.json()
+        except json.JSONDecodeError:
+            self.hooks.on_message(f"Raw response: {response.text}")
+            raise APIError("Error decoding API response - received invalid JSON", response.status_code)
+        
+        if not data["success"]:
+            raise APIError(f"API returned unsuccessful response: {data}", response.status_code, data.get("errors"))
+        
+        self.pages_fetched += 1
+        data = self.backend.normalize_page(data)
+        if page == 1:
+            self.listed_total = data.get("result_info", {}).get("total_count")
+        return data
+    
+    def estimate(self, sample_pages: int = 3) -> DeletionEstimate:
+        """Project the size and cost of a run without listing every page.
+        
+        Reads the totals from the first listing page, samples up to
+        ``sample_pages`` pages spread across the listing for the environment
+        and alias mix, and projects request counts and duration under the
+        configured concurrency, pacing, retention and budgets. Retries are not
+        included. Raises a ``DeleterError`` subclass if the listing fails.
+        """
+        self.hooks.on_message(f"Estimating deletion for {self.backend.label}: {self.project_name}")
+        
+        latencies = []
+        
+        def fetch(page):
+            started = time.monotonic()
+            data = self.fetch_deployments_page(page)
+            latencies.append(time.monotonic() - started)
+            return data
+        
+        first = fetch(1)
+        info = first.get("result_info", {})
+        total_pages = info.get("total_pages") or 1
+        total_count = info.get("total_count")
+        if total_count is None:
+            total_count = len(first["result"]) * total_pages
+        
+        pages = sample_page_numbers(total_pages, sample_pages)
+        sampled = list(first["result"])
+        for page in pages[1:]:
+            time.sleep(self.LISTING_DELAY)
+            sampled.extend(fetch(page)["result"])
+        
+        sample_size = len(sampled) or 1
+        environments = Counter(deployment.get("environment") or "unknown" for deployment in sampled)
+        environment_mix = {env: count / sample_size for env, count in sorted(environments.items())}
+        aliased_fraction = sum(1 for deployment in sampled if deployment.get("aliases")) / sample_size
+        protected = len(self.backend.protected_ids(sampled))
+        
+        candidates = max(0, total_count - protected)
+        if self.keep:
+            to_delete = sum(max(0, round(candidates * share) - self.keep) for share in environment_mix.values())
+        else:
+            to_delete = candidates
+        if self.max_deletes is not None:
+            to_delete = min(to_delete, self.max_deletes)
+        if self.ledger.max_requests is not None and not self.dry_run:
+            # Listing every page comes out of the same budget
+            to_delete = min(to_delete, max(0, self.ledger.max_requests - total_pages))
+        
+        page_latency = sum(latencies) / len(latencies)
+        # Each worker waits for the response and then pauses; dry runs make no requests
+        delete_latency = 0.0 if self.dry_run else page_latency
+        concurrency = total_concurrency(self.environments, self.concurrency)
+        rate = concurrency / (delete_latency + self.DELETE_DELAY)
+        rate_limit = API_RATE_LIMIT
+        if self.ledger.window_requests is not None:
+            rate_limit = min(rate_limit, self.ledger.window_requests / self.ledger.window)
+        rate_limited = not self.dry_run and rate > rate_limit
+        if rate_limited:
+            rate = rate_limit
+        
+        estimate = DeletionEstimate(
+            project_name=self.project_name,
+            env=self.env,
+            total_count=total_count,
+            total_pages=total_pages,
+            sampled_pages=pages,
+            sampled_deployments=len(sampled),
+            environment_mix=environment_mix,
+            aliased_fraction=aliased_fraction,
+            protected=protected,
+            to_delete=to_delete,
+            expected_aliased_failures=0 if self.force else round(to_delete * aliased_fraction),
+            listing_requests=total_pages,
+            delete_requests=0 if self.dry_run else to_delete,
+            page_latency=page_latency,
+            listing_duration=total_pages * page_latency + (total_pages - 1) * self.LISTING_DELAY,
+            deletion_duration=to_delete / rate,
+            deletions_per_second=rate,
+            concurrency=concurrency,
+            rate_limited=rate_limited,
+            time_budget=self.max_duration,
+        )
+        self.hooks.on_estimate(estimate)
+        return estimate
+    
+    def _request(self, method: str, url: str, endpoint: Optional[str] = None, reserved: bool = False, **kwargs):
+        """Send a request to the Cloudflare API through the circuit breaker.
+        
+        The request is counted in the ledger under ``endpoint``. Raises
+        ``NetworkError`` if the API could not be reached or did not answer in
+        time, ``RequestBudgetError`` if the request budget is used up and
+        ``DeadlineExceededError`` once the run's deadline has passed.
+        """
+        endpoint = endpoint or url
+        deadline = self._deadline_at
+        if deadline is not None and time.monotonic() >= deadline:
+            raise DeadlineExceededError(f"deadline of {self.deadline:g}s reached")
+        waited = time.perf_counter()
+        self.ledger.acquire(reserved, deadline=deadline)
+        self._record_wait("request window", waited)
+        waited = time.perf_counter()
+        self.circuit_breaker.before_request(deadline=deadline)
+        self._record_wait("circuit breaker", waited)
+        timeout = self._timeout(deadline)
+        with self._lock:
+            self.request_counts[method] += 1
+        
+        with self.tracer.span(method, "http", endpoint=endpoint) as span:
+            try:
+                response = self.transport.request(method, url, headers=self.headers, timeout=timeout, **kwargs)
+            except NetworkError as e:
+                self.ledger.record(endpoint, method, NO_RESPONSE)
+                self.circuit_breaker.record_failure(str(e))
+                raise
+            span.attributes["status"] = response.status_code
+        
+        self.ledger.record(endpoint, method, response.status_code)
+        if self._is_transient_failure(response) or self._is_auth_failure(response):
+            self.circuit_breaker.record_failure(f"HTTP {response.status_code}")
+        else:
+            self.circuit_breaker.record_success()
+        
+        return response
+    
+    def _record_wait(self, name: str, started: float):
+        """Record the time since ``started`` as a wait span, if there was any wait."""
+        ended = time.perf_counter()
+        if ended - started >= MIN_WAIT:
+            self.tracer.record(f"{name} wait", "wait", started, ended)
+    
+    def _within_span(self, function: Callable, span) -> Callable:
+        """Wrap ``function`` so the spans it opens on another thread nest under ``span``."""
+        def traced(*args):
+            with self.tracer.within(span):
+                return function(*args)
+        return traced
+    
+    def _timeout(self, deadline: Optional[float]) -> Tuple[float, float]:
+        """Connect and read timeouts for a request, cut short by the run's deadline."""
+        if deadline is None:
+            return self.connect_timeout, self.read_timeout
+        # The request was let through, so it gets at least a moment rather than none
+        remaining = max(deadline - time.monotonic(), 0.01)
+        return min(self.connect_timeout, remaining), min(self.read_timeout, remaining)
+    
+    def _list_request(self, url: str, params: Dict):
+        """Send a listing request, hedged with a duplicate if it is slower than usual.
+        
+        Once a few pages have been timed, a request still unanswered after the
+        ``hedge_percentile`` latency is sent a second time and the first answer
+        wins. The slower request is left to finish in the background.
+        """
+        delay = self._hedge_delay()
+        if delay is None:
+            return self._timed_list_request(url, params)
+        
+        fetch = self._within_span(self._timed_list_request, self.tracer.current())
+        primary = _in_background(fetch, url, params)
+        try:
+            return primary.result(timeout=delay)
+        except FutureTimeoutError:
             pass
+        if self.ledger.remaining() == 0:
+            return primary.result()
+        
+        with self._lock:
+            self.hedged_requests += 1
+        if self.verbose:
+            self.hooks.on_message(f"Listing request slower than {delay:.2f}s, sending a hedged request")
+        hedge = _in_background(fetch, url, params)
+        
+        errors = []
+        pending = {primary, hedge}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                try:
+                    return future.result()
+                except DeleterError as e:
+                    errors.append(e)
+        raise errors[0]
+    
+    def _timed_list_request(self, url: str, params: Dict):
+        started = time.monotonic()
+        response = self._request("GET", url, endpoint=self._list_endpoint, params=params)
+        with self._lock:
+            self._listing_latencies.append(time.monotonic() - started)
+        return response
+    
+    def _hedge_delay(self) -> Optional[float]:
+        """Latency after which a listing request is hedged, or None while hedging is off."""
+        if self.hedge_percentile is None:
+            return None
+        with self._lock:
+            latencies = sorted(self._listing_latencies)
+        if len(latencies) < self.HEDGE_MIN_SAMPLES:
+            return None
+        # Nearest-rank percentile
+        rank = -(-len(latencies) * self.hedge_percentile // 100)
+        return latencies[int(rank) - 1]
+    
+    @staticmethod
+    def _is_transient_failure(response) -> bool:
+        """Check whether a response is a rate limit or server-side failure."""
+        return response.status_code == 429 or response.status_code >= 500
+    
+    @staticmethod
+    def _is_auth_failure(response) -> bool:
+        """Check whether a response means the credentials stopped working."""
+        if response.status_code in (401, 403):
+            return True
+        if response.status_code == 400:
+            try:
+                errors = response.json().get("errors") or []
+            except (ValueError, AttributeError):
+                return False
+            return any(error.get("code") in (10000, 10001) for error in errors)
+        return False
+    
+    def _load_state(self) -> Optional[List[Dict]]:
+        """Load pending deployments saved by an aborted run, if any."""
+        if not self.state_file or not os.path.exists(self.state_file):
+            return None
+        
+        try:
+            with open(self.state_file, 'r') as f:
+                state = json.load(f)
+        except (OSError, json.JSONDecodeError) as e:
+            self.hooks.on_message(f"Ignoring unreadable state file {self.state_file}: {e}")
+            return None
+        
+        if (state.get("project_name") != self.project_name or state.get("env") != self.env
+                or state.get("backend", "pages") != self.backend.name):
+            self.hooks.on_message(f"Ignoring state file {self.state_file}: it belongs to a different project or environment")
+            return None
+        
+        return state.get("pending", [])
+    
+    def _save_state(self, pending: List[Dict], deleted_count: int):
+        """Save the deployments that still need deleting so a later run can resume."""
+        if not self.state_file:
+            return
+        
+        state = {
+            "backend": self.backend.name,
+            "project_name": self.project_name,
+            "env": self.env,
+            "deleted_count": deleted_count,
+            "pending": [
+                {key: deployment[key] for key in ("id", "environment", "created_on") if key in deployment}
+                for deployment in pending
+            ],
+        }
+        with open(self.state_file, 'w') as f:
+            json.dump(state, f, indent=2)
+    
+    def _clear_state(self):
+        """Remove the state file once a run has finished cleanly."""
+        if self.state_file and os.path.exists(self.state_file):
+            os.remove(self.state_file)
+    
+    def _error_for_response(self, response) -> APIError:
+        """Build a typed exception with a helpful message for an error response."""
+        status = response.status_code
+        try:
+            errors = response.json().get("errors") or []
+        except (json.JSONDecodeError, ValueError, AttributeError):
+            errors = []
+        
+        if status == 401 or (status == 400 and any(error.get("code") in (10000, 10001) for error in errors)):
+            return AuthenticationError(
+                "Authentication Error: Your API token or key may be invalid or expired.\n"
+                "Please check that:\n"
+                "1. Your API token is correct and has not expired\n"
+                f"2. The token has the necessary permissions ({self.backend.permissions})\n"
+                "3. There are no extra spaces or characters in your token\n"
+                "4. Your account ID is correct",
+                status, errors,
+            )
+        
+        if status == 403:
+            return PermissionDeniedError(
+                "Permission Error: Your API token does not have permission to access this resource.\n"
+                f"Please ensure your token has the {self.backend.permissions} permissions.",
+                status, errors,
+            )
+        
+        if status == 404:
+            return ProjectNotFoundError(
+                f"Not Found Error: The {self.backend.label} '{self.project_name}' was not found "
+                f"in account '{self.account_id}'.\n"
+                f"Please check that both the {self.backend.label} name and account ID are correct.",
+                status, errors,
+            )
+        
+        if status == 429:
+            return RateLimitError(
+                "Rate Limit Error: You've exceeded Cloudflare's API rate limits.\n"
+                "Please wait a few minutes before trying again or reduce the frequency of requests.",
+                status, errors,
+            )
+        
+        return APIError(f"Unexpected response from Cloudflare API: {status}", status, errors)
     
     def delete_deployment(self, deployment_id: str) -> bool:
         """Delete a specific deployment."""
-        base_url = f"{self.BASE_URL}/accounts/{self.account_id}/pages/projects/{self.project_name}/deployments/{deployment_id}"
-        
-        # Add force parameter if required
-        url = f"{base_url}?force=true" if self.force else base_url
+        success, _ = self._attempt_delete(deployment_id)
+        return success
+    
+    def _attempt_delete(self, deployment_id: str) -> Tuple[bool, Optional[str]]:
+        """Delete a deployment and return whether it worked plus the error class if not."""
+        url = f"{self.base_url}{self.backend.delete_path(self.account_id, self.project_name, deployment_id, self.force)}"
         
         if self.dry_run:
-            print(f"[DRY RUN] Would delete deployment: {deployment_id}" + (" (forced)" if self.force else ""))
-            return True
+            self.hooks.on_message(f"[DRY RUN] Would delete deployment: {deployment_id}" + (" (forced)" if self.force else ""))
+            return True, None
         
         if self.verbose:
-            print(f"Making DELETE request to: {url}")
+            self.hooks.on_message(f"Making DELETE request to: {url}")
+            
+        try:
+            # The scheduler reserved this request from the budget
+            response = self._request("DELETE", url, endpoint=self._delete_endpoint, reserved=True)
+        except (NetworkError, DeadlineExceededError) as e:
+            self.hooks.on_message(str(e))
+            return False, NETWORK
+        
+        if response.status_code not in (200, 204):
+            self.hooks.on_message(f"Error deleting deployment {deployment_id}: {response.status_code}")
+            self.hooks.on_message(response.text)
+            
+            error_class = classify_response(response)
+            if error_class == ALIASED:
+                if not self.force:
+                    self.hooks.on_message("\nThis is an aliased deployment (likely the production deployment).")
+                    self.hooks.on_message("To delete it, rerun with the --force flag.\n")
+                else:
+                    self.hooks.on_message(
+                        "\nFailed to delete even with force flag. This might be the active production deployment."
+                    )
+                    self.hooks.on_message("You may need to make another deployment the production deployment first.\n")
             
+            return False, error_class
+        
         try:
-            response = requests.delete(url, headers=self.headers)
+            data = response.json()
+        except json.JSONDecodeError:
+            self.hooks.on_message("Error decoding API response - received invalid JSON")
+            self.hooks.on_message(f"Raw response: {response.text}")
+            return False, OTHER
+        
+        if data.get("success", False):
+            return True, None
+        return False, OTHER
+    
+    def _delete_and_record(self, deployment: Dict, report: DeletionReport) -> DeploymentOutcome:
+        """Delete a deployment and record the attempt in the report."""
+        with self.tracer.span("delete", "delete", deployment_id=deployment["id"]) as span:
+            started = time.monotonic()
+            success, error_class = self._attempt_delete(deployment["id"])
+            
+            with self._lock:
+                outcome = report.outcome(deployment["id"])
+                outcome.success, outcome.error_class = success, error_class
+                outcome.duration += time.monotonic() - started
+                outcome.attempts += 1
+            span.attributes.update(attempt=outcome.attempts, success=success, error_class=error_class)
+        return outcome
+    
+    def _delete_task(self, deployment: Dict, report: DeletionReport):
+        """Delete one deployment of the main pass and queue it for retry if needed."""
+        with self.tracer.within(self._run_span):
+            outcome = self._delete_and_record(deployment, report)
+            
+            with self._lock:
+                retryable = not outcome.success and self.retry_queue.add(deployment, outcome.error_class)
+            self.hooks.on_deletion_result(outcome, retryable)
             
-            if response.status_code not in (200, 204):
-                print(f"Error deleting deployment {deployment_id}: {response.status_code}")
-                print(response.text)
+            # Avoid rate limiting; failures are retried after the main pass so it never slows down
+            with self.tracer.span("pause", "wait"):
+                time.sleep(self.DELETE_DELAY)
+    
+    def _main_pass(self, deployments: List[Dict], report: DeletionReport):
+        """Delete deployments with up to ``concurrency`` requests in flight.
+        
+        Stops scheduling new deletions once a budget is used up; deletions
+        already in flight are allowed to finish.
+        """
+        total_count = len(deployments)
+        scheduled = 0
+        in_flight = set()
+        
+        executor = _DaemonThreadPool(self.concurrency, "deleter")
+        try:
+            while True:
+                while len(in_flight) < self.concurrency and scheduled < total_count and not report.stop_reason:
+                    report.stop_reason = self._stop_reason()
+                    if report.stop_reason:
+                        break
+                    if not self.dry_run and not self.ledger.reserve():
+                        report.stop_reason = self._stop_reason()
+                        break
+                    
+                    deployment = deployments[scheduled]
+                    scheduled += 1
+                    # Counted when scheduled so deletions in flight cannot overrun the delete budget
+                    self._delete_attempts += 1
+                    self.hooks.on_deletion_start(scheduled, total_count, deployment["id"])
+                    in_flight.add(executor.submit(self._delete_task, deployment, report))
+                    self.tracer.counter("deletions in flight", len(in_flight))
                 
-                # Check if it's an aliased deployment error
-                try:
-                    data = response.json()
-                    if not data.get("success", True) and data.get("errors"):
-                        for error in data["errors"]:
-                            if error.get("code") == 8000035 and "aliased deployment" in error.get("message", "").lower():
-                                if not self.force:
-                                    print("\nThis is an aliased deployment (likely the production deployment).")
-                                    print("To delete it, rerun with the --force flag.\n")
-                                else:
-                                    print("\nFailed to delete even with force flag. This might be the active production deployment.")
-                                    print("You may need to make another deployment the production deployment first.\n")
-                except (json.JSONDecodeError, KeyError):
-                    pass
+                if not in_flight:
+                    break
                 
-                return False
+                # Wake up regularly so a stop request is noticed while requests are slow
+                timeout = 0.5
+                if self.stop_requested:
+                    report.stop_reason = self._stop_reason()
+                    timeout = self._stop_deadline - time.monotonic()
+                    if timeout <= 0:
+                        self.hooks.on_message(
+                            f"Stopped waiting for {len(in_flight)} in-flight deletions after "
+                            f"{self.drain_timeout:g}s; they are counted as remaining"
+                        )
+                        break
                 
-            data = response.json()
-            return data.get("success", False)
+                done, in_flight = wait(in_flight, timeout=timeout, return_when=FIRST_COMPLETED)
+                if done:
+                    self.tracer.counter("deletions in flight", len(in_flight))
+                for future in done:
+                    # Re-raises CircuitOpenError from a worker
+                    future.result()
+        finally:
+            # Deletions abandoned at the drain deadline are left to finish in the background,
+            # or dropped if the process exits first
+            executor.shutdown(wait=not in_flight)
+    
+    @property
+    def stop_requested(self) -> bool:
+        return self._stop_requested is not None
+    
+    def request_stop(self, reason: str = "interrupted"):
+        """Ask a running ``run`` to stop scheduling deletions and wrap up.
         
-        except requests.exceptions.RequestException as e:
-            print(f"Network error when contacting Cloudflare API: {e}")
-            return False
-        except json.JSONDecodeError:
-            print("Error decoding API response - received invalid JSON")
-            print(f"Raw response: {response.text}")
-            return False
+        Deletions already in flight get up to ``drain_timeout`` seconds to
+        finish, then the run saves its progress and returns the report as
+        usual. Safe to call from signal handlers and other threads.
+        """
+        if self._stop_requested is None:
+            self._stop_deadline = time.monotonic() + self.drain_timeout
+            self._stop_requested = reason
+        for deleter in list(self._environment_deleters):
+            deleter.request_stop(reason)
+    
+    def _stop_reason(self) -> Optional[str]:
+        """Return why the run should stop scheduling deletions, if it should."""
+        return self._stop_requested or self._budget_exhausted()
     
-    def run(self):
-        """Run the deletion process."""
-        print(f"Getting deployments for project: {self.project_name}")
+    def _budget_exhausted(self) -> Optional[str]:
+        """Return why the run's time, delete or request budget is used up, if it is."""
+        if self._deadline_at is not None and time.monotonic() >= self._deadline_at:
+            return f"deadline of {self.deadline:g}s reached"
+        if self.max_duration is not None and time.monotonic() - self._run_started >= self.max_duration:
+            return f"time budget of {self.max_duration:g}s used up"
+        if self.max_deletes is not None and self._delete_attempts >= self.max_deletes:
+            return f"delete budget of {self.max_deletes} used up"
+        if not self.dry_run and self.ledger.remaining() == 0:
+            return f"request budget of {self.ledger.max_requests} used up"
+        return None
+    
+    def run(self, deployments: Optional[List[Dict]] = None) -> DeletionReport:
+        """Run the deletion process and return a report of what happened.
+        
+        Pass ``deployments`` to work from an already known listing instead of
+        paginating the project. Listing failures are raised as ``DeleterError``
+        subclasses. If the circuit breaker gives up during deletion, the
+        returned report is marked as aborted and lists the remaining deployment IDs.
+        """
+        with self.tracer.span("run", "run", project=self.project_name, env=self.env, dry_run=self.dry_run) as span:
+            self._run_span = span
+            try:
+                if len(self.environments) > 1:
+                    report = self._run_environments(deployments)
+                else:
+                    report = self._run(deployments)
+            finally:
+                self._run_span = None
+            span.attributes.update(
+                deleted=report.deleted_count,
+                failed=report.failed_count,
+                remaining=len(report.remaining),
+                stop_reason=report.stop_reason,
+                aborted=report.aborted,
+            )
+        return report
+    
+    def _run(self, deployments: Optional[List[Dict]]) -> DeletionReport:
+        """Run one queue: list unless given ``deployments``, delete, retry and report."""
+        report = DeletionReport(project_name=self.project_name, env=self.env, dry_run=self.dry_run)
+        # Deleters reused by the daemon and receiver must not retry or report earlier runs' failures
+        self.retry_queue = self.retry_queue.clone()
+        self.request_counts = Counter()
+        self._ledger_mark = self.ledger.snapshot()
+        self.pages_fetched = 0
+        self.hedged_requests = 0
+        self._run_started = time.monotonic()
+        if self.deadline is not None:
+            self._deadline_at = self._run_started + self.deadline
+        self._delete_attempts = 0
+        self.listed_total = None
+        resumed = False
+        listing_skipped = deployments is not None
+        before = None
         
-        deployments = self.get_deployments_paginated()
-        print(f"Found {len(deployments)} deployments")
+        if deployments is None:
+            deployments = self._load_state()
+            if deployments is not None:
+                self.hooks.on_message(f"Resuming from {self.state_file}: {len(deployments)} deployments pending")
+                resumed = listing_skipped = True
+        
+        if deployments is None:
+            self.hooks.on_message(f"Getting deployments for {self.backend.label}: {self.project_name}")
+            
+            listing_started = time.monotonic()
+            try:
+                deployments = self.get_deployments_paginated()
+            except RequestBudgetError as e:
+                # Nothing can be deleted without requests; the next run lists again
+                report.stop_reason = self._budget_exhausted() or str(e)
+                return self._finish(report)
+            finally:
+                report.listing_duration = time.monotonic() - listing_started
+                report.listing_pages = self.pages_fetched
+                report.requests = dict(self.request_counts)
+            self.hooks.on_message(f"Found {len(deployments)} deployments")
+            before = self.listed_total, {deployment["id"] for deployment in deployments}
+            
+            if self.stop_requested:
+                # A partial listing is not worth saving; the next run lists again
+                report.stop_reason = self._stop_reason()
+                return self._finish(report)
+        
+        if not resumed:
+            protected = self.backend.protected_ids(deployments)
+            if protected:
+                self.hooks.on_message(f"Skipping {len(protected)} active deployments that cannot be deleted")
+                deployments = [deployment for deployment in deployments if deployment["id"] not in protected]
+        
+        if self.keep and not resumed:
+            deployments = select_expired(deployments, self.keep)
+            self.hooks.on_message(f"Keeping the {self.keep} newest deployments per environment; {len(deployments)} to delete")
+        
+        deployments = order_deployments(deployments, self.order)
+        report.found = len(deployments)
         
         if not deployments:
-            print("No deployments to delete")
-            return
+            self.hooks.on_message("No deployments to delete")
+            return self._finish(report)
             
+        if self.preflight and not self.dry_run and listing_skipped:
+            # Usually already cached by an earlier listing in this process
+            start_preflight(self).result()
+        
+        if self.verify and not self.dry_run and before is None:
+            # Without a listing of our own, the first page gives the count to compare against
+            try:
+                before = count_deployments(self)
+            except RequestBudgetError as e:
+                report.stop_reason = self._budget_exhausted() or str(e)
+                self._record_remaining(report, deployments)
+                return self._finish(report)
+        
         if self.dry_run:
-            print("DRY RUN mode enabled - no actual deletions will occur")
+            self.hooks.on_message("DRY RUN mode enabled - no actual deletions will occur")
 
         if self.force:
-            print("FORCE mode enabled - will attempt to delete aliased deployments")
-        
-        deleted_count = 0
-        failed_count = 0
-        total_count = len(deployments)
+            self.hooks.on_message("FORCE mode enabled - will attempt to delete aliased deployments")
         
-        print(f"\nStarting deletion of {total_count} deployments...")
+        self.hooks.on_message(f"\nStarting deletion of {len(deployments)} deployments...")
         
-        for idx, deployment in enumerate(deployments, 1):
-            deployment_id = deployment["id"]
-            progress_pct = (idx / total_count) * 100
-            
-            print(f"[{idx}/{total_count}] ({progress_pct:.1f}%) Deleting deployment: {deployment_id}")
-            success = self.delete_deployment(deployment_id)
+        deletion_started = time.monotonic()
+        try:
+            self._main_pass(deployments, report)
             
-            if success:
-                print(f"✓ Successfully deleted deployment: {deployment_id}")
-                deleted_count += 1
+            if self.retry_queue.retryable_count() and not report.stop_reason:
+                try:
+                    with self.tracer.span("retries", "retry"):
+                        self.retry_queue.drain(
+                            lambda deployment: self._retry_and_record(deployment, report),
+                            on_retry=self._on_retry_round,
+                            should_stop=lambda: self._stop_reason() is not None,
+                            deadline=self._deadline_at,
+                        )
+                except RequestBudgetError:
+                    # Unretried deployments stay queued and are reported as remaining
+                    pass
+                report.stop_reason = self._stop_reason() if self.retry_queue.retryable_count() else None
+        except CircuitOpenError as e:
+            report.aborted = True
+            report.abort_reason = str(e)
+            self._record_remaining(report, deployments)
+        else:
+            if report.stop_reason:
+                self._record_remaining(report, deployments)
             else:
-                print(f"✗ Failed to delete deployment: {deployment_id}")
-                failed_count += 1
+                self._clear_state()
+        finally:
+            report.deletion_duration = time.monotonic() - deletion_started
+        
+        if self.verify and not self.dry_run and not report.aborted and not self.stop_requested and report.deleted_count:
+            report.verification = verify_deletions(self, report, deployments, before, self.verify_sample)
+        
+        return self._finish(report)
+    
+    def _record_remaining(self, report: DeletionReport, deployments: List[Dict]):
+        """Record and save the deployments a stopped or aborted run did not finish."""
+        unprocessed = [deployment for deployment in deployments if deployment["id"] not in report.outcomes]
+        # Aliased, not found and auth failures are reported as failed; deleting them again would not help
+        pending = self.retry_queue.retryable_items() + unprocessed
+        self._save_state(pending, report.deleted_count)
+        report.remaining = [deployment["id"] for deployment in pending]
+        report.remaining_by_env = dict(Counter(deployment.get("environment") or "unknown" for deployment in pending))
+        if self.state_file:
+            self.hooks.on_message(f"Progress saved to {self.state_file}; rerun with the same --state-file to resume")
+    
+    def _derived(self, **overrides) -> "CloudflareDeploymentDeleter":
+        """Build a deleter with this one's settings, connections and breaker, changing ``overrides``."""
+        settings = dict(
+            account_id=self.account_id,
+            project_name=self.project_name,
+            email=self.email,
+            api_key=self.api_key,
+            api_token=self.api_token,
+            env=self.environments or None,
+            dry_run=self.dry_run,
+            verbose=self.verbose,
+            force=self.force,
+            limit=self.limit,
+            circuit_breaker=self.circuit_breaker,
+            state_file=self.state_file,
+            retry_queue=self.retry_queue.clone(),
+            hooks=self.hooks,
+            keep=self.keep,
+            order=self.order,
+            max_duration=self.max_duration,
+            max_deletes=self.max_deletes,
+            concurrency=self.concurrency,
+            transport=self.transport,
+            base_url=self.base_url,
+            drain_timeout=self.drain_timeout,
+            backend=self.backend,
+            ledger=self.ledger,
+            preflight=self.preflight,
+            connect_timeout=self.connect_timeout,
+            read_timeout=self.read_timeout,
+            deadline=self.deadline,
+            hedge_percentile=self.hedge_percentile,
+            tracer=self.tracer,
+            verify=self.verify,
+            verify_sample=self.verify_sample,
+        )
+        settings.update(overrides)
+        return CloudflareDeploymentDeleter(**settings)
+    
+    def _environment_deleter(self, env: str, policy: EnvironmentPolicy) -> "CloudflareDeploymentDeleter":
+        """Build the deleter for one environment's queue; it shares this deleter's connections and breaker."""
+        return self._derived(
+            env=env,
+            force=self.force if policy.force is None else policy.force,
+            state_file=f"{self.state_file}.{env}" if self.state_file else None,
+            hooks=EnvironmentHooks(self.hooks, env),
+            keep=self.keep if policy.keep is None else policy.keep,
+            concurrency=self.concurrency if policy.concurrency is None else policy.concurrency,
+        )
+    
+    def _run_environments(self, deployments: Optional[List[Dict]]) -> DeletionReport:
+        """Run one queue per environment in parallel and combine their reports.
+        
+        Budgets apply to each queue separately. If every queue fails to list,
+        the first error is raised; otherwise failed queues mark the combined
+        report as aborted.
+        """
+        report = DeletionReport(project_name=self.project_name, env=self.env, dry_run=self.dry_run)
+        self.request_counts = Counter()
+        # The queues share this deleter's ledger, so its breakdown covers them all
+        self._ledger_mark = self.ledger.snapshot()
+        self._environment_deleters = [
+            self._environment_deleter(env, policy) for env, policy in self.environments.items()
+        ]
+        if self._stop_requested:
+            for deleter in self._environment_deleters:
+                deleter.request_stop(self._stop_requested)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=len(self._environment_deleters), thread_name_prefix="env") as executor:
+            futures = {}
+            for deleter in self._environment_deleters:
+                subset = None
+                if deployments is not None:
+                    subset = [deployment for deployment in deployments if deployment.get("environment") == deleter.env]
+                futures[executor.submit(self._within_span(deleter.run, self._run_span), subset)] = deleter.env
             
-            # Avoid rate limiting, but use a shorter delay for efficiency with large deployments
-            # We'll dynamically adjust the delay based on whether we've had any failures
-            if failed_count > 0:
-                # If we've had failures, be more cautious
-                time.sleep(1.0) 
-            else:
-                # If all is going well, use a shorter delay
-                time.sleep(0.5)
+            pending = set(futures)
+            while pending:
+                # Wake up regularly so signal handlers get to run
+                _, pending = wait(pending, timeout=0.5)
+            for future, env in futures.items():
+                error = future.exception()
+                if error is not None and not isinstance(error, DeleterError):
+                    raise error
+                results[env] = error or future.result()
+        
+        errors = {env: result for env, result in results.items() if isinstance(result, BaseException)}
+        if len(errors) == len(results):
+            self._environment_deleters = []
+            raise next(iter(errors.values()))
         
-        print(f"Completed deletion: {deleted_count} deleted, {failed_count} failed")
+        for env, result in results.items():
+            if env in errors:
+                self.hooks.on_message(f"[{env}] {result}")
+                report.aborted = True
+                report.abort_reason = report.abort_reason or f"{env}: {result}"
+                continue
+            
+            report.found += result.found
+            report.outcomes.update(result.outcomes)
+            report.remaining.extend(result.remaining)
+            for remaining_env, count in result.remaining_by_env.items():
+                report.remaining_by_env[remaining_env] = report.remaining_by_env.get(remaining_env, 0) + count
+            report.listing_pages += result.listing_pages
+            report.hedged_requests += result.hedged_requests
+            if result.verification is not None:
+                if report.verification is None:
+                    report.verification = VerificationResult(total_before=0, total_after=0, expected_after=0)
+                report.verification.merge(result.verification)
+            report.listing_duration = max(report.listing_duration, result.listing_duration)
+            report.deletion_duration = max(report.deletion_duration, result.deletion_duration)
+            self.request_counts.update(result.requests)
+            if result.aborted:
+                report.aborted = True
+                report.abort_reason = report.abort_reason or f"{env}: {result.abort_reason}"
+            if result.stop_reason and not report.stop_reason:
+                report.stop_reason = f"{env}: {result.stop_reason}"
+        
+        self._environment_deleters = []
+        return self._finish(report)
+    
+    def _on_retry_round(self, attempt: int, delay: float, count: int):
+        # The queue sleeps through the backoff right after this
+        now = time.perf_counter()
+        self.tracer.record("retry backoff", "wait", now, now + delay, attempt=attempt, deployments=count)
+        self.hooks.on_retry_round(attempt, self.retry_queue.max_attempts, delay, count)
+    
+    def _retry_and_record(self, deployment: Dict, report: DeletionReport) -> Tuple[bool, Optional[str]]:
+        """Retry callback for the deferred queue."""
+        if not self.dry_run and not self.ledger.reserve():
+            raise RequestBudgetError(self._budget_exhausted())
+        self._delete_attempts += 1
+        outcome = self._delete_and_record(deployment, report)
+        self.hooks.on_deletion_result(outcome, False)
+        return outcome.success, outcome.error_class
+    
+    def _finish(self, report: DeletionReport) -> DeletionReport:
+        """Fill in the closing totals and notify the hooks."""
+        report.requests = dict(self.request_counts)
+        report.request_breakdown = self.ledger.breakdown(since=self._ledger_mark)
+        report.hedged_requests += self.hedged_requests
+        report.finished_at = time.time()
+        self._stop_requested = None
+        self._deadline_at = None
+        self.hooks.on_complete(report)
+        return report
 
 
-def main():
+def install_stop_handlers(deleter: CloudflareDeploymentDeleter, received: Optional[List[int]] = None) -> Dict:
+    """Make SIGINT and SIGTERM stop ``deleter`` gracefully.
+    
+    The first signal asks the run to stop scheduling deletions and drain the
+    ones in flight; a second one exits immediately. Received signal numbers
+    are appended to ``received``. Returns the previous handlers so they can be
+    restored.
+    """
+    def handle(signum, frame):
+        if deleter.stop_requested:
+            deleter.hooks.on_message("Second signal received; exiting without waiting")
+            raise SystemExit(128 + signum)
+        if received is not None:
+            received.append(signum)
+        deleter.hooks.on_message(
+            f"\n{signal.Signals(signum).name} received; finishing in-flight deletions "
+            f"(up to {deleter.drain_timeout:g}s). Send it again to exit immediately."
+        )
+        deleter.request_stop("interrupted")
+    
+    previous = {}
+    for signum in (signal.SIGINT, signal.SIGTERM):
+        previous[signum] = signal.signal(signum, handle)
+    return previous
+
+
+def _environment_list(value: str) -> str:
+    """argparse type for ``--env``: one or more comma-separated environments."""
+    names = [name.strip() for name in value.split(",") if name.strip()]
+    if not names or any(name not in ("production", "preview") for name in names):
+        raise argparse.ArgumentTypeError(
+            f"invalid choice: {value!r} (choose from 'production', 'preview' or 'production,preview')"
+        )
+    return ",".join(names)
+
+
+def _environment_policy(value: str) -> Dict[str, EnvironmentPolicy]:
+    """argparse type for ``--env-policy``."""
+    try:
+        return parse_policy(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the command-line argument parser."""
     parser = argparse.ArgumentParser(description="Delete all deployments from a Cloudflare Pages project")
     
     parser.add_argument("--account-id", help="Cloudflare account ID")
-    parser.add_argument("--project-name", help="Pages project name")
+    parser.add_argument("--project-name", help="Pages project name (the Workers script name with --backend workers)")
     parser.add_argument("--version", action="version", version=f"%(prog)s {__version__}")
     
     # Auth options
@@ -288,8 +1269,12 @@ def main():
     auth_group.add_argument("--api-key", help="Cloudflare API key")
     
     # Optional filters and settings
-    parser.add_argument("--env", choices=["production", "preview"], 
-                        help="Filter deployments by environment")
+    parser.add_argument("--env", type=_environment_list,
+                        help="Filter deployments by environment: production, preview, or production,preview "
+                             "to run both in parallel with their own queues")
+    parser.add_argument("--env-policy", action="append", type=_environment_policy, metavar="ENV:KEY=VALUE[,...]",
+                        help="Settings for one environment's queue, e.g. production:concurrency=1,force=true,keep=5 "
+                             "(keys: concurrency, force, keep; repeatable)")
     parser.add_argument("--dry-run", action="store_true", 
                         help="Show what would be deleted without actually deleting")
     parser.add_argument("--env-file", default="envfile",
@@ -300,9 +1285,171 @@ def main():
                         help="Force deletion of aliased deployments (production)")
     parser.add_argument("--limit", type=int, default=25,
                         help="Maximum number of deployments to fetch per page (default: 25, max: 25)")
+    parser.add_argument("--keep", type=int, default=0,
+                        help="Keep the N newest deployments of each environment (default: 0, delete all)")
+    parser.add_argument("--order", choices=ORDERS, default="api",
+                        help="Deletion order: API order, oldest-first by creation date, or preview before production "
+                             "(default: api)")
+    parser.add_argument("--max-duration", type=float,
+                        help="Stop scheduling deletions after this many seconds and report what is left")
+    parser.add_argument("--max-deletes", type=int,
+                        help="Stop after this many deletion attempts and report what is left")
+    parser.add_argument("--max-requests", type=int,
+                        help="Stop after this many API requests, listing included, and report what is left")
+    parser.add_argument("--max-requests-per-window", type=int, metavar="N",
+                        help="Send at most N API requests per --request-window, waiting when the limit is reached")
+    parser.add_argument("--request-window", type=float, default=300.0, metavar="SECONDS",
+                        help="Length of the sliding window for --max-requests-per-window (default: 300)")
+    parser.add_argument("--estimate", action="store_true",
+                        help="Estimate deletions, API requests and duration from a few sampled listing pages, then exit")
+    parser.add_argument("--estimate-pages", type=int, default=3,
+                        help="Listing pages to sample for --estimate, spread across the listing (default: 3)")
+    parser.add_argument("--backend", choices=BACKENDS, default="pages",
+                        help="What to delete: Pages project deployments or Workers script deployments (default: pages)")
+    parser.add_argument("--concurrency", type=int, default=1,
+                        help="Number of deletions in flight at once (default: 1)")
+    parser.add_argument("--transport", choices=TRANSPORTS, default="http1",
+                        help="HTTP transport: pooled HTTP/1.1, or HTTP/2 multiplexing all requests over one "
+                             "connection (requires httpx[http2]) (default: http1)")
+    parser.add_argument("--state-file",
+                        help="Save remaining deployments here when a run aborts, and resume from it on the next run")
+    parser.add_argument("--no-preflight", action="store_true",
+                        help="Skip verifying the credentials and delete permission alongside the first listing page")
+    parser.add_argument("--connect-timeout", type=float, default=10.0, metavar="SECONDS",
+                        help="Give up on connecting to the API after this long; the request is retried (default: 10)")
+    parser.add_argument("--read-timeout", type=float, default=60.0, metavar="SECONDS",
+                        help="Give up on an API response after this long; the request is retried (default: 60)")
+    parser.add_argument("--deadline", type=float, metavar="SECONDS",
+                        help="Hard limit for the whole run, listing and in-flight requests included; "
+                             "report what is left when it passes")
+    parser.add_argument("--hedge-listing", type=float, metavar="PERCENTILE",
+                        help="Send a duplicate listing request when a page is slower than this percentile "
+                             "of recent pages, e.g. 90, and use whichever answers first")
+    parser.add_argument("--verify", action="store_true",
+                        help="After deleting, check the listing's total count and look up a sample of deleted "
+                             "deployments, deleting again any that are still there")
+    parser.add_argument("--verify-sample", type=int, default=10, metavar="N",
+                        help="Deleted deployments to look up for --verify (default: 10)")
+    parser.add_argument("--drain-timeout", type=float, default=30.0,
+                        help="On SIGINT/SIGTERM, seconds to let in-flight deletions finish before stopping (default: 30)")
+    
+    # Circuit breaker settings
+    breaker_group = parser.add_argument_group("Circuit breaker")
+    breaker_group.add_argument("--circuit-failures", type=int, default=5,
+                               help="Consecutive failures before pausing requests (default: 5)")
+    breaker_group.add_argument("--circuit-failure-rate", type=float, default=0.5,
+                               help="Failure rate over the last 20 requests that pauses requests (default: 0.5)")
+    breaker_group.add_argument("--circuit-cooldown", type=float, default=30.0,
+                               help="Seconds to pause before probing the API again (default: 30)")
+    breaker_group.add_argument("--circuit-max-trips", type=int, default=3,
+                               help="Failed recoveries in a row before aborting the run (default: 3)")
+    
+    # Deferred retry settings
+    retry_group = parser.add_argument_group("Deferred retries")
+    retry_group.add_argument("--retry-attempts", type=int, default=3,
+                             help="Retry rounds for rate-limited, server and network failures after the main pass "
+                                  "(default: 3)")
+    retry_group.add_argument("--retry-backoff", type=float, default=2.0,
+                             help="Seconds to wait before the first retry round, doubled each round (default: 2)")
     
+    # Daemon mode
+    daemon_group = parser.add_argument_group("Daemon mode")
+    daemon_group.add_argument("--daemon", action="store_true",
+                              help="Run retention on a schedule for the projects in --env-file, reloading it when it changes")
+    daemon_group.add_argument("--health-host", default="127.0.0.1",
+                              help="Address for the daemon health endpoint (default: 127.0.0.1)")
+    daemon_group.add_argument("--health-port", type=int, default=8080,
+                              help="Port for the daemon health endpoint (default: 8080)")
+    daemon_group.add_argument("--receiver", action="store_true",
+                              help="Instead of a schedule, prune a branch when CI posts a deployment event to "
+                                   "/events on the health endpoint")
+    daemon_group.add_argument("--debounce", type=float, default=5.0,
+                              help="Seconds without new events before a branch is pruned (default: 5)")
+    daemon_group.add_argument("--max-batch-delay", type=float, default=60.0,
+                              help="Longest a branch event waits while events keep arriving (default: 60)")
+    
+    # Record and replay
+    cassette_group = parser.add_argument_group("Record and replay")
+    cassette_group.add_argument("--record", metavar="CASSETTE",
+                                help="Record every request and response, with timings and redacted credentials, to this file")
+    cassette_group.add_argument("--replay", metavar="CASSETTE",
+                                help="Answer requests from a recorded cassette instead of the network")
+    cassette_group.add_argument("--replay-speed", type=float, default=1.0,
+                                help="Scale recorded response times when replaying; 0 replays without delays (default: 1)")
+    
+    # Inventory export
+    export_group = parser.add_argument_group("Inventory export")
+    export_group.add_argument("--export", metavar="PATH",
+                              help="Write every deployment (ID, creation time, environment, branch, status, aliases) "
+                                   "to this file instead of deleting anything; --project-name may list several "
+                                   "comma-separated projects")
+    export_group.add_argument("--export-format", choices=EXPORT_FORMATS,
+                              help="Export file format (default: from the file extension; parquet requires pyarrow)")
+    export_group.add_argument("--export-summary", metavar="PATH",
+                              help="Also write per-project, per-environment, per-age and per-branch counts as JSON")
+    
+    # Tracing
+    trace_group = parser.add_argument_group("Tracing")
+    trace_group.add_argument("--trace", metavar="PATH",
+                             help="Write a timeline of listing pages, requests, deletions, retries and waits as "
+                                  "Chrome trace-event JSON (open in Perfetto or chrome://tracing)")
+    trace_group.add_argument("--otlp-endpoint", metavar="URL",
+                             help="Send the run's spans to an OpenTelemetry collector over OTLP/HTTP, "
+                                  "e.g. http://localhost:4318")
+    
+    return parser
+
+
+def export_trace(tracer: Tracer, path: Optional[str], otlp_endpoint: Optional[str]):
+    """Write and send a finished run's trace; failures are reported without failing the run."""
+    if path:
+        try:
+            tracer.write_chrome_trace(path)
+            print(f"Trace of {len(tracer.spans)} spans written to {path}")
+        except OSError as e:
+            print(f"Could not write the trace to {path}: {e}")
+    if otlp_endpoint:
+        try:
+            tracer.export_otlp(otlp_endpoint)
+            print(f"Sent {len(tracer.spans)} spans to {otlp_endpoint}")
+        except ValueError as e:
+            print(e)
+
+
+def main():
+    parser = build_parser()
     args = parser.parse_args()
     
+    if args.receiver:
+        from .receiver import WebhookReceiver
+        
+        try:
+            WebhookReceiver(
+                args.env_file,
+                host=args.health_host,
+                port=args.health_port,
+                debounce=args.debounce,
+                max_delay=args.max_batch_delay,
+                verbose=args.verbose,
+            ).serve_forever()
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    
+    if args.daemon:
+        from .daemon import PruningDaemon
+        
+        try:
+            PruningDaemon(
+                args.env_file,
+                health_host=args.health_host,
+                health_port=args.health_port,
+                verbose=args.verbose,
+            ).serve_forever()
+        except ValueError as e:
+            parser.error(str(e))
+        return
+    
     # Try to load from env file if it exists
     env_vars = {}
     if os.path.exists(args.env_file):
@@ -317,7 +1464,12 @@ def main():
     
     # Get values from arguments, env file, or environment variables
     account_id = args.account_id or env_vars.get('CF_ACCOUNT_ID') or os.environ.get('CF_ACCOUNT_ID')
-    project_name = args.project_name or env_vars.get('CF_PAGES_PROJECT_NAME') or os.environ.get('CF_PAGES_PROJECT_NAME')
+    project_name_key = 'CF_WORKER_SCRIPT_NAME' if args.backend == "workers" else 'CF_PAGES_PROJECT_NAME'
+    project_name = args.project_name or env_vars.get(project_name_key) or os.environ.get(project_name_key)
+    if args.export and not project_name:
+        # Exports can cover every project the daemon manages
+        project_names_key = f"{project_name_key}S"
+        project_name = env_vars.get(project_names_key) or os.environ.get(project_names_key)
     api_token = args.api_token or env_vars.get('CF_API_TOKEN') or os.environ.get('CF_API_TOKEN') or os.environ.get('CLOUDFLARE_API_TOKEN')
     email = args.email or env_vars.get('CF_EMAIL') or os.environ.get('CF_EMAIL') or os.environ.get('CLOUDFLARE_EMAIL')
     api_key = args.api_key or env_vars.get('CF_API_KEY') or os.environ.get('CF_API_KEY') or os.environ.get('CLOUDFLARE_API_KEY')
@@ -327,7 +1479,14 @@ def main():
         parser.error("Account ID is required. Provide it via --account-id or CF_ACCOUNT_ID in env file/variables")
     
     if not project_name:
-        parser.error("Project name is required. Provide it via --project-name or CF_PAGES_PROJECT_NAME in env file/variables")
+        parser.error(f"Project name is required. Provide it via --project-name or {project_name_key} in env file/variables")
+    
+    if args.record and args.replay:
+        parser.error("--record and --replay cannot be used together")
+    
+    # Replays never reach the API, so credentials are optional
+    if args.replay and not (api_token or (email and api_key)):
+        api_token = "replay"
     
     # Validate auth inputs
     if not (api_token or (email and api_key)):
@@ -343,20 +1502,154 @@ def main():
         print(f"Page limit: {args.limit}")
         print()
     
+    export_projects = []
+    if args.export:
+        try:
+            export_format(args.export, args.export_format)
+        except ValueError as e:
+            parser.error(str(e))
+        export_projects = [name.strip() for name in project_name.split(",") if name.strip()]
+        project_name = export_projects[0]
+    
+    if args.backend == "workers" and (args.env or args.env_policy):
+        parser.error("--env and --env-policy cannot be used with --backend workers")
+    
+    env = args.env
+    if args.env_policy:
+        policies = {}
+        for policy in args.env_policy:
+            policies.update(policy)
+        unknown = [name for name in policies if name not in ("production", "preview")]
+        if unknown:
+            parser.error(f"Unknown environment in --env-policy: {', '.join(unknown)}")
+        # Policies without --env select their environments
+        names = parse_environments(args.env) or policies
+        env = {name: policies.get(name, EnvironmentPolicy()) for name in names}
+    
+    if args.connect_timeout <= 0 or args.read_timeout <= 0:
+        parser.error("--connect-timeout and --read-timeout must be positive")
+    if args.hedge_listing is not None and not 0 < args.hedge_listing < 100:
+        parser.error("--hedge-listing must be a percentile between 0 and 100")
+    if args.verify_sample < 0:
+        parser.error("--verify-sample must not be negative")
+    
+    try:
+        ledger = RequestLedger(
+            max_requests=args.max_requests,
+            window_requests=args.max_requests_per_window,
+            window=args.request_window,
+        )
+    except ValueError as e:
+        parser.error(str(e))
+    
+    try:
+        if args.replay:
+            transport = ReplayTransport(args.replay, speed=args.replay_speed)
+        else:
+            # Hedged listing requests need a connection of their own
+            transport = create_transport(
+                args.transport,
+                concurrency=total_concurrency(parse_environments(env), args.concurrency) + (1 if args.hedge_listing else 0),
+            )
+        if args.record:
+            transport = RecordingTransport(transport, args.record)
+    except (OSError, ValueError) as e:
+        parser.error(str(e))
+    
+    tracer = Tracer() if args.trace or args.otlp_endpoint else None
+    
     deleter = CloudflareDeploymentDeleter(
         account_id=account_id,
         project_name=project_name,
         email=email,
         api_key=api_key,
         api_token=api_token,
-        env=args.env,
+        env=env,
         dry_run=args.dry_run,
         verbose=args.verbose,
         force=args.force,
-        limit=args.limit
+        limit=args.limit,
+        circuit_breaker=CircuitBreaker(
+            failure_threshold=args.circuit_failures,
+            failure_rate=args.circuit_failure_rate,
+            reset_timeout=args.circuit_cooldown,
+            max_trips=args.circuit_max_trips,
+        ),
+        state_file=args.state_file,
+        keep=args.keep,
+        order=args.order,
+        max_duration=args.max_duration,
+        max_deletes=args.max_deletes,
+        concurrency=args.concurrency,
+        transport=transport,
+        drain_timeout=args.drain_timeout,
+        backend=args.backend,
+        ledger=ledger,
+        connect_timeout=args.connect_timeout,
+        read_timeout=args.read_timeout,
+        deadline=args.deadline,
+        hedge_percentile=args.hedge_listing,
+        tracer=tracer,
+        verify=args.verify,
+        verify_sample=args.verify_sample,
+        preflight=not (args.no_preflight or args.replay),
+        retry_queue=DeferredRetryQueue(
+            max_attempts=args.retry_attempts,
+            backoff=args.retry_backoff,
+        )
     )
     
-    deleter.run()
+    if args.export:
+        # Exports only list, so they must never send the delete permission probe
+        deleters = [deleter._derived(project_name=name, preflight=False) for name in export_projects]
+        try:
+            with open_writer(args.export, args.export_format) as writer:
+                summary = export_inventory(deleters, writer, hooks=deleter.hooks, concurrency=args.concurrency)
+            if args.export_summary:
+                with open(args.export_summary, "w") as f:
+                    json.dump(summary.to_dict(), f, indent=2)
+        except (OSError, ValueError) as e:
+            print(f"\n{e}\n")
+            sys.exit(1)
+        finally:
+            transport.close()
+            if tracer:
+                export_trace(tracer, args.trace, args.otlp_endpoint)
+        if summary.errors:
+            sys.exit(1)
+        return
+    
+    if args.estimate:
+        try:
+            deleter.estimate(sample_pages=args.estimate_pages)
+        except DeleterError as e:
+            print(f"\n{e}\n")
+            sys.exit(1)
+        finally:
+            transport.close()
+            if tracer:
+                export_trace(tracer, args.trace, args.otlp_endpoint)
+        return
+    
+    received_signals = []
+    previous_handlers = install_stop_handlers(deleter, received_signals)
+    try:
+        report = deleter.run()
+    except DeleterError as e:
+        print(f"\n{e}\n")
+        sys.exit(1)
+    finally:
+        for signum, handler in previous_handlers.items():
+            signal.signal(signum, handler)
+        transport.close()
+        if tracer:
+            export_trace(tracer, args.trace, args.otlp_endpoint)
+    
+    if received_signals:
+        # Conventional exit status for a process stopped by a signal
+        sys.exit(128 + received_signals[0])
+    if report.aborted:
+        sys.exit(1)
 
 
 if __name__ == "__main__":
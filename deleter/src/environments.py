@@ -0,0 +1,77 @@
+"""
+Per-environment settings for runs that cover several environments.
+
+``CloudflareDeploymentDeleter(env=...)`` accepts a single environment name as
+before, a comma-separated string or list of names, or a mapping of names to
+``EnvironmentPolicy``. With more than one environment, each one is listed and
+deleted by its own queue in parallel, so an aggressive preview purge never
+waits on a careful production one.
+
+    deleter = CloudflareDeploymentDeleter(
+        account_id, project, api_token=token,
+        env={
+            "preview": EnvironmentPolicy(concurrency=8),
+            "production": EnvironmentPolicy(concurrency=1, force=True, keep=5),
+        },
+    )
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Union
+
+
+@dataclass
+class EnvironmentPolicy:
+    """Settings for one environment's queue. ``None`` inherits the deleter's setting."""
+
+    concurrency: Optional[int] = None
+    force: Optional[bool] = None
+    keep: Optional[int] = None
+
+
+EnvSpec = Union[None, str, List[str], Dict[str, EnvironmentPolicy]]
+
+
+def parse_environments(env: EnvSpec) -> Dict[str, EnvironmentPolicy]:
+    """Normalise an ``env`` argument to a mapping of environment names to policies."""
+    if env is None:
+        return {}
+    if isinstance(env, dict):
+        return {name: policy or EnvironmentPolicy() for name, policy in env.items()}
+    if isinstance(env, str):
+        env = env.split(",")
+    names = [name.strip() for name in env if name.strip()]
+    return {name: EnvironmentPolicy() for name in names}
+
+
+def total_concurrency(environments: Dict[str, EnvironmentPolicy], default: int) -> int:
+    """Deletions in flight across all environment queues when they run in parallel."""
+    if len(environments) <= 1:
+        return default
+    return sum(default if policy.concurrency is None else policy.concurrency for policy in environments.values())
+
+
+def parse_policy(spec: str) -> Dict[str, EnvironmentPolicy]:
+    """Parse a ``--env-policy`` value such as ``production:concurrency=1,force=true,keep=5``."""
+    name, sep, settings = spec.partition(":")
+    if not sep or not name.strip():
+        raise ValueError(f"Invalid environment policy {spec!r}; expected ENV:KEY=VALUE[,KEY=VALUE...]")
+
+    policy = EnvironmentPolicy()
+    for setting in filter(None, (part.strip() for part in settings.split(","))):
+        key, sep, value = (part.strip() for part in setting.partition("="))
+        if not sep:
+            raise ValueError(f"Invalid setting {setting!r} in environment policy {spec!r}")
+        if key in ("concurrency", "keep"):
+            if not value.isdigit():
+                raise ValueError(f"Invalid value {value!r} for {key} in environment policy {spec!r}")
+            setattr(policy, key, int(value))
+        elif key == "force":
+            if value.lower() not in ("true", "false", "yes", "no", "1", "0"):
+                raise ValueError(f"Invalid value {value!r} for force in environment policy {spec!r}")
+            policy.force = value.lower() in ("true", "yes", "1")
+        else:
+            raise ValueError(f"Unknown setting {key!r} in environment policy {spec!r}; "
+                             "expected concurrency, force or keep")
+
+    return {name.strip(): policy}
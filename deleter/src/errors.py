@@ -0,0 +1,57 @@
+"""
+Exceptions raised by the Cloudflare deployment deleter.
+
+Every error derives from ``DeleterError`` so library callers can handle the
+whole family with a single ``except`` clause.
+"""
+
+from typing import Dict, List, Optional
+
+
+class DeleterError(Exception):
+    """Base class for all deleter errors."""
+
+
+class APIError(DeleterError):
+    """The Cloudflare API returned an unexpected or unsuccessful response."""
+
+    def __init__(self, message: str, status_code: Optional[int] = None, errors: Optional[List[Dict]] = None):
+        super().__init__(message)
+        self.status_code = status_code
+        self.errors = errors or []
+
+
+class AuthenticationError(APIError):
+    """The API token or key is invalid or expired."""
+
+
+class PermissionDeniedError(APIError):
+    """The credentials lack the permissions needed for the request."""
+
+
+class ProjectNotFoundError(APIError):
+    """The project or account does not exist."""
+
+
+class RateLimitError(APIError):
+    """Cloudflare's API rate limits were exceeded."""
+
+
+class NetworkError(DeleterError):
+    """The Cloudflare API could not be reached."""
+
+
+class CircuitOpenError(DeleterError):
+    """Raised when the circuit breaker has given up on the API."""
+
+
+class CassetteError(DeleterError):
+    """A replayed run made a request the cassette has no recorded response for."""
+
+
+class RequestBudgetError(DeleterError):
+    """The run's API request budget is used up."""
+
+
+class DeadlineExceededError(RequestBudgetError):
+    """The run's deadline passed before a request could be sent."""
@@ -0,0 +1,251 @@
+"""
+Streaming deployment inventory export.
+
+Each listing page is written out as soon as it arrives, so memory use stays
+at about one page per project being listed (plus one Parquet row group) no
+matter how many deployments an account has. Alongside the file, an
+``InventorySummary`` collects deployment counts per project, environment, age
+bucket and branch.
+
+    deleter = CloudflareDeploymentDeleter(account_id, project, api_token=token)
+    with open_writer("inventory.parquet") as writer:
+        summary = export_inventory([deleter], writer)
+
+The file is written under a temporary name and only moved into place once
+every project has been listed. An interrupted export, or one in which a
+project could not be listed, never leaves a truncated file behind.
+
+Parquet needs the optional ``pyarrow`` package.
+"""
+
+import csv
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+
+from .errors import DeleterError
+from .hooks import DeletionHooks
+from .index import deployment_branch
+from .report import InventorySummary
+
+EXPORT_FORMATS = ("ndjson", "csv", "parquet")
+
+# Columns of an exported record, in file order
+FIELDS = ("project", "id", "created_on", "environment", "branch", "commit_hash", "status", "aliases", "url")
+
+# File extensions that select a format when none is given
+EXTENSIONS = {".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "ndjson", ".csv": "csv", ".parquet": "parquet"}
+
+
+def deployment_record(project: str, deployment: Dict) -> Dict:
+    """Flatten one deployment from a listing page into an export record."""
+    trigger = (deployment.get("deployment_trigger") or {}).get("metadata") or {}
+    stage = deployment.get("latest_stage") or {}
+    return {
+        "project": project,
+        "id": deployment.get("id"),
+        "created_on": deployment.get("created_on"),
+        "environment": deployment.get("environment"),
+        "branch": deployment_branch(deployment),
+        "commit_hash": trigger.get("commit_hash"),
+        "status": stage.get("status"),
+        "aliases": list(deployment.get("aliases") or []),
+        "url": deployment.get("url"),
+    }
+
+
+def export_format(path: str, format: Optional[str] = None) -> str:
+    """The format to write ``path`` in: ``format`` if given, else guessed from the extension."""
+    if format:
+        if format not in EXPORT_FORMATS:
+            raise ValueError(f"Unknown export format {format!r}; expected one of {', '.join(EXPORT_FORMATS)}")
+        return format
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in EXTENSIONS:
+        raise ValueError(f"Cannot tell the export format from {path!r}; "
+                         f"use a .ndjson, .csv or .parquet file or pass the format")
+    return EXTENSIONS[extension]
+
+
+class InventoryWriter:
+    """Write batches of export records to a file.
+
+    Records go to ``<path>.partial``; ``close`` moves the finished file to
+    ``path`` and ``abort`` removes it.
+    """
+
+    format = ""
+
+    def __init__(self, path: str):
+        self.path = path
+        self.partial_path = f"{path}.partial"
+        self.count = 0
+        self.finished = False
+
+    def write(self, records: List[Dict]):
+        """Append records to the file."""
+        self._write(records)
+        self.count += len(records)
+
+    def close(self):
+        """Finish the file and move it into place."""
+        self.finished = True
+        self._close()
+        os.replace(self.partial_path, self.path)
+
+    def abort(self):
+        """Discard the partial file."""
+        self.finished = True
+        try:
+            self._close()
+        finally:
+            if os.path.exists(self.partial_path):
+                os.remove(self.partial_path)
+
+    def _write(self, records: List[Dict]):
+        raise NotImplementedError
+
+    def _close(self):
+        raise NotImplementedError
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if self.finished:
+            return
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()
+
+
+class NDJSONWriter(InventoryWriter):
+    """One JSON object per line."""
+
+    format = "ndjson"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(self.partial_path, "w", encoding="utf-8")
+
+    def _write(self, records):
+        self._file.writelines(json.dumps(record) + "\n" for record in records)
+
+    def _close(self):
+        self._file.close()
+
+
+class CSVWriter(InventoryWriter):
+    """Comma-separated values with a header row; aliases are separated by spaces."""
+
+    format = "csv"
+
+    def __init__(self, path: str):
+        super().__init__(path)
+        self._file = open(self.partial_path, "w", encoding="utf-8", newline="")
+        self._writer = csv.DictWriter(self._file, fieldnames=FIELDS)
+        self._writer.writeheader()
+
+    def _write(self, records):
+        self._writer.writerows({**record, "aliases": " ".join(record["aliases"])} for record in records)
+
+    def _close(self):
+        self._file.close()
+
+
+class ParquetWriter(InventoryWriter):
+    """Apache Parquet, written in row groups of ``row_group_size`` records."""
+
+    format = "parquet"
+
+    def __init__(self, path: str, row_group_size: int = 10000):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ValueError("Parquet export requires pyarrow: pip install pyarrow")
+
+        super().__init__(path)
+        self._pa = pa
+        self.row_group_size = row_group_size
+        self.schema = pa.schema(
+            [(name, pa.list_(pa.string()) if name == "aliases" else pa.string()) for name in FIELDS]
+        )
+        self._writer = pq.ParquetWriter(self.partial_path, self.schema)
+        self._rows: List[Dict] = []
+
+    def _write(self, records):
+        self._rows.extend(records)
+        if len(self._rows) >= self.row_group_size:
+            self._flush()
+
+    def _flush(self):
+        if self._rows:
+            self._writer.write_table(self._pa.Table.from_pylist(self._rows, schema=self.schema))
+            self._rows = []
+
+    def _close(self):
+        try:
+            self._flush()
+        finally:
+            self._writer.close()
+
+
+WRITERS = {"ndjson": NDJSONWriter, "csv": CSVWriter, "parquet": ParquetWriter}
+
+
+def open_writer(path: str, format: Optional[str] = None) -> InventoryWriter:
+    """Open a writer for ``path`` in ``format``, or the format its extension names."""
+    return WRITERS[export_format(path, format)](path)
+
+
+def export_inventory(
+    deleters: List,
+    writer: InventoryWriter,
+    hooks: Optional[DeletionHooks] = None,
+    concurrency: int = 1,
+) -> InventorySummary:
+    """Stream every deployment of each deleter's project to ``writer``.
+
+    Up to ``concurrency`` projects are listed at once. A project that cannot
+    be listed is recorded in ``summary.errors`` and the others carry on, so
+    the summary still covers them. The file is discarded in that case, since
+    it would be missing deployments.
+    """
+    hooks = hooks or DeletionHooks()
+    summary = InventorySummary(path=writer.path, format=writer.format)
+    lock = threading.Lock()
+
+    def export_project(deleter):
+        for data in deleter.iter_deployment_pages():
+            records = [deployment_record(deleter.project_name, deployment) for deployment in data["result"]]
+            with lock:
+                summary.projects.setdefault(deleter.project_name, 0)
+                writer.write(records)
+                for record in records:
+                    summary.add(record)
+                summary.listing_pages += 1
+
+    def run(deleter):
+        hooks.on_message(f"Exporting deployments of {deleter.project_name}...")
+        try:
+            export_project(deleter)
+        except DeleterError as e:
+            hooks.on_message(f"Could not export {deleter.project_name}: {e}")
+            with lock:
+                summary.errors[deleter.project_name] = str(e)
+
+    with ThreadPoolExecutor(max_workers=max(1, concurrency), thread_name_prefix="export") as executor:
+        # Surface anything other than API errors
+        for _ in executor.map(run, deleters):
+            pass
+
+    if summary.errors:
+        writer.abort()
+    summary.finished_at = time.time()
+    hooks.on_export(summary)
+    return summary
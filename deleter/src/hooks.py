@@ -0,0 +1,212 @@
+"""
+Progress hooks for the Cloudflare deployment deleter.
+
+The deleter reports everything it does through a ``DeletionHooks`` instance.
+``ConsoleHooks`` prints the familiar command-line output; library callers can
+pass the silent base class or their own subclass instead.
+"""
+
+import threading
+
+from .report import DeletionEstimate, DeletionReport, DeploymentOutcome, InventorySummary
+
+
+class DeletionHooks:
+    """Receive progress events from a deletion run. All methods are no-ops."""
+
+    def on_message(self, message: str):
+        """Informational or diagnostic output."""
+
+    def on_listing_page(self, page: int, total_pages: int, count: int):
+        """A listing page with ``count`` deployments was fetched."""
+
+    def on_deletion_start(self, index: int, total: int, deployment_id: str):
+        """A deployment is about to be deleted."""
+
+    def on_deletion_result(self, outcome: DeploymentOutcome, retryable: bool):
+        """A deletion attempt finished."""
+
+    def on_retry_round(self, attempt: int, max_attempts: int, delay: float, count: int):
+        """A round of deferred retries is about to start."""
+
+    def on_complete(self, report: DeletionReport):
+        """The run finished, successfully or not."""
+
+    def on_estimate(self, estimate: DeletionEstimate):
+        """A pre-flight estimate is ready."""
+
+    def on_export(self, summary: InventorySummary):
+        """An inventory export finished."""
+
+
+class ConsoleHooks(DeletionHooks):
+    """Print progress to stdout.
+
+    Deletion workers report from their own threads, so every line is printed
+    under a lock; ``print`` writes the text and the newline separately.
+    """
+
+    _lock = threading.Lock()
+
+    def _print(self, *args):
+        with self._lock:
+            print(*args)
+
+    def on_message(self, message: str):
+        self._print(message)
+
+    def on_listing_page(self, page: int, total_pages: int, count: int):
+        if page < total_pages:
+            self._print(f"Fetching page {page + 1} of {total_pages}...")
+
+    def on_deletion_start(self, index: int, total: int, deployment_id: str):
+        progress_pct = (index / total) * 100
+        self._print(f"[{index}/{total}] ({progress_pct:.1f}%) Deleting deployment: {deployment_id}")
+
+    def on_deletion_result(self, outcome: DeploymentOutcome, retryable: bool):
+        if outcome.success:
+            suffix = " on retry" if outcome.attempts > 1 else ""
+            self._print(f"✓ Successfully deleted deployment{suffix}: {outcome.deployment_id}")
+        elif retryable:
+            self._print(f"✗ Failed to delete deployment: {outcome.deployment_id} ({outcome.error_class}, will retry later)")
+        else:
+            self._print(f"✗ Failed to delete deployment: {outcome.deployment_id} ({outcome.error_class})")
+
+    def on_retry_round(self, attempt: int, max_attempts: int, delay: float, count: int):
+        self._print(f"\nRetrying {count} failed deployments in {delay:.1f}s (attempt {attempt}/{max_attempts})...")
+
+    def on_complete(self, report: DeletionReport):
+        if report.aborted:
+            self._print(f"\nAborting: {report.abort_reason}")
+        elif report.stop_reason:
+            self._print(f"\nStopped early: {report.stop_reason}")
+
+        if report.aborted or report.stop_reason:
+            self._print(f"Completed deletion: {report.deleted_count} deleted, {report.failed_count} failed, "
+                        f"{len(report.remaining)} remaining")
+        else:
+            self._print(f"Completed deletion: {report.deleted_count} deleted, {report.failed_count} failed")
+        for error_class, count in report.error_classes.items():
+            self._print(f"  {error_class}: {count}")
+
+        if report.remaining_by_env:
+            breakdown = ", ".join(f"{env}: {count}" for env, count in report.remaining_by_env.items())
+            self._print(f"Remaining by environment: {breakdown}")
+
+        verification = report.verification
+        if verification is not None:
+            status = "verified" if verification.verified else "NOT verified"
+            self._print(f"Verification: {status} with {verification.requests} requests")
+            if verification.total_after is not None:
+                expected = "unknown" if verification.expected_after is None else verification.expected_after
+                self._print(f"  Deployments listed: {verification.total_before} before, {verification.total_after} after "
+                            f"(expected {expected}, {verification.new_deployments} new)")
+            if verification.sampled:
+                self._print(f"  Sampled lookups: {verification.sampled}, {len(verification.still_present)} still present, "
+                            f"{verification.unchecked} inconclusive")
+            if verification.still_present:
+                self._print(f"  Deleted again: {verification.redeleted} of {len(verification.still_present)}")
+            if verification.discrepancy and verification.discrepancy > 0 and not verification.still_present:
+                self._print(f"  {verification.discrepancy} more deployments remain than expected; "
+                            f"a full run will find them")
+            if verification.error:
+                self._print(f"  Incomplete: {verification.error}")
+
+        if report.request_count:
+            attempts = 0 if report.dry_run else report.deletion_attempts
+            self._print(f"API requests: {report.request_count} ({report.listing_pages} listing pages, "
+                        f"{attempts} deletion attempts, {report.extra_requests} other)")
+            if report.hedged_requests:
+                self._print(f"  Hedged listing requests: {report.hedged_requests}")
+            for row in report.request_breakdown:
+                self._print(f"  {row['method']} {row['endpoint']} {row['status']}: {row['count']}")
+
+    def on_estimate(self, estimate: DeletionEstimate):
+        pages = ", ".join(str(page) for page in estimate.sampled_pages)
+        self._print(f"\nEstimate for {estimate.project_name} (sampled pages {pages} of {estimate.total_pages}, "
+                    f"{estimate.sampled_deployments} deployments):")
+        self._print(f"  Deployments: {estimate.total_count} total, ~{estimate.to_delete} to delete"
+                    + (f", {estimate.protected} active kept" if estimate.protected else ""))
+        if estimate.environment_mix:
+            mix = ", ".join(f"{env} {share:.0%}" for env, share in estimate.environment_mix.items())
+            self._print(f"  Environment mix: {mix}")
+        if estimate.expected_aliased_failures:
+            self._print(f"  Aliased: ~{estimate.aliased_fraction:.0%} "
+                        f"(~{estimate.expected_aliased_failures} deletions will fail without --force)")
+        self._print(f"  Requests: ~{estimate.request_count} ({estimate.listing_requests} listing + "
+                    f"{estimate.delete_requests} delete), not counting retries")
+        self._print(f"  Throughput: ~{estimate.deletions_per_second:.1f} deletions/s "
+                    f"with concurrency {estimate.concurrency}"
+                    + (" (capped by the API rate limit)" if estimate.rate_limited else ""))
+        self._print(f"  Duration: ~{format_duration(estimate.duration)} "
+                    f"(listing {format_duration(estimate.listing_duration)}, "
+                    f"deletion {format_duration(estimate.deletion_duration)})")
+        if estimate.within_time_budget is False:
+            self._print(f"  Time budget of {estimate.time_budget:g}s is not enough; rerun with --state-file to continue "
+                        f"where each run stops")
+
+    def on_export(self, summary: InventorySummary):
+        projects = f"{len(summary.projects)} project" + ("" if len(summary.projects) == 1 else "s")
+        if summary.errors:
+            self._print(f"\nListed {summary.total} deployments from {projects} in {format_duration(summary.duration)}; "
+                        f"{summary.path} was not written because some projects failed")
+        else:
+            self._print(f"\nExported {summary.total} deployments from {projects} to {summary.path} ({summary.format}) "
+                        f"in {format_duration(summary.duration)}")
+        if summary.environments:
+            self._print("  By environment: " + ", ".join(f"{env} {count}" for env, count in summary.environments.items()))
+        ages = summary.to_dict()["ages"]
+        if ages:
+            self._print("  By age: " + ", ".join(f"{label} {sum(counts.values())}" for label, counts in ages.items()))
+        if summary.aliased:
+            self._print(f"  Aliased: {summary.aliased}")
+        top = summary.top_branches()
+        if top:
+            self._print("  Busiest branches:")
+            for row in top:
+                self._print(f"    {row['project']} {row['branch']}: {row['count']} "
+                            f"(oldest {row['oldest'] or '-'}, newest {row['newest'] or '-'})")
+        for project, error in summary.errors.items():
+            self._print(f"  Failed: {project}: {error}")
+
+
+class EnvironmentHooks(DeletionHooks):
+    """Forward one environment queue's events to the run's hooks.
+
+    Messages are tagged with the environment. ``on_complete`` is not forwarded;
+    the combined report is passed on once every queue has finished.
+    """
+
+    def __init__(self, hooks: DeletionHooks, env: str):
+        self.hooks = hooks
+        self.env = env
+
+    def on_message(self, message: str):
+        text = message.lstrip("\n")
+        self.hooks.on_message(f"{message[:len(message) - len(text)]}[{self.env}] {text}")
+
+    def on_listing_page(self, page: int, total_pages: int, count: int):
+        self.hooks.on_listing_page(page, total_pages, count)
+
+    def on_deletion_start(self, index: int, total: int, deployment_id: str):
+        self.hooks.on_deletion_start(index, total, deployment_id)
+
+    def on_deletion_result(self, outcome: DeploymentOutcome, retryable: bool):
+        self.hooks.on_deletion_result(outcome, retryable)
+
+    def on_retry_round(self, attempt: int, max_attempts: int, delay: float, count: int):
+        self.hooks.on_retry_round(attempt, max_attempts, delay, count)
+
+    def on_estimate(self, estimate: DeletionEstimate):
+        self.hooks.on_estimate(estimate)
+
+
+def format_duration(seconds: float) -> str:
+    """Format seconds as e.g. ``1h 5m``, ``4m 38s`` or ``12.5s``."""
+    if seconds < 60:
+        return f"{seconds:.1f}s"
+    minutes, secs = divmod(int(round(seconds)), 60)
+    if minutes < 60:
+        return f"{minutes}m {secs}s"
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours}h {minutes}m"
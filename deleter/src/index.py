@@ -0,0 +1,72 @@
+"""
+In-memory deployment index for long-running processes.
+
+Cloudflare lists deployments newest first, so once a project has been listed
+completely, later refreshes only need the pages that contain deployments the
+index has not seen yet. In steady state that is a single listing request.
+"""
+
+import threading
+from typing import Dict, Iterable, List, Optional
+
+
+def deployment_branch(deployment: Dict) -> Optional[str]:
+    """Git branch a deployment was built from, if the listing says."""
+    trigger = (deployment.get("deployment_trigger") or {}).get("metadata") or {}
+    return trigger.get("branch")
+
+
+class DeploymentIndex:
+    """Known deployments of one project, refreshed incrementally."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._deployments: Dict[str, Dict] = {}
+        self.complete = False
+
+    def __len__(self) -> int:
+        return len(self._deployments)
+
+    def __contains__(self, deployment_id: str) -> bool:
+        return deployment_id in self._deployments
+
+    def deployments(self) -> List[Dict]:
+        """Known deployments, newest first."""
+        with self._lock:
+            return list(self._deployments.values())
+
+    def refresh(self, deleter) -> List[Dict]:
+        """Bring the index up to date using ``deleter``'s listing and return new deployments.
+
+        The first refresh lists every page. Later refreshes stop at the first
+        page that contains an already known deployment.
+        """
+        listed = []
+        stopped_early = False
+
+        for data in deleter.iter_deployment_pages():
+            page = data["result"]
+            listed.extend(page)
+            if self.complete and any(deployment["id"] in self for deployment in page):
+                stopped_early = True
+                break
+
+        with self._lock:
+            if stopped_early:
+                new = [deployment for deployment in listed if deployment["id"] not in self._deployments]
+                merged = {deployment["id"]: deployment for deployment in new}
+                merged.update(self._deployments)
+                self._deployments = merged
+            else:
+                # A full listing also drops deployments removed by someone else
+                new = [deployment for deployment in listed if deployment["id"] not in self._deployments]
+                self._deployments = {deployment["id"]: deployment for deployment in listed}
+                self.complete = True
+
+        return new
+
+    def remove(self, deployment_ids: Iterable[str]):
+        """Forget deployments that have been deleted."""
+        with self._lock:
+            for deployment_id in deployment_ids:
+                self._deployments.pop(deployment_id, None)
@@ -0,0 +1,141 @@
+"""
+Pre-flight credential and permission checks.
+
+Without them, a revoked token or a token without the edit permission only
+shows up at the first DELETE, after the whole listing has been paginated.
+The checks cost two requests:
+
+- the credentials are verified with ``GET /user/tokens/verify`` for API
+  tokens, falling back to ``GET /accounts/{account_id}/tokens/verify`` for
+  account-owned tokens, or ``GET /user`` for an email and global API key;
+- the edit permission is probed by deleting a deployment ID that cannot
+  exist. A token that may delete gets a "not found" back; one that may not
+  gets a 403 or an authentication error. Nothing is deleted. Dry runs skip
+  this probe.
+
+``CloudflareDeploymentDeleter(preflight=True)`` starts the checks on a
+background thread together with the first listing page and raises their
+error before fetching the next page. If that page was listed successfully, a
+rejected credential check is only reported, since the listing has just shown
+the credentials work. Results are cached for the life of the
+process per credentials, account and backend, so further projects and
+environment queues don't repeat them. Only authentication and permission
+failures are cached. Anything else, such as a network error, leaves the
+check inconclusive and the run goes ahead.
+"""
+
+import hashlib
+import json
+import threading
+from concurrent.futures import Future
+from typing import Dict, Tuple
+
+from .errors import AuthenticationError, PermissionDeniedError
+
+# A deployment ID no real deployment has, for the permission probe
+PROBE_DEPLOYMENT_ID = "00000000-0000-0000-0000-000000000000"
+
+_lock = threading.Lock()
+_checks: Dict[Tuple, Future] = {}
+
+
+def preflight_key(deleter) -> Tuple:
+    """Cache key for a deleter's checks; the credentials are hashed, never stored."""
+    credentials = hashlib.sha256(json.dumps(sorted(deleter.headers.items())).encode()).hexdigest()
+    return credentials, deleter.base_url, deleter.account_id, deleter.backend.name, not deleter.dry_run
+
+
+def start_preflight(deleter) -> Future:
+    """Start the checks for ``deleter`` in the background, or return the cached ones.
+
+    The future's result is True once the checks passed and False if they were
+    inconclusive. A failed check raises ``AuthenticationError`` or
+    ``PermissionDeniedError`` from ``result()``.
+    """
+    key = preflight_key(deleter)
+    with _lock:
+        future = _checks.get(key)
+        if future is not None:
+            return future
+        future = _checks[key] = Future()
+
+    threading.Thread(target=_run_checks, args=(deleter, key, future), name="preflight", daemon=True).start()
+    return future
+
+
+def clear_preflight_cache():
+    """Forget cached results, e.g. after rotating credentials."""
+    with _lock:
+        _checks.clear()
+
+
+def _run_checks(deleter, key: Tuple, future: Future):
+    try:
+        verify_credentials(deleter)
+        if not deleter.dry_run:
+            probe_delete_permission(deleter)
+    except (AuthenticationError, PermissionDeniedError) as e:
+        future.set_exception(e)
+    except Exception as e:
+        # Not a verdict on the credentials; let a later run check again
+        with _lock:
+            _checks.pop(key, None)
+        deleter.hooks.on_message(f"Pre-flight check inconclusive, continuing: {e}")
+        future.set_result(False)
+    else:
+        future.set_result(True)
+
+
+def verify_credentials(deleter):
+    """Raise ``AuthenticationError`` unless Cloudflare accepts the deleter's credentials."""
+    token = "Authorization" in deleter.headers
+    # Account-owned tokens are only known to their account's verify endpoint
+    endpoints = ["/user/tokens/verify", "/accounts/{account_id}/tokens/verify"] if token else ["/user"]
+    for endpoint in endpoints:
+        path = endpoint.format(account_id=deleter.account_id)
+        response = deleter._request("GET", f"{deleter.base_url}{path}", endpoint=endpoint)
+        if response.status_code not in (400, 401, 403):
+            break
+
+    if response.status_code in (400, 401, 403):
+        kind = "API token" if token else "email and API key"
+        raise AuthenticationError(
+            f"Authentication Error: Cloudflare rejected the {kind} (HTTP {response.status_code}).\n"
+            "Please check that the credentials are correct, have not expired or been revoked, and\n"
+            "contain no extra spaces or characters.",
+            response.status_code, _errors(response),
+        )
+
+    if token and response.status_code == 200:
+        status = (_body(response).get("result") or {}).get("status")
+        if status and status != "active":
+            raise AuthenticationError(
+                f"Authentication Error: The API token is {status}. Please create or re-enable a token "
+                f"with the {deleter.backend.permissions} permissions.",
+                response.status_code,
+            )
+
+
+def probe_delete_permission(deleter):
+    """Raise ``PermissionDeniedError`` if the credentials may not delete deployments."""
+    path = deleter.backend.delete_path(deleter.account_id, deleter.project_name, PROBE_DEPLOYMENT_ID)
+    response = deleter._request("DELETE", f"{deleter.base_url}{path}", endpoint=deleter._delete_endpoint)
+
+    if response.status_code in (401, 403) or deleter._is_auth_failure(response):
+        raise PermissionDeniedError(
+            f"Permission Error: Your API token cannot delete deployments in account '{deleter.account_id}'.\n"
+            f"Please ensure your token has the {deleter.backend.permissions} permissions.",
+            response.status_code, _errors(response),
+        )
+
+
+def _body(response) -> Dict:
+    try:
+        body = response.json()
+    except ValueError:
+        return {}
+    return body if isinstance(body, dict) else {}
+
+
+def _errors(response):
+    return _body(response).get("errors") or []
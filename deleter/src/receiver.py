@@ -0,0 +1,286 @@
+"""
+Event-driven pruning through a local webhook receiver.
+
+Instead of listing every project on a timer, CI posts an event whenever it
+deploys a branch, and the receiver applies retention to just that branch::
+
+    curl -X POST http://127.0.0.1:8080/events \\
+         -H "Authorization: Bearer $PRUNE_WEBHOOK_SECRET" \\
+         -d '{"project": "site-a", "branch": "feature-x"}'
+
+Events are debounced per project and branch. A branch is handled once no new
+event for it has arrived for ``debounce`` seconds, or ``max_delay`` seconds
+after its first pending event, whichever comes first. Due branches of a
+project are handled as one batch: the project's ``DeploymentIndex`` is
+refreshed incrementally (usually one listing page, since new deployments come
+first) and only deployments of those branches outside the ``PRUNE_KEEP``
+newest are deleted. After the first full listing of a project, API usage
+grows with the rate of deployments, not with the size of the project.
+
+The receiver reads the same configuration file as ``PruningDaemon`` and also
+serves ``/healthz``. Set ``PRUNE_WEBHOOK_SECRET`` to require a bearer token.
+"""
+
+import hmac
+import json
+import signal
+import threading
+import time
+from typing import Callable, Dict, List, Optional, Set, Tuple
+
+import requests
+
+from .daemon import CONFIG_POLL_INTERVAL, PruningDaemon
+from .delete_deployments import CloudflareDeploymentDeleter, select_expired
+from .environments import parse_environments
+from .errors import DeleterError
+from .hooks import DeletionHooks
+from .index import DeploymentIndex, deployment_branch
+from .report import DeletionReport
+from .retry_queue import NOT_FOUND
+
+# Largest request body accepted on /events, in bytes
+MAX_EVENT_BODY = 1024 * 1024
+
+
+class WebhookReceiver(PruningDaemon):
+    """Apply per-branch retention when CI reports new deployments."""
+
+    def __init__(
+        self,
+        config_path: str,
+        host: str = "127.0.0.1",
+        port: int = 8080,
+        debounce: float = 5.0,
+        max_delay: float = 60.0,
+        hooks: Optional[DeletionHooks] = None,
+        session: Optional[requests.Session] = None,
+        verbose: bool = False,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        super().__init__(config_path, health_host=host, health_port=port, hooks=hooks, session=session, verbose=verbose)
+        if debounce < 0 or max_delay < debounce:
+            raise ValueError("debounce must not be negative or longer than max_delay")
+        self.debounce = debounce
+        self.max_delay = max_delay
+        self._clock = clock
+        # project -> branch -> (first pending event, latest event)
+        self._pending: Dict[str, Dict[str, Tuple[float, float]]] = {}
+        self._pending_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._branch_deleters: Dict[str, CloudflareDeploymentDeleter] = {}
+
+    def reload_config(self) -> bool:
+        changed = super().reload_config()
+        if changed:
+            self._branch_deleters.clear()
+            with self._pending_lock:
+                for project in list(self._pending):
+                    if project not in self.config.projects:
+                        del self._pending[project]
+        return changed
+
+    def submit(self, events: List[Dict]) -> int:
+        """Queue ``{"project": ..., "branch": ...}`` events and return how many were accepted.
+
+        ``project`` may be left out when only one project is configured.
+        Raises ``ValueError`` for malformed events or unknown projects; nothing
+        is queued in that case.
+        """
+        parsed = []
+        for event in events:
+            if not isinstance(event, dict) or not isinstance(event.get("branch"), str) or not event["branch"]:
+                raise ValueError("Each event needs a non-empty \"branch\"")
+            project = event.get("project")
+            if project is None and len(self.config.projects) == 1:
+                project = self.config.projects[0]
+            if project not in self.config.projects:
+                raise ValueError(f"Unknown project {project!r}")
+            parsed.append((project, event["branch"]))
+
+        now = self._clock()
+        with self._pending_lock:
+            for project, branch in parsed:
+                first, _ = self._pending.setdefault(project, {}).get(branch, (now, now))
+                self._pending[project][branch] = (first, now)
+        self._wake.set()
+        return len(parsed)
+
+    def pending(self) -> Dict[str, List[str]]:
+        """Branches waiting to be pruned, per project."""
+        with self._pending_lock:
+            return {project: sorted(branches) for project, branches in self._pending.items() if branches}
+
+    def due_batches(self) -> Dict[str, Set[str]]:
+        """Take the branches whose debounce or maximum delay has passed, grouped by project."""
+        now = self._clock()
+        due = {}
+        with self._pending_lock:
+            for project, branches in self._pending.items():
+                ready = {
+                    branch for branch, (first, last) in branches.items()
+                    if now - last >= self.debounce or now - first >= self.max_delay
+                }
+                for branch in ready:
+                    del branches[branch]
+                if ready:
+                    due[project] = ready
+        return due
+
+    def next_due(self) -> Optional[float]:
+        """Clock time at which the next pending branch becomes due."""
+        with self._pending_lock:
+            times = [
+                min(last + self.debounce, first + self.max_delay)
+                for branches in self._pending.values()
+                for first, last in branches.values()
+            ]
+        return min(times, default=None)
+
+    def prune_branches(self, project: str, branches: Set[str]) -> Optional[DeletionReport]:
+        """Refresh a project's index and delete superseded deployments of ``branches``."""
+        index = self._indexes.setdefault(project, DeploymentIndex())
+        deleter = self._branch_deleter(project)
+        deleter.circuit_breaker.reset()
+
+        new = index.refresh(deleter)
+        environments = parse_environments(self.config.env)
+        candidates = [
+            deployment for deployment in index.deployments()
+            if deployment_branch(deployment) in branches
+            and (not environments or deployment.get("environment") in environments)
+        ]
+        expired = select_expired(candidates, self.config.keep, key=deployment_branch)
+        self.hooks.on_message(
+            f"{project}: {len(new)} new deployments; {len(expired)} superseded on {', '.join(sorted(branches))}"
+        )
+        if not expired:
+            return None
+
+        report = deleter.run(deployments=expired)
+        if not deleter.dry_run:
+            index.remove(
+                deployment_id
+                for deployment_id, outcome in report.outcomes.items()
+                if outcome.success or outcome.error_class == NOT_FOUND
+            )
+        return report
+
+    def flush_due(self):
+        """Prune every batch that is due."""
+        for project, branches in self.due_batches().items():
+            if self.stopping:
+                break
+
+            status = self.status.setdefault(project, {})
+            status["last_run"] = time.time()
+            status["branches"] = sorted(branches)
+            try:
+                report = self.prune_branches(project, branches)
+            except DeleterError as e:
+                self.hooks.on_message(f"{project}: pruning failed: {e}")
+                status.update(ok=False, error=str(e))
+                continue
+
+            status.update(ok=True, error=None, known_deployments=len(self._indexes[project]))
+            if report is not None:
+                status.update(
+                    ok=not report.aborted,
+                    error=report.abort_reason,
+                    deleted=status.get("deleted", 0) + report.deleted_count,
+                    failed=status.get("failed", 0) + report.failed_count,
+                )
+
+    def health(self) -> Dict:
+        payload = super().health()
+        payload["pending"] = self.pending()
+        return payload
+
+    def serve_forever(self):
+        """Receive events and prune due batches until ``stop`` is called or a signal arrives."""
+        self.reload_config()
+        previous_handlers = self._install_signal_handlers()
+        self._start_health_server()
+        self.hooks.on_message(f"Receiving deployment events on http://{self.health_host}:{self.health_port}/events")
+
+        try:
+            while not self.stopping:
+                self.reload_config()
+                self.flush_due()
+
+                timeout = CONFIG_POLL_INTERVAL
+                due = self.next_due()
+                if due is not None:
+                    timeout = max(0.0, min(due - self._clock(), timeout))
+                self._wake.wait(timeout)
+                self._wake.clear()
+        finally:
+            dropped = sum(len(branches) for branches in self.pending().values())
+            if dropped:
+                self.hooks.on_message(f"Dropping {dropped} pending branch events; the next event for a branch catches up")
+            self.hooks.on_message("Shutting down webhook receiver")
+            if self._server:
+                self._server.shutdown()
+                self._server.server_close()
+            for signum, handler in previous_handlers.items():
+                signal.signal(signum, handler)
+
+    def stop(self):
+        super().stop()
+        for deleter in list(self._branch_deleters.values()):
+            deleter.request_stop("receiver shutting down")
+        self._wake.set()
+
+    def _branch_deleter(self, project: str) -> CloudflareDeploymentDeleter:
+        # Retention is decided per branch here, so the deleter must not apply its own
+        if project not in self._branch_deleters:
+            self._branch_deleters[project] = self._deleter(project)._derived(keep=0)
+        return self._branch_deleters[project]
+
+    def _authorized(self, header: Optional[str]) -> bool:
+        secret = self.config.webhook_secret
+        if not secret:
+            return True
+        return hmac.compare_digest((header or "").encode(), f"Bearer {secret}".encode())
+
+    def _handler_class(self):
+        receiver = self
+        base = super()._handler_class()
+
+        class EventHandler(base):
+            def do_POST(self):
+                if self.path not in ("/events", "/webhook"):
+                    self.send_error(404)
+                    return
+                if not receiver._authorized(self.headers.get("Authorization")):
+                    self._reply(401, {"error": "invalid or missing bearer token"})
+                    return
+
+                try:
+                    length = int(self.headers.get("Content-Length") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    self._reply(400, {"error": "invalid Content-Length"})
+                    return
+                if length > MAX_EVENT_BODY:
+                    self._reply(413, {"error": "request body too large"})
+                    return
+                try:
+                    body = json.loads(self.rfile.read(length) or b"null")
+                    events = body if isinstance(body, list) else [body]
+                    accepted = receiver.submit(events)
+                except ValueError as e:
+                    self._reply(400, {"error": str(e)})
+                    return
+                self._reply(202, {"accepted": accepted, "pending": receiver.pending()})
+
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        return EventHandler
@@ -0,0 +1,307 @@
+"""
+Structured results of a deletion run.
+
+``CloudflareDeploymentDeleter.run`` returns a ``DeletionReport`` so the
+deleter can be driven in-process without scraping its console output.
+"""
+
+import time
+from collections import Counter
+from dataclasses import asdict, dataclass, field
+from datetime import datetime
+from typing import Dict, List, Optional
+
+# Upper bounds in days of the deployment age buckets in inventory summaries
+AGE_BUCKETS = ((1, "<1d"), (7, "1-7d"), (30, "7-30d"), (90, "30-90d"), (365, "90-365d"), (None, ">365d"))
+
+
+@dataclass
+class DeploymentOutcome:
+    """Result of deleting a single deployment."""
+
+    deployment_id: str
+    success: bool = False
+    error_class: Optional[str] = None
+    attempts: int = 0
+    duration: float = 0.0
+
+
+@dataclass
+class DeletionReport:
+    """Summary of a deletion run for one project."""
+
+    project_name: str
+    env: Optional[str] = None
+    dry_run: bool = False
+    found: int = 0
+    outcomes: Dict[str, DeploymentOutcome] = field(default_factory=dict)
+    remaining: List[str] = field(default_factory=list)
+    listing_pages: int = 0
+    hedged_requests: int = 0
+    listing_duration: float = 0.0
+    deletion_duration: float = 0.0
+    requests: Dict[str, int] = field(default_factory=dict)
+    request_breakdown: List[Dict] = field(default_factory=list)
+    remaining_by_env: Dict[str, int] = field(default_factory=dict)
+    aborted: bool = False
+    abort_reason: Optional[str] = None
+    stop_reason: Optional[str] = None
+    verification: Optional["VerificationResult"] = None
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def deleted_count(self) -> int:
+        return sum(1 for outcome in self.outcomes.values() if outcome.success)
+
+    @property
+    def failed_count(self) -> int:
+        return sum(1 for outcome in self.outcomes.values() if not outcome.success)
+
+    @property
+    def retries(self) -> int:
+        return sum(max(0, outcome.attempts - 1) for outcome in self.outcomes.values())
+
+    @property
+    def request_count(self) -> int:
+        return sum(self.requests.values())
+
+    @property
+    def deletion_attempts(self) -> int:
+        return sum(outcome.attempts for outcome in self.outcomes.values())
+
+    @property
+    def extra_requests(self) -> int:
+        """Requests beyond one per listing page and deletion attempt, such as retried or hedged pages."""
+        expected = self.listing_pages + (0 if self.dry_run else self.deletion_attempts)
+        return max(0, self.request_count - expected)
+
+    @property
+    def error_classes(self) -> Dict[str, int]:
+        """Failed deployment counts grouped by error class."""
+        counts = Counter(
+            outcome.error_class for outcome in self.outcomes.values() if not outcome.success
+        )
+        return dict(sorted(counts.items()))
+
+    @property
+    def duration(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    def outcome(self, deployment_id: str) -> DeploymentOutcome:
+        """Get or create the outcome record for a deployment."""
+        if deployment_id not in self.outcomes:
+            self.outcomes[deployment_id] = DeploymentOutcome(deployment_id)
+        return self.outcomes[deployment_id]
+
+    def to_dict(self) -> Dict:
+        """Convert the report to plain JSON-serializable data."""
+        data = asdict(self)
+        data["outcomes"] = list(data["outcomes"].values())
+        data.update(
+            deleted_count=self.deleted_count,
+            failed_count=self.failed_count,
+            retries=self.retries,
+            request_count=self.request_count,
+            deletion_attempts=self.deletion_attempts,
+            extra_requests=self.extra_requests,
+            error_classes=self.error_classes,
+            duration=self.duration,
+        )
+        if self.verification is not None:
+            data["verification"] = self.verification.to_dict()
+        return data
+
+
+@dataclass
+class VerificationResult:
+    """Post-run check that deletions took effect, from listing counts and sampled lookups."""
+
+    total_before: Optional[int] = None
+    total_after: Optional[int] = None
+    expected_after: Optional[int] = None
+    new_deployments: int = 0
+    sampled: int = 0
+    unchecked: int = 0
+    still_present: List[str] = field(default_factory=list)
+    redeleted: int = 0
+    requests: int = 0
+    duration: float = 0.0
+    error: Optional[str] = None
+
+    @property
+    def discrepancy(self) -> Optional[int]:
+        """Deployments left beyond the expected count; negative if others were deleted meanwhile."""
+        if self.total_after is None or self.expected_after is None:
+            return None
+        return self.total_after - self.expected_after
+
+    @property
+    def verified(self) -> bool:
+        """Whether the count and every sampled lookup confirm the deletions."""
+        return (
+            self.error is None
+            and self.discrepancy is not None and self.discrepancy <= 0
+            and not self.still_present
+            and not self.unchecked
+        )
+
+    def merge(self, other: "VerificationResult"):
+        """Add another queue's result, e.g. of a different environment."""
+        for name in ("total_before", "total_after", "expected_after"):
+            mine, theirs = getattr(self, name), getattr(other, name)
+            setattr(self, name, None if mine is None or theirs is None else mine + theirs)
+        self.new_deployments += other.new_deployments
+        self.sampled += other.sampled
+        self.unchecked += other.unchecked
+        self.still_present.extend(other.still_present)
+        self.redeleted += other.redeleted
+        self.requests += other.requests
+        self.duration = max(self.duration, other.duration)
+        self.error = self.error or other.error
+
+    def to_dict(self) -> Dict:
+        """Convert the result to plain JSON-serializable data."""
+        data = asdict(self)
+        data.update(discrepancy=self.discrepancy, verified=self.verified)
+        return data
+
+
+@dataclass
+class DeletionEstimate:
+    """Projected size and cost of a run, from a sample of the listing."""
+
+    project_name: str
+    env: Optional[str] = None
+    total_count: int = 0
+    total_pages: int = 0
+    sampled_pages: List[int] = field(default_factory=list)
+    sampled_deployments: int = 0
+    environment_mix: Dict[str, float] = field(default_factory=dict)
+    aliased_fraction: float = 0.0
+    protected: int = 0
+    to_delete: int = 0
+    expected_aliased_failures: int = 0
+    listing_requests: int = 0
+    delete_requests: int = 0
+    page_latency: float = 0.0
+    listing_duration: float = 0.0
+    deletion_duration: float = 0.0
+    deletions_per_second: float = 0.0
+    concurrency: int = 1
+    rate_limited: bool = False
+    time_budget: Optional[float] = None
+
+    @property
+    def request_count(self) -> int:
+        return self.listing_requests + self.delete_requests
+
+    @property
+    def duration(self) -> float:
+        return self.listing_duration + self.deletion_duration
+
+    @property
+    def within_time_budget(self) -> Optional[bool]:
+        if self.time_budget is None:
+            return None
+        return self.duration <= self.time_budget
+
+    def to_dict(self) -> Dict:
+        """Convert the estimate to plain JSON-serializable data."""
+        data = asdict(self)
+        data.update(
+            request_count=self.request_count,
+            duration=self.duration,
+            within_time_budget=self.within_time_budget,
+        )
+        return data
+
+
+def age_bucket(created_on: Optional[str], now: float) -> str:
+    """Age bucket of a deployment created at the ISO 8601 time ``created_on``."""
+    if not created_on:
+        return "unknown"
+    try:
+        created = datetime.fromisoformat(created_on.replace("Z", "+00:00")).timestamp()
+    except ValueError:
+        return "unknown"
+    days = (now - created) / 86400
+    for limit, label in AGE_BUCKETS:
+        if limit is None or days < limit:
+            return label
+
+
+@dataclass
+class BranchSummary:
+    """Deployments of one branch in an inventory."""
+
+    count: int = 0
+    oldest: Optional[str] = None
+    newest: Optional[str] = None
+
+
+@dataclass
+class InventorySummary:
+    """Aggregates of an exported deployment inventory."""
+
+    path: Optional[str] = None
+    format: Optional[str] = None
+    projects: Dict[str, int] = field(default_factory=dict)
+    environments: Dict[str, int] = field(default_factory=dict)
+    ages: Dict[str, Dict[str, int]] = field(default_factory=dict)
+    branches: Dict[str, Dict[str, BranchSummary]] = field(default_factory=dict)
+    aliased: int = 0
+    listing_pages: int = 0
+    errors: Dict[str, str] = field(default_factory=dict)
+    started_at: float = field(default_factory=time.time)
+    finished_at: Optional[float] = None
+
+    @property
+    def total(self) -> int:
+        return sum(self.projects.values())
+
+    @property
+    def duration(self) -> float:
+        end = self.finished_at if self.finished_at is not None else time.time()
+        return end - self.started_at
+
+    def add(self, record: Dict):
+        """Count one exported deployment record."""
+        project = record["project"]
+        environment = record.get("environment") or "unknown"
+        self.projects[project] = self.projects.get(project, 0) + 1
+        self.environments[environment] = self.environments.get(environment, 0) + 1
+
+        by_env = self.ages.setdefault(age_bucket(record.get("created_on"), self.started_at), {})
+        by_env[environment] = by_env.get(environment, 0) + 1
+
+        branch = self.branches.setdefault(project, {}).setdefault(record.get("branch") or "(none)", BranchSummary())
+        branch.count += 1
+        created_on = record.get("created_on")
+        if created_on:
+            branch.oldest = min(branch.oldest or created_on, created_on)
+            branch.newest = max(branch.newest or created_on, created_on)
+
+        if record.get("aliases"):
+            self.aliased += 1
+
+    def top_branches(self, limit: int = 10) -> List[Dict]:
+        """The branches with the most deployments across all projects."""
+        rows = [
+            {"project": project, "branch": branch, **asdict(summary)}
+            for project, branches in self.branches.items()
+            for branch, summary in branches.items()
+        ]
+        return sorted(rows, key=lambda row: row["count"], reverse=True)[:limit]
+
+    def to_dict(self) -> Dict:
+        """Convert the summary to plain JSON-serializable data."""
+        data = asdict(self)
+        data["ages"] = {
+            label: self.ages[label]
+            for label in [label for _, label in AGE_BUCKETS] + ["unknown"]
+            if label in self.ages
+        }
+        data.update(total=self.total, duration=self.duration)
+        return data
@@ -0,0 +1,158 @@
+"""
+Deferred retry queue for failed deletions.
+
+Failures are grouped by error class instead of being retried inline, so the
+main deletion pass never slows down. Retryable classes are drained after the
+main pass with their own exponential backoff; everything else is only
+reported.
+"""
+
+import json
+import time
+from typing import Callable, Dict, List, Optional, Tuple
+
+# Error classes for failed requests
+ALIASED = "aliased"
+RATE_LIMITED = "rate_limited"
+SERVER_ERROR = "server_error"
+NOT_FOUND = "not_found"
+AUTH = "auth"
+NETWORK = "network"
+OTHER = "other"
+
+RETRYABLE_CLASSES = frozenset({RATE_LIMITED, SERVER_ERROR, NETWORK})
+
+
+def classify_response(response) -> str:
+    """Return the error class for an unsuccessful API response."""
+    status = response.status_code
+
+    if status == 429:
+        return RATE_LIMITED
+    if status >= 500:
+        return SERVER_ERROR
+    if status == 404:
+        return NOT_FOUND
+    if status in (401, 403):
+        return AUTH
+
+    try:
+        errors = response.json().get("errors") or []
+    except (json.JSONDecodeError, ValueError, AttributeError):
+        errors = []
+
+    for error in errors:
+        code = error.get("code")
+        if code == 8000035:
+            return ALIASED
+        if code in (10000, 10001):
+            return AUTH
+
+    return OTHER
+
+
+class DeferredRetryQueue:
+    """Collect failed deletions and retry the transient ones after the main pass."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        backoff: float = 2.0,
+        max_backoff: float = 60.0,
+        sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.max_attempts = max_attempts
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self._sleep = sleep
+        self.failures: Dict[str, List[Dict]] = {}
+
+    def clone(self) -> "DeferredRetryQueue":
+        """Return an empty queue with the same retry settings."""
+        return DeferredRetryQueue(self.max_attempts, self.backoff, self.max_backoff, self._sleep)
+
+    def add(self, item: Dict, error_class: str) -> bool:
+        """Record a failed item. Returns True if it will be retried later."""
+        self.failures.setdefault(error_class, []).append(item)
+        return error_class in RETRYABLE_CLASSES
+
+    def retryable_count(self) -> int:
+        """Number of failed items that will be retried."""
+        return sum(len(items) for cls, items in self.failures.items() if cls in RETRYABLE_CLASSES)
+
+    def failed_count(self) -> int:
+        """Number of items that are currently failed, retryable or not."""
+        return sum(len(items) for items in self.failures.values())
+
+    def items(self) -> List[Dict]:
+        """All failed items across every error class."""
+        return [item for items in self.failures.values() for item in items]
+
+    def retryable_items(self) -> List[Dict]:
+        """Failed items that would be retried; the others need no further attempts."""
+        return [item for cls, items in self.failures.items() if cls in RETRYABLE_CLASSES for item in items]
+
+    def summary(self) -> Dict[str, int]:
+        """Failed item counts grouped by error class."""
+        return {cls: len(items) for cls, items in sorted(self.failures.items()) if items}
+
+    def drain(
+        self,
+        retry: Callable[[Dict], Tuple[bool, Optional[str]]],
+        on_retry: Optional[Callable[[int, float, int], None]] = None,
+        should_stop: Optional[Callable[[], bool]] = None,
+        deadline: Optional[float] = None,
+    ) -> List[Dict]:
+        """Retry queued items until they succeed or attempts run out.
+
+        ``retry`` is called with each item and returns ``(success, error_class)``.
+        Items that fail again are regrouped under their new error class. If
+        ``should_stop`` returns True, retrying stops and unretried items stay
+        queued. So do the items of a round whose backoff would end after
+        ``deadline``, a ``time.monotonic`` value. Returns the items that were
+        recovered.
+        """
+        recovered = []
+
+        for attempt in range(1, self.max_attempts + 1):
+            if should_stop and should_stop():
+                break
+
+            pending = [
+                (cls, item)
+                for cls in sorted(self.failures)
+                if cls in RETRYABLE_CLASSES
+                for item in self.failures.pop(cls)
+            ]
+            if not pending:
+                break
+
+            delay = min(self.backoff * (2 ** (attempt - 1)), self.max_backoff)
+            if deadline is not None and time.monotonic() + delay >= deadline:
+                for cls, item in pending:
+                    self.add(item, cls)
+                break
+            if on_retry:
+                on_retry(attempt, delay, len(pending))
+            self._sleep(delay)
+
+            for index, (cls, item) in enumerate(pending):
+                if should_stop and should_stop():
+                    for rest_cls, rest in pending[index:]:
+                        self.add(rest, rest_cls)
+                    return recovered
+
+                try:
+                    success, error_class = retry(item)
+                except Exception:
+                    # Put back everything not yet retried before propagating
+                    for rest_cls, rest in pending[index:]:
+                        self.add(rest, rest_cls)
+                    raise
+
+                if success:
+                    recovered.append(item)
+                else:
+                    self.add(item, error_class or OTHER)
+
+        return recovered
@@ -0,0 +1,259 @@
+"""
+Span tracing for deletion runs.
+
+Aggregate numbers in the report don't show why a concurrent run was slow.
+A ``Tracer`` passed to ``CloudflareDeploymentDeleter(tracer=...)`` records a
+span for the run, every listing page, every API request, every deletion and
+retry round. It also records waits on the request window, the circuit
+breaker and the pacing between requests, and a counter of deletions in
+flight.
+
+A recorded trace can be exported two ways:
+
+- ``write_chrome_trace`` writes Chrome trace-event JSON. It opens in
+  Perfetto (https://ui.perfetto.dev) or ``chrome://tracing``, with one lane
+  per worker thread.
+- ``export_otlp`` posts the spans as OTLP/HTTP JSON to an OpenTelemetry
+  collector, e.g. ``http://localhost:4318``.
+
+Tracing is off unless a tracer is given; the default ``NullTracer`` records
+nothing.
+"""
+
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Tuple
+
+# Waits shorter than this are not worth a span, in seconds
+MIN_WAIT = 0.001
+
+
+@dataclass
+class Span:
+    """One timed operation."""
+
+    name: str
+    category: str
+    span_id: str
+    parent_id: Optional[str]
+    thread_id: int
+    start: float
+    end: Optional[float] = None
+    attributes: Dict = field(default_factory=dict)
+
+    @property
+    def duration(self) -> float:
+        return (self.end if self.end is not None else self.start) - self.start
+
+
+class Tracer:
+    """Record spans and counters for one or more runs."""
+
+    def __init__(self, service_name: str = "cf-deployment-deleter"):
+        self.service_name = service_name
+        self.trace_id = os.urandom(16).hex()
+        # Span times are perf_counter() values; this anchors them to the wall clock
+        self._epoch_ns = time.time_ns() - int(time.perf_counter() * 1e9)
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.spans: List[Span] = []
+        self.counters: List[Tuple[str, float, float]] = []
+        self.thread_names: Dict[int, str] = {}
+
+    @contextmanager
+    def span(self, name: str, category: str, parent: Optional[Span] = None, **attributes) -> Iterator[Span]:
+        """Time the enclosed block as a span.
+
+        The parent is ``parent`` if given, otherwise the innermost span open on
+        this thread. Attributes can be added to the yielded span inside the block.
+        """
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1]
+        span = self._open(name, category, parent, time.perf_counter(), attributes)
+        stack.append(span)
+        try:
+            yield span
+        except BaseException as e:
+            span.attributes.setdefault("error", type(e).__name__)
+            raise
+        finally:
+            span.end = time.perf_counter()
+            stack.pop()
+
+    def record(self, name: str, category: str, start: float, end: float, parent: Optional[Span] = None, **attributes):
+        """Add a span that has already finished; ``start`` and ``end`` are ``time.perf_counter()`` values."""
+        stack = self._stack()
+        if parent is None and stack:
+            parent = stack[-1]
+        self._open(name, category, parent, start, attributes).end = end
+
+    def current(self) -> Optional[Span]:
+        """The innermost span open on this thread, if any."""
+        stack = self._stack()
+        return stack[-1] if stack else None
+
+    @contextmanager
+    def within(self, span: Optional[Span]) -> Iterator[None]:
+        """Make ``span`` the parent of spans opened in the block, e.g. on a worker thread."""
+        if span is None:
+            yield
+            return
+        stack = self._stack()
+        stack.append(span)
+        try:
+            yield
+        finally:
+            stack.pop()
+
+    def counter(self, name: str, value: float):
+        """Record the current value of a counter, such as deletions in flight."""
+        with self._lock:
+            self.counters.append((name, time.perf_counter(), value))
+
+    def _open(self, name, category, parent, start, attributes) -> Span:
+        thread = threading.current_thread()
+        span = Span(
+            name=name,
+            category=category,
+            span_id=os.urandom(8).hex(),
+            parent_id=parent.span_id if parent is not None else None,
+            thread_id=thread.ident,
+            start=start,
+            attributes=attributes,
+        )
+        with self._lock:
+            self.spans.append(span)
+            self.thread_names.setdefault(thread.ident, thread.name)
+        return span
+
+    def _stack(self) -> List[Span]:
+        if not hasattr(self._local, "stack"):
+            self._local.stack = []
+        return self._local.stack
+
+    def chrome_trace(self) -> Dict:
+        """The recorded spans and counters as a Chrome trace-event document."""
+        with self._lock:
+            spans = list(self.spans)
+            counters = list(self.counters)
+            thread_names = dict(self.thread_names)
+
+        events = [
+            {"name": "process_name", "ph": "M", "pid": 1, "args": {"name": self.service_name}},
+        ]
+        # Small stable lane numbers read better than thread identifiers
+        lanes = {ident: index for index, ident in enumerate(thread_names, start=1)}
+        for ident, name in thread_names.items():
+            events.append({"name": "thread_name", "ph": "M", "pid": 1, "tid": lanes[ident], "args": {"name": name}})
+        for span in spans:
+            events.append({
+                "name": span.name,
+                "cat": span.category,
+                "ph": "X",
+                "ts": span.start * 1e6,
+                "dur": span.duration * 1e6,
+                "pid": 1,
+                "tid": lanes[span.thread_id],
+                "args": _plain(span.attributes),
+            })
+        for name, at, value in counters:
+            events.append({"name": name, "ph": "C", "ts": at * 1e6, "pid": 1, "args": {"value": value}})
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def write_chrome_trace(self, path: str):
+        """Write the trace as Chrome trace-event JSON."""
+        with open(path, "w") as f:
+            json.dump(self.chrome_trace(), f)
+
+    def otlp_payload(self) -> Dict:
+        """The recorded spans as an OTLP/HTTP JSON ``ExportTraceServiceRequest``."""
+        with self._lock:
+            spans = list(self.spans)
+            thread_names = dict(self.thread_names)
+
+        return {
+            "resourceSpans": [{
+                "resource": {"attributes": _otlp_attributes({"service.name": self.service_name})},
+                "scopeSpans": [{
+                    "scope": {"name": "deleter.tracing"},
+                    "spans": [self._otlp_span(span, thread_names) for span in spans],
+                }],
+            }],
+        }
+
+    def _otlp_span(self, span: Span, thread_names: Dict[int, str]) -> Dict:
+        attributes = dict(span.attributes, category=span.category)
+        attributes["thread.name"] = thread_names.get(span.thread_id)
+        data = {
+            "traceId": self.trace_id,
+            "spanId": span.span_id,
+            "name": span.name,
+            # SPAN_KIND_CLIENT for API requests, SPAN_KIND_INTERNAL otherwise
+            "kind": 3 if span.category == "http" else 1,
+            "startTimeUnixNano": str(self._epoch_ns + int(span.start * 1e9)),
+            "endTimeUnixNano": str(self._epoch_ns + int((span.end if span.end is not None else span.start) * 1e9)),
+            "attributes": _otlp_attributes(attributes),
+        }
+        if span.parent_id:
+            data["parentSpanId"] = span.parent_id
+        if "error" in span.attributes:
+            data["status"] = {"code": 2, "message": str(span.attributes["error"])}
+        return data
+
+    def export_otlp(self, endpoint: str, session=None, timeout: float = 10.0):
+        """Post the spans to an OTLP/HTTP collector, e.g. ``http://localhost:4318``.
+
+        Raises ``ValueError`` if the collector cannot be reached or rejects them.
+        """
+        import requests
+
+        url = endpoint.rstrip("/")
+        if not url.endswith("/v1/traces"):
+            url += "/v1/traces"
+        try:
+            response = (session or requests).post(url, json=self.otlp_payload(), timeout=timeout)
+        except requests.exceptions.RequestException as e:
+            raise ValueError(f"Could not send the trace to {url}: {e}")
+        if response.status_code >= 300:
+            raise ValueError(f"The collector at {url} rejected the trace: HTTP {response.status_code}")
+
+
+class NullTracer(Tracer):
+    """Tracer that records nothing; the default when tracing is off."""
+
+    @contextmanager
+    def span(self, name: str, category: str, parent: Optional[Span] = None, **attributes) -> Iterator[Span]:
+        yield Span(name=name, category=category, span_id="", parent_id=None, thread_id=0, start=0.0)
+
+    def record(self, name, category, start, end, parent=None, **attributes):
+        pass
+
+    def current(self) -> Optional[Span]:
+        return None
+
+    def counter(self, name, value):
+        pass
+
+
+def _plain(attributes: Dict) -> Dict:
+    return {key: value for key, value in attributes.items() if value is not None}
+
+
+def _otlp_attributes(attributes: Dict) -> List[Dict]:
+    result = []
+    for key, value in _plain(attributes).items():
+        if isinstance(value, bool):
+            typed = {"boolValue": value}
+        elif isinstance(value, int):
+            typed = {"intValue": str(value)}
+        elif isinstance(value, float):
+            typed = {"doubleValue": value}
+        else:
+            typed = {"stringValue": str(value)}
+        result.append({"key": key, "value": typed})
+    return result
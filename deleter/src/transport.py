@@ -0,0 +1,134 @@
+"""
+HTTP transports for the Cloudflare deployment deleter.
+
+``CloudflareDeploymentDeleter`` sends every request through a transport. The
+default uses a pooled ``requests`` session over HTTP/1.1, which needs one
+connection (and TLS handshake) per in-flight request. The optional HTTP/2
+transport multiplexes all concurrent listing and delete requests over a single
+connection; it needs ``httpx`` with HTTP/2 support (``pip install 'httpx[http2]'``).
+
+Transports return response objects with ``status_code``, ``text``, ``headers``
+and ``json()``, and raise ``NetworkError`` when the API cannot be reached.
+``timeout`` is a ``(connect, read)`` pair of seconds, or one number for both;
+a request that times out raises ``NetworkError`` too.
+"""
+
+import threading
+from typing import TYPE_CHECKING, Dict, Optional
+
+from .errors import NetworkError
+
+if TYPE_CHECKING:
+    import requests
+
+TRANSPORTS = ("http1", "http2")
+
+
+class Transport:
+    """Send HTTP requests to the Cloudflare API."""
+
+    name = "base"
+
+    def request(self, method: str, url: str, headers: Optional[Dict] = None, params: Optional[Dict] = None,
+                timeout=None):
+        raise NotImplementedError
+
+    def close(self):
+        """Release pooled connections."""
+
+
+class RequestsTransport(Transport):
+    """HTTP/1.1 transport backed by a pooled ``requests`` session."""
+
+    name = "http1"
+
+    def __init__(self, session: Optional["requests.Session"] = None, pool_size: int = 10):
+        import requests
+
+        if session is None:
+            session = requests.Session()
+            adapter = requests.adapters.HTTPAdapter(pool_connections=1, pool_maxsize=max(pool_size, 1))
+            session.mount("https://", adapter)
+            session.mount("http://", adapter)
+        self.session = session
+        self._request_exception = requests.exceptions.RequestException
+
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        try:
+            return self.session.request(method, url, headers=headers, params=params, timeout=timeout)
+        except self._request_exception as e:
+            raise NetworkError(f"Network error when contacting Cloudflare API: {e}") from e
+
+    def close(self):
+        self.session.close()
+
+
+class HTTP2Transport(Transport):
+    """HTTP/2 transport that multiplexes concurrent requests over one connection."""
+
+    name = "http2"
+
+    def __init__(self):
+        import asyncio
+
+        try:
+            import httpx
+            import h2  # noqa: F401 - httpx needs it for HTTP/2
+        except ImportError:
+            raise ValueError("The HTTP/2 transport requires httpx with HTTP/2 support: pip install 'httpx[http2]'")
+
+        # httpx's synchronous HTTP/2 connection can open streams out of order when
+        # several threads share it, which servers reject. The async client opens
+        # streams in order, so requests from worker threads are handed to one
+        # event loop that owns the connection.
+        self._loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self._loop.run_forever, name="http2-transport", daemon=True)
+        self._thread.start()
+
+        async def create_client():
+            # http1=False makes plain-text http:// URLs use HTTP/2 with prior knowledge,
+            # which local stand-in servers rely on
+            return httpx.AsyncClient(
+                http1=False,
+                http2=True,
+                limits=httpx.Limits(max_connections=1, max_keepalive_connections=1),
+                timeout=None,
+            )
+
+        self._run_coroutine = asyncio.run_coroutine_threadsafe
+        self.client = self._run(create_client())
+        self._http_error = httpx.HTTPError
+        self._timeout = httpx.Timeout
+
+    def _run(self, coroutine):
+        return self._run_coroutine(coroutine, self._loop).result()
+
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        kwargs = {"headers": headers, "params": params}
+        if isinstance(timeout, tuple):
+            connect, read = timeout
+            kwargs["timeout"] = self._timeout(read, connect=connect)
+        elif timeout is not None:
+            kwargs["timeout"] = timeout
+        try:
+            return self._run(self.client.request(method, url, **kwargs))
+        except self._http_error as e:
+            raise NetworkError(f"Network error when contacting Cloudflare API: {e}") from e
+
+    def close(self):
+        if self._loop.is_closed():
+            return
+        self._run(self.client.aclose())
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self._loop.close()
+
+
+def create_transport(name: str = "http1", session: Optional["requests.Session"] = None,
+                     concurrency: int = 1) -> Transport:
+    """Create a transport by name, sized for ``concurrency`` in-flight requests."""
+    if name == "http1":
+        return RequestsTransport(session=session, pool_size=concurrency)
+    if name == "http2":
+        return HTTP2Transport()
+    raise ValueError(f"Unknown transport {name!r}; expected one of {', '.join(TRANSPORTS)}")
@@ -0,0 +1,129 @@
+"""
+Post-run verification from listing counts and sampled lookups.
+
+A successful DELETE response does not prove the deployment is gone, and
+running the deleter again to find out paginates the whole project a second
+time. ``CloudflareDeploymentDeleter(verify=True)`` checks a finished run with
+a handful of requests instead:
+
+- the listing's ``result_info.total_count`` is read from the first page
+  before and after the deletions. It should drop by the number of deleted
+  deployments, plus those found already gone, less the new deployments that
+  appeared on the first page in the meantime. A count above that means some
+  deletions did not take effect. New deployments are only seen on the first
+  page, so more than a page of them during the run also shows up as a
+  shortfall.
+- up to ``verify_sample`` deleted deployments are looked up one by one, and
+  the API should no longer find them. Deleted deployments still listed on the
+  first page are checked for free.
+
+Deployments that are still there are deleted again. A count that is off
+while every lookup comes back "not found" is reported as unverified; only a
+full listing can tell which deployments are left.
+
+Workers scripts list every deployment in one response, so for them the
+count after the run is an exact check.
+"""
+
+import random
+import time
+from typing import Dict, List, Optional, Set, Tuple
+
+from .errors import DeleterError, NetworkError, RequestBudgetError
+from .report import DeletionReport, VerificationResult
+from .retry_queue import NOT_FOUND, classify_response
+
+
+def count_deployments(deleter) -> Tuple[Optional[int], Set[str]]:
+    """The listing's total count and the IDs on its first page."""
+    data = deleter.fetch_deployments_page(1)
+    return data.get("result_info", {}).get("total_count"), {deployment["id"] for deployment in data["result"]}
+
+
+def lookup_deployment(deleter, deployment_id: str) -> Optional[bool]:
+    """Whether the API still finds a deployment, or None if it could not tell."""
+    path = deleter.backend.deployment_path(deleter.account_id, deleter.project_name, deployment_id)
+    try:
+        response = deleter._request("GET", f"{deleter.base_url}{path}", endpoint=deleter._delete_endpoint)
+    except NetworkError:
+        return None
+    if response.status_code == 200:
+        return True
+    if classify_response(response) == NOT_FOUND:
+        return False
+    return None
+
+
+def verify_deletions(
+    deleter,
+    report: DeletionReport,
+    deployments: List[Dict],
+    before: Tuple[Optional[int], Set[str]],
+    sample_size: int,
+    rng: random.Random = random,
+) -> VerificationResult:
+    """Check that the deletions recorded in ``report`` took effect and delete survivors again.
+
+    ``before`` is the total count and the known IDs when the run started:
+    every listed ID, or the first page's if the listing was skipped.
+    Running out of requests or time ends the check early with ``error`` set.
+    """
+    total_before, known = before
+    started = time.monotonic()
+    requests_before = sum(deleter.request_counts.values())
+    result = VerificationResult(total_before=total_before)
+
+    outcomes = [(deployment, report.outcomes.get(deployment["id"])) for deployment in deployments]
+    deleted = [deployment for deployment, outcome in outcomes if outcome is not None and outcome.success]
+    # Deployments that were listed but already gone when deleted left the count as well
+    gone = sum(
+        1 for deployment, outcome in outcomes
+        if outcome is not None and outcome.error_class == NOT_FOUND and deployment["id"] in known
+    )
+    scheduled = {deployment["id"] for deployment in deployments}
+
+    with deleter.tracer.span("verify", "verify", deleted=len(deleted)) as span:
+        try:
+            result.total_after, first_page = count_deployments(deleter)
+            result.new_deployments = len(first_page - known - scheduled)
+            if total_before is not None and result.total_after is not None:
+                result.expected_after = total_before - len(deleted) - gone + result.new_deployments
+
+            still_present = [deployment for deployment in deleted if deployment["id"] in first_page]
+            unseen = [deployment for deployment in deleted if deployment["id"] not in first_page]
+            for deployment in rng.sample(unseen, min(sample_size, len(unseen))):
+                found = lookup_deployment(deleter, deployment["id"])
+                result.sampled += 1
+                if found is None:
+                    result.unchecked += 1
+                elif found:
+                    still_present.append(deployment)
+
+            result.still_present = [deployment["id"] for deployment in still_present]
+            if still_present:
+                deleter.hooks.on_message(
+                    f"Deleting {len(still_present)} deployments again that are still present after deletion"
+                )
+            for deployment in still_present:
+                success, error_class = deleter._retry_and_record(deployment, report)
+                if error_class == NOT_FOUND:
+                    # The lookup raced the original deletion; it is gone after all
+                    outcome = report.outcome(deployment["id"])
+                    outcome.success, outcome.error_class = True, None
+                    success = True
+                if success:
+                    result.redeleted += 1
+        except RequestBudgetError as e:
+            result.error = str(e)
+        except DeleterError as e:
+            result.error = f"verification failed: {e}"
+        finally:
+            result.requests = sum(deleter.request_counts.values()) - requests_before
+            result.duration = time.monotonic() - started
+            span.attributes.update(
+                discrepancy=result.discrepancy,
+                sampled=result.sampled,
+                still_present=len(result.still_present),
+            )
+
+    return result
@@ -0,0 +1,50 @@
+"""Fakes and factories shared by the test modules."""
+
+import responses
+
+from deleter.src.delete_deployments import CloudflareDeploymentDeleter
+from deleter.src.hooks import DeletionHooks
+from deleter.src.retry_queue import DeferredRetryQueue
+
+
+class FakeClock:
+    """Manually advanced clock whose sleep just moves time forward.
+
+    With a ``step``, every read also advances the clock by that much.
+    """
+
+    def __init__(self, step: float = 0.0):
+        self.now = 0.0
+        self.step = step
+        self.sleeps = []
+
+    def __call__(self):
+        self.now += self.step
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def make_deleter(**kwargs) -> CloudflareDeploymentDeleter:
+    """Build a deleter for ``test-project`` that prints nothing and never waits out retry backoff."""
+    kwargs.setdefault("account_id", "test_account_123")
+    kwargs.setdefault("project_name", "test-project")
+    kwargs.setdefault("api_token", "test_token_123")
+    kwargs.setdefault("hooks", DeletionHooks())
+    kwargs.setdefault("retry_queue", DeferredRetryQueue(sleep=lambda seconds: None))
+    return CloudflareDeploymentDeleter(**kwargs)
+
+
+def add_listing(url, deployments, page=1, total_pages=1, total_count=None):
+    """Mock a successful listing page of ``deployments`` at ``url``, with or without its query string."""
+    result_info = {"page": page, "per_page": 25, "total_pages": total_pages}
+    if total_count is not None:
+        result_info["total_count"] = total_count
+    responses.add(
+        responses.GET,
+        url,
+        json={"success": True, "result": deployments, "result_info": result_info},
+        status=200,
+    )
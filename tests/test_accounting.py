@@ -0,0 +1,178 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.accounting import RequestLedger
+from deleter.src.delete_deployments import build_parser
+from deleter.src.errors import RequestBudgetError
+from tests.helpers import FakeClock, make_deleter
+
+LIST_ENDPOINT = "/accounts/{account_id}/pages/projects/{project}/deployments"
+DELETE_ENDPOINT = "/accounts/{account_id}/pages/projects/{project}/deployments/{deployment_id}"
+
+
+class TestRequestLedger(unittest.TestCase):
+    """Tests for request accounting and request budgets."""
+
+    def test_hard_budget(self):
+        """Test reservations and unreserved requests share the hard budget."""
+        ledger = RequestLedger(max_requests=3)
+
+        self.assertTrue(ledger.reserve())
+        ledger.acquire(reserved=True)
+        ledger.acquire()
+        self.assertEqual(ledger.remaining(), 1)
+        self.assertTrue(ledger.reserve())
+        self.assertFalse(ledger.reserve())
+        with self.assertRaises(RequestBudgetError):
+            ledger.acquire()
+        self.assertIsNone(RequestLedger().remaining())
+
+    def test_window_throttle(self):
+        """Test requests beyond the window limit wait for the oldest one to age out."""
+        clock = FakeClock()
+        ledger = RequestLedger(window_requests=2, window=10.0, clock=clock, sleep=clock.sleep)
+
+        ledger.acquire()
+        clock.now = 4.0
+        ledger.acquire()
+        ledger.acquire()
+        self.assertEqual(clock.now, 10.0)
+        ledger.acquire()
+        self.assertEqual(clock.now, 14.0)
+
+    def test_breakdown_since_snapshot(self):
+        """Test the breakdown groups by endpoint, method and status and can start from a snapshot."""
+        ledger = RequestLedger()
+        ledger.record("/list", "GET", 200)
+        mark = ledger.snapshot()
+        ledger.record("/list", "GET", 200)
+        ledger.record("/list", "GET", 429)
+        ledger.record("/delete", "DELETE", "error")
+
+        self.assertEqual(ledger.total, 4)
+        self.assertEqual(ledger.breakdown(since=mark), [
+            {"endpoint": "/delete", "method": "DELETE", "status": "error", "count": 1},
+            {"endpoint": "/list", "method": "GET", "status": "200", "count": 1},
+            {"endpoint": "/list", "method": "GET", "status": "429", "count": 1},
+        ])
+
+    def test_invalid_budgets(self):
+        """Test nonsensical budgets are rejected."""
+        for kwargs in ({"max_requests": -1}, {"window_requests": 0}, {"window": 0}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                RequestLedger(**kwargs)
+
+    def test_cli_flags(self):
+        """Test the budget flags are parsed."""
+        args = build_parser().parse_args(["--max-requests", "500", "--max-requests-per-window", "600"])
+
+        self.assertEqual((args.max_requests, args.max_requests_per_window, args.request_window), (500, 600, 300.0))
+
+
+class TestRequestAccounting(unittest.TestCase):
+    """Tests for per-run request accounting and budget enforcement in the deleter."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    def add_listing(self, count, status=200):
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": status == 200,
+                "result": [{"id": f"d{index}", "environment": "preview"} for index in range(1, count + 1)],
+                "result_info": {"page": 1, "per_page": 25, "total_pages": 1},
+            },
+            status=status,
+        )
+
+    def add_delete(self, deployment_id, status=200):
+        responses.add(
+            responses.DELETE,
+            f"{self.base_url}/deployments/{deployment_id}",
+            json={"success": status == 200, "result": None},
+            status=status,
+        )
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_breakdown_by_endpoint_and_status(self, mock_sleep):
+        """Test every request is counted per endpoint, method and status, including retries."""
+        self.add_listing(0, status=503)
+        self.add_listing(2)
+        self.add_delete("d1")
+        self.add_delete("d2", status=500)
+        self.add_delete("d2")
+
+        report = make_deleter().run()
+
+        self.assertEqual(report.deleted_count, 2)
+        self.assertEqual(report.request_breakdown, [
+            {"endpoint": LIST_ENDPOINT, "method": "GET", "status": "200", "count": 1},
+            {"endpoint": LIST_ENDPOINT, "method": "GET", "status": "503", "count": 1},
+            {"endpoint": DELETE_ENDPOINT, "method": "DELETE", "status": "200", "count": 2},
+            {"endpoint": DELETE_ENDPOINT, "method": "DELETE", "status": "500", "count": 1},
+        ])
+        self.assertEqual(report.deletion_attempts, 3)
+        # The retried listing page is the only request beyond pages + deletion attempts
+        self.assertEqual(report.extra_requests, 1)
+        self.assertEqual(report.to_dict()["extra_requests"], 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_request_budget_stops_scheduling(self, mock_sleep):
+        """Test the run stops scheduling deletions once the request budget is used up."""
+        self.add_listing(5)
+        for index in range(1, 6):
+            self.add_delete(f"d{index}")
+
+        report = make_deleter(concurrency=2, ledger=RequestLedger(max_requests=4)).run()
+
+        self.assertEqual(len(responses.calls), 4)
+        self.assertEqual(report.deleted_count, 3)
+        self.assertEqual(report.remaining, ["d4", "d5"])
+        self.assertEqual(report.stop_reason, "request budget of 4 used up")
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_request_budget_covers_retries(self, mock_sleep):
+        """Test deferred retries are not sent once the budget is used up and stay remaining."""
+        self.add_listing(1)
+        self.add_delete("d1", status=500)
+
+        report = make_deleter(ledger=RequestLedger(max_requests=2)).run()
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(report.remaining, ["d1"])
+        self.assertEqual(report.stop_reason, "request budget of 2 used up")
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_request_budget_during_listing(self, mock_sleep):
+        """Test a budget that runs out while listing stops the run before deleting anything."""
+        self.add_listing(0, status=503)
+
+        report = make_deleter(ledger=RequestLedger(max_requests=1)).run()
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(report.outcomes, {})
+        self.assertEqual(report.stop_reason, "request budget of 1 used up")
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_dry_run_costs_only_listing(self, mock_sleep):
+        """Test dry runs reserve nothing for deletions."""
+        self.add_listing(3)
+
+        report = make_deleter(dry_run=True, ledger=RequestLedger(max_requests=1)).run()
+
+        self.assertEqual(report.deleted_count, 3)
+        self.assertEqual(report.request_count, 1)
+        self.assertEqual(report.extra_requests, 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
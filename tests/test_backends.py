@@ -0,0 +1,79 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.backends import PagesBackend, WorkersBackend, get_backend
+from deleter.src.daemon import DaemonConfig
+from tests.helpers import make_deleter
+
+
+class TestBackends(unittest.TestCase):
+    """Tests for the Pages and Workers resource backends."""
+
+    def setUp(self):
+        self.script_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/workers/scripts/my-worker"
+
+    def make_deleter(self, **kwargs):
+        return make_deleter(project_name="my-worker", backend="workers", **kwargs)
+
+    def test_get_backend(self):
+        """Test backends are looked up by name and unknown names are rejected."""
+        self.assertIsInstance(get_backend("pages"), PagesBackend)
+        backend = WorkersBackend()
+        self.assertIs(get_backend(backend), backend)
+        with self.assertRaises(ValueError):
+            get_backend("r2")
+
+    def test_pages_paths(self):
+        """Test the Pages backend keeps the original endpoints and page size limit."""
+        backend = PagesBackend()
+        self.assertEqual(backend.list_params(2, 50, "preview"), {"page": 2, "per_page": 25, "env": "preview"})
+        self.assertEqual(
+            backend.delete_path("acc", "site", "d1", force=True),
+            "/accounts/acc/pages/projects/site/deployments/d1?force=true",
+        )
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_workers_run_skips_active_deployment(self, mock_sleep):
+        """Test a Workers run deletes every deployment except the active one."""
+        responses.add(
+            responses.GET,
+            f"{self.script_url}/deployments",
+            json={
+                "success": True,
+                "result": {"deployments": [
+                    {"id": "w3", "created_on": "2024-01-03T00:00:00Z", "source": "wrangler"},
+                    {"id": "w2", "created_on": "2024-01-02T00:00:00Z", "source": "wrangler"},
+                    {"id": "w1", "created_on": "2024-01-01T00:00:00Z", "source": "api"},
+                ]},
+            },
+            status=200,
+        )
+        for deployment_id in ("w1", "w2"):
+            responses.add(responses.DELETE, f"{self.script_url}/deployments/{deployment_id}",
+                          json={"success": True}, status=200)
+
+        report = self.make_deleter(force=True).run()
+
+        deleted = [c.request.url for c in responses.calls if c.request.method == "DELETE"]
+        self.assertEqual(deleted, [f"{self.script_url}/deployments/w2", f"{self.script_url}/deployments/w1"])
+        self.assertEqual(report.found, 2)
+        self.assertEqual(report.deleted_count, 2)
+
+    def test_daemon_workers_config(self):
+        """Test the daemon reads Workers script names when PRUNE_BACKEND is workers."""
+        config = DaemonConfig.from_env({
+            "CF_ACCOUNT_ID": "acc",
+            "CF_API_TOKEN": "tok",
+            "PRUNE_BACKEND": "workers",
+            "CF_WORKER_SCRIPT_NAMES": "api, cron",
+        })
+
+        self.assertEqual(config.backend, "workers")
+        self.assertEqual(config.projects, ["api", "cron"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,88 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import order_deployments
+from tests.helpers import make_deleter
+
+
+DEPLOYMENTS = [
+    {"id": "p-new", "environment": "production", "created_on": "2024-03-01T00:00:00Z"},
+    {"id": "v-new", "environment": "preview", "created_on": "2024-02-01T00:00:00Z"},
+    {"id": "p-old", "environment": "production", "created_on": "2024-01-01T00:00:00Z"},
+    {"id": "v-old", "environment": "preview", "created_on": "2024-01-15T00:00:00Z"},
+]
+
+
+class TestOrdering(unittest.TestCase):
+    """Tests for deletion priority ordering."""
+
+    def test_oldest_first(self):
+        """Test oldest-first sorts by creation date."""
+        ordered = order_deployments(DEPLOYMENTS, "oldest-first")
+        self.assertEqual([d["id"] for d in ordered], ["p-old", "v-old", "v-new", "p-new"])
+
+    def test_preview_first(self):
+        """Test preview-first puts preview deployments before production ones."""
+        ordered = order_deployments(DEPLOYMENTS, "preview-first")
+        self.assertEqual([d["id"] for d in ordered], ["v-old", "v-new", "p-old", "p-new"])
+
+    def test_unknown_order(self):
+        """Test an unknown order is rejected."""
+        with self.assertRaises(ValueError):
+            order_deployments(DEPLOYMENTS, "random")
+
+
+class TestBudgets(unittest.TestCase):
+    """Tests for time and delete budgets."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_max_deletes_deletes_oldest_first(self, mock_sleep):
+        """Test a delete budget stops the run after the oldest deployments are gone."""
+        for deployment in DEPLOYMENTS:
+            responses.add(responses.DELETE, f"{self.base_url}/deployments/{deployment['id']}",
+                          json={"success": True}, status=200)
+
+        report = make_deleter(order="oldest-first", max_deletes=2).run(deployments=DEPLOYMENTS)
+
+        deleted = [c.request.url.rsplit("/", 1)[1] for c in responses.calls]
+        self.assertEqual(deleted, ["p-old", "v-old"])
+        self.assertEqual(report.stop_reason, "delete budget of 2 used up")
+        self.assertFalse(report.aborted)
+        self.assertEqual(report.remaining, ["v-new", "p-new"])
+        self.assertEqual(report.remaining_by_env, {"preview": 1, "production": 1})
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_max_deletes_is_a_hard_bound_with_concurrency(self, mock_sleep):
+        """Test deletions in flight cannot take a concurrent run past the delete budget."""
+        deployments = [{"id": f"d{index}", "environment": "preview"} for index in range(10)]
+        for deployment in deployments:
+            responses.add(responses.DELETE, f"{self.base_url}/deployments/{deployment['id']}",
+                          json={"success": True}, status=200)
+
+        report = make_deleter(concurrency=4, max_deletes=2).run(deployments=deployments)
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(report.deleted_count, 2)
+        self.assertEqual(report.stop_reason, "delete budget of 2 used up")
+        self.assertEqual(len(report.remaining), 8)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_max_duration_stops_cleanly(self, mock_sleep):
+        """Test an exhausted time budget leaves everything for the next run."""
+        report = make_deleter(max_duration=0).run(deployments=DEPLOYMENTS)
+
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual(report.stop_reason, "time budget of 0s used up")
+        self.assertEqual(len(report.remaining), 4)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,100 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.cassette import RecordingTransport, ReplayTransport, load_cassette
+from deleter.src.errors import CassetteError, NetworkError
+from deleter.src.transport import Transport, create_transport
+from tests.helpers import FakeClock, make_deleter
+
+
+class Unreachable(Transport):
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        raise NetworkError("connection refused")
+
+
+class TestCassettes(unittest.TestCase):
+    """Tests for recording and replaying HTTP traffic."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.cassette = os.path.join(self.temp_dir.name, "run.jsonl")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_deleter(self, transport):
+        return make_deleter(api_token="secret_token_123", transport=transport)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_record_then_replay_run(self, mock_sleep):
+        """Test a recorded run replays offline with the same outcomes, retries included."""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": True,
+                "result": [{"id": "d1", "environment": "preview"}, {"id": "d2", "environment": "preview"}],
+                "result_info": {"page": 1, "per_page": 25, "total_count": 2, "total_pages": 1},
+            },
+            status=200,
+        )
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1", json={"success": True}, status=200)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": False}, status=429)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": True}, status=200)
+
+        recorder = RecordingTransport(create_transport("http1"), self.cassette)
+        recorded = self.make_deleter(recorder).run()
+        recorder.close()
+
+        interactions = load_cassette(self.cassette)
+        self.assertEqual(len(interactions), 4)
+        self.assertEqual(interactions[0]["request"]["headers"], {"Authorization": "REDACTED"})
+        with open(self.cassette) as f:
+            self.assertNotIn("secret_token_123", f.read())
+
+        responses.reset()
+        replay = ReplayTransport(self.cassette, speed=0)
+        replayed = self.make_deleter(replay).run()
+
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual(replay.remaining(), 0)
+        self.assertEqual(replayed.deleted_count, recorded.deleted_count)
+        self.assertEqual(replayed.outcomes["d2"].attempts, 2)
+
+    def test_replay_scales_recorded_latency(self):
+        """Test replayed responses wait the recorded time divided by the speed."""
+        recorder = RecordingTransport(Unreachable(), self.cassette, clock=FakeClock(0.5))
+        with self.assertRaises(NetworkError):
+            recorder.request("GET", "https://example.com/a", params={"page": 1})
+        recorder.close()
+
+        sleeps = []
+        replay = ReplayTransport(self.cassette, speed=2.0, sleep=sleeps.append)
+        with self.assertRaisesRegex(NetworkError, "connection refused"):
+            replay.request("GET", "https://example.com/a", params={"page": 1})
+        self.assertEqual(sleeps, [0.25])
+
+    def test_replay_unknown_request(self):
+        """Test a request missing from the cassette raises CassetteError."""
+        with open(self.cassette, "w") as f:
+            f.write(json.dumps({
+                "request": {"method": "GET", "url": "https://example.com/a"},
+                "elapsed": 0.1,
+                "response": {"status_code": 200, "headers": {}, "body": "{}"},
+            }) + "\n")
+
+        replay = ReplayTransport(self.cassette, speed=0)
+        self.assertEqual(replay.request("GET", "https://example.com/a").json(), {})
+        with self.assertRaises(CassetteError):
+            replay.request("GET", "https://example.com/a")
+
+
+if __name__ == "__main__":
+    unittest.main()
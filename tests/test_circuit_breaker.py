@@ -0,0 +1,179 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.circuit_breaker import CircuitBreaker, CircuitOpenError
+from tests.helpers import FakeClock, make_deleter
+
+
+class TestCircuitBreaker(unittest.TestCase):
+    """Tests for the CircuitBreaker state machine."""
+
+    def setUp(self):
+        self.clock = FakeClock()
+
+    def make_breaker(self, **kwargs):
+        kwargs.setdefault("failure_threshold", 3)
+        kwargs.setdefault("reset_timeout", 10.0)
+        return CircuitBreaker(clock=self.clock, sleep=self.clock.sleep, **kwargs)
+
+    def test_opens_after_consecutive_failures(self):
+        """Test the breaker opens once the consecutive failure threshold is hit."""
+        breaker = self.make_breaker()
+
+        for _ in range(2):
+            breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_opens_on_failure_rate(self):
+        """Test the breaker opens when the windowed failure rate is too high."""
+        breaker = self.make_breaker(failure_threshold=100, failure_rate=0.5, min_calls=4)
+
+        breaker.record_failure()
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+        breaker.record_success()
+        breaker.record_failure()
+        self.assertEqual(breaker.state, CircuitBreaker.OPEN)
+
+    def test_pauses_then_closes_after_successful_probe(self):
+        """Test an open breaker waits for the cooldown and closes on a good probe."""
+        breaker = self.make_breaker()
+        for _ in range(3):
+            breaker.record_failure()
+
+        breaker.before_request()
+        self.assertEqual(self.clock.sleeps, [10.0])
+        self.assertEqual(breaker.state, CircuitBreaker.HALF_OPEN)
+
+        breaker.record_success()
+        self.assertEqual(breaker.state, CircuitBreaker.CLOSED)
+
+    def test_gives_up_after_max_trips(self):
+        """Test the breaker raises once recoveries keep failing."""
+        breaker = self.make_breaker(max_trips=2)
+        for _ in range(3):
+            breaker.record_failure("HTTP 503")
+
+        for _ in range(2):
+            breaker.before_request()
+            breaker.record_failure("HTTP 503")
+
+        with self.assertRaises(CircuitOpenError) as ctx:
+            breaker.before_request()
+        self.assertIn("HTTP 503", str(ctx.exception))
+
+    def test_recovered_outages_do_not_add_up(self):
+        """Test separate outages that each recover never exhaust the breaker."""
+        breaker = self.make_breaker(failure_threshold=1, max_trips=2)
+
+        for _ in range(4):
+            breaker.record_failure("HTTP 429")
+            breaker.before_request()
+            for _ in range(100):
+                breaker.record_success()
+
+        breaker.before_request()
+        self.assertEqual((breaker.state, breaker.trips, breaker.exhausted), (CircuitBreaker.CLOSED, 0, False))
+
+
+class TestDeleterCircuitBreaker(unittest.TestCase):
+    """Tests for how the deleter uses the circuit breaker."""
+
+    def setUp(self):
+        self.account_id = "test_account_123"
+        self.project_name = "test-project"
+        self.base_url = f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/pages/projects/{self.project_name}"
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.temp_dir.name, "state.json")
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_deleter(self):
+        return make_deleter(
+            account_id=self.account_id,
+            project_name=self.project_name,
+            circuit_breaker=CircuitBreaker(
+                failure_threshold=2, reset_timeout=5.0, max_trips=1,
+                clock=self.clock, sleep=self.clock.sleep,
+            ),
+            state_file=self.state_file,
+        )
+
+    def add_listing(self, count):
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": True,
+                "result": [{"id": f"deployment{i}", "environment": "preview"} for i in range(1, count + 1)],
+                "result_info": {"page": 1, "per_page": 25, "total_count": count, "total_pages": 1},
+            },
+            status=200,
+        )
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_aborts_and_saves_state(self, mock_sleep):
+        """Test a run stops issuing deletes once the API keeps failing."""
+        self.add_listing(10)
+        for i in range(1, 11):
+            responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment{i}",
+                          json={"success": False}, status=503)
+
+        with patch('sys.stdout'):
+            report = self.make_deleter().run()
+
+        self.assertTrue(report.aborted)
+        self.assertEqual(len(report.remaining), 10)
+        delete_calls = [c for c in responses.calls if c.request.method == "DELETE"]
+        self.assertEqual(len(delete_calls), 3)
+
+        with open(self.state_file) as f:
+            state = json.load(f)
+        self.assertEqual(state["project_name"], self.project_name)
+        self.assertEqual(len(state["pending"]), 10)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_resumes_from_state(self, mock_sleep):
+        """Test a run with a saved state skips listing and clears the state file."""
+        with open(self.state_file, "w") as f:
+            json.dump({"project_name": self.project_name, "env": None, "pending": [{"id": "deployment7"}]}, f)
+
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment7",
+                      json={"success": True}, status=200)
+
+        with patch('sys.stdout'):
+            self.make_deleter().run()
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertFalse(os.path.exists(self.state_file))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_listing_retries_transient_errors(self, mock_sleep):
+        """Test a server error on a listing page is retried rather than fatal."""
+        responses.add(responses.GET, f"{self.base_url}/deployments?page=1&per_page=25",
+                      json={"success": False}, status=502)
+        self.add_listing(1)
+
+        with patch('sys.stdout'):
+            deployments = self.make_deleter().get_deployments_paginated()
+
+        self.assertEqual([d["id"] for d in deployments], ["deployment1"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,176 @@
+import json
+import os
+import tempfile
+import unittest
+import urllib.request
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.circuit_breaker import CircuitBreaker
+from deleter.src.daemon import DaemonConfig, PruningDaemon
+from deleter.src.delete_deployments import select_expired
+from deleter.src.hooks import DeletionHooks
+from tests.helpers import add_listing
+
+
+class TestRetention(unittest.TestCase):
+    """Tests for selecting deployments outside the retention window."""
+
+    def test_select_expired_keeps_newest_per_environment(self):
+        """Test the newest deployments of each environment are kept."""
+        deployments = [
+            {"id": "p2", "environment": "production", "created_on": "2024-01-02T00:00:00Z"},
+            {"id": "v3", "environment": "preview", "created_on": "2024-01-03T00:00:00Z"},
+            {"id": "p1", "environment": "production", "created_on": "2024-01-01T00:00:00Z"},
+            {"id": "v2", "environment": "preview", "created_on": "2024-01-02T12:00:00Z"},
+            {"id": "v1", "environment": "preview", "created_on": "2024-01-01T12:00:00Z"},
+        ]
+
+        expired = select_expired(deployments, keep=1)
+
+        self.assertEqual([d["id"] for d in expired], ["p1", "v2", "v1"])
+        self.assertEqual(len(select_expired(deployments, keep=0)), 5)
+
+
+class TestPruningDaemon(unittest.TestCase):
+    """Tests for the scheduled pruning daemon."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "envfile")
+        self.write_config("site-a", keep=1)
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/site-a"
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, projects, keep, mtime=None):
+        with open(self.config_path, "w") as f:
+            f.write("CF_ACCOUNT_ID=test_account_123\n")
+            f.write("CF_API_TOKEN=test_token_123\n")
+            f.write(f"CF_PAGES_PROJECT_NAMES={projects}\n")
+            f.write(f"PRUNE_KEEP={keep}\n")
+            f.write("PRUNE_INTERVAL=60\n")
+        if mtime is not None:
+            os.utime(self.config_path, (mtime, mtime))
+
+    def add_page(self, page, total_pages, deployments):
+        add_listing(f"{self.base_url}/deployments?page={page}&per_page=25", deployments, page, total_pages, total_count=0)
+
+    def test_config_from_env(self):
+        """Test the daemon configuration is read from envfile values."""
+        config = DaemonConfig.from_env({
+            "CF_ACCOUNT_ID": "acc",
+            "CF_API_TOKEN": "tok",
+            "CF_PAGES_PROJECT_NAMES": "site-a, site-b",
+            "PRUNE_KEEP": "3",
+            "PRUNE_FORCE": "true",
+        })
+
+        self.assertEqual(config.projects, ["site-a", "site-b"])
+        self.assertEqual(config.keep, 3)
+        self.assertTrue(config.force)
+        self.assertEqual(config.interval, 3600.0)
+
+        with patch.dict(os.environ, {}, clear=True):
+            with self.assertRaises(ValueError):
+                DaemonConfig.from_env({"CF_ACCOUNT_ID": "acc"})
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_prune_keeps_index_warm(self, mock_sleep):
+        """Test the second cycle only lists the first page and deletes superseded deployments."""
+        daemon = PruningDaemon(self.config_path, health_port=None, hooks=DeletionHooks())
+        daemon.reload_config()
+
+        self.add_page(1, 2, [{"id": "d3", "environment": "preview", "created_on": "2024-01-03T00:00:00Z"}])
+        self.add_page(2, 2, [{"id": "d2", "environment": "preview", "created_on": "2024-01-02T00:00:00Z"}])
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": True}, status=200)
+
+        daemon.run_pending()
+        self.assertEqual(daemon.status["site-a"]["deleted"], 1)
+        self.assertEqual(daemon.status["site-a"]["known_deployments"], 1)
+
+        # A new deployment appears on the first page; the known one is on the same page
+        responses.replace(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": True,
+                "result": [
+                    {"id": "d4", "environment": "preview", "created_on": "2024-01-04T00:00:00Z"},
+                    {"id": "d3", "environment": "preview", "created_on": "2024-01-03T00:00:00Z"},
+                ],
+                "result_info": {"page": 1, "per_page": 25, "total_count": 2, "total_pages": 2},
+            },
+            status=200,
+        )
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d3", json={"success": True}, status=200)
+
+        calls_before = len(responses.calls)
+        report = daemon.prune("site-a")
+
+        cycle_calls = [(c.request.method, c.request.url) for c in responses.calls[calls_before:]]
+        self.assertEqual(cycle_calls, [
+            ("GET", f"{self.base_url}/deployments?page=1&per_page=25"),
+            ("DELETE", f"{self.base_url}/deployments/d3"),
+        ])
+        self.assertEqual(report.deleted_count, 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_after_an_outage_is_not_blocked(self, mock_sleep):
+        """Test a run that gave up on the API does not stop the next scheduled run."""
+        daemon = PruningDaemon(self.config_path, health_port=None, hooks=DeletionHooks())
+        daemon.reload_config()
+        daemon._deleter("site-a").circuit_breaker = CircuitBreaker(failure_threshold=1, max_trips=0)
+
+        responses.add(responses.GET, f"{self.base_url}/deployments?page=1&per_page=25",
+                      json={"success": False, "errors": [{"code": 10000, "message": "unavailable"}]}, status=503)
+        daemon.run_pending()
+        self.assertFalse(daemon.status["site-a"]["ok"])
+        self.assertIn("Circuit breaker", daemon.status["site-a"]["error"])
+
+        # The API is back by the next run
+        responses.reset()
+        self.add_page(1, 1, [
+            {"id": "d2", "environment": "preview", "created_on": "2024-01-02T00:00:00Z"},
+            {"id": "d1", "environment": "preview", "created_on": "2024-01-01T00:00:00Z"},
+        ])
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1", json={"success": True}, status=200)
+
+        report = daemon.prune("site-a")
+
+        self.assertEqual(report.deleted_count, 1)
+        self.assertEqual(len(responses.calls), 2)
+
+    def test_reload_config_picks_up_changes(self):
+        """Test a changed configuration file is applied without restarting."""
+        daemon = PruningDaemon(self.config_path, health_port=None, hooks=DeletionHooks())
+        self.assertTrue(daemon.reload_config())
+        self.assertFalse(daemon.reload_config())
+
+        stat = os.stat(self.config_path)
+        self.write_config("site-a,site-b", keep=5, mtime=stat.st_mtime + 10)
+
+        self.assertTrue(daemon.reload_config())
+        self.assertEqual(daemon.config.projects, ["site-a", "site-b"])
+        self.assertEqual(daemon.config.keep, 5)
+
+    def test_health_endpoint(self):
+        """Test the health endpoint reports status as JSON."""
+        daemon = PruningDaemon(self.config_path, health_port=0, hooks=DeletionHooks())
+        daemon.reload_config()
+        daemon._start_health_server()
+        try:
+            with urllib.request.urlopen(f"http://127.0.0.1:{daemon.health_port}/healthz") as response:
+                payload = json.loads(response.read())
+            self.assertEqual(payload["status"], "ok")
+        finally:
+            daemon._server.shutdown()
+            daemon._server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,199 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import build_parser
+from deleter.src.environments import EnvironmentPolicy, parse_environments, parse_policy, total_concurrency
+from deleter.src.errors import PermissionDeniedError
+from deleter.src.hooks import DeletionHooks, EnvironmentHooks
+from tests.helpers import make_deleter
+
+
+class RecordingHooks(DeletionHooks):
+    def __init__(self):
+        self.messages = []
+
+    def on_message(self, message):
+        self.messages.append(message)
+
+
+class TestEnvironments(unittest.TestCase):
+    """Tests for parallel per-environment queues and their policies."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    def add_listing(self, env, deployments, status=200):
+        body = {
+            "success": True,
+            "result": deployments,
+            "result_info": {"page": 1, "per_page": 25, "total_count": len(deployments), "total_pages": 1},
+        }
+        if status != 200:
+            body = {"success": False, "errors": [{"code": 10000, "message": "Authentication error"}]}
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25&env={env}",
+            json=body,
+            status=status,
+        )
+
+    def add_delete(self, deployment_id, force=False):
+        url = f"{self.base_url}/deployments/{deployment_id}"
+        responses.add(
+            responses.DELETE,
+            f"{url}?force=true" if force else url,
+            json={"success": True, "result": None},
+            status=200,
+        )
+
+    def test_parse_policy(self):
+        """Test --env-policy values are parsed and invalid ones rejected."""
+        self.assertEqual(
+            parse_policy("production:concurrency=1,force=true,keep=5"),
+            {"production": EnvironmentPolicy(concurrency=1, force=True, keep=5)},
+        )
+        self.assertEqual(parse_policy("preview:force=no"), {"preview": EnvironmentPolicy(force=False)})
+        for spec in ("production", ":keep=1", "preview:keep=-1", "preview:force=maybe", "preview:ttl=3", "preview:keep"):
+            with self.subTest(spec=spec), self.assertRaises(ValueError):
+                parse_policy(spec)
+
+    def test_parse_environments(self):
+        """Test every accepted form of ``env`` is normalised to a policy mapping."""
+        self.assertEqual(parse_environments(None), {})
+        self.assertEqual(list(parse_environments("production")), ["production"])
+        self.assertEqual(list(parse_environments("production, preview")), ["production", "preview"])
+        self.assertEqual(list(parse_environments(["preview"])), ["preview"])
+        policy = EnvironmentPolicy(keep=3)
+        self.assertEqual(parse_environments({"preview": policy, "production": None}),
+                         {"preview": policy, "production": EnvironmentPolicy()})
+
+    def test_total_concurrency(self):
+        """Test parallel queues add up their concurrency and a single queue uses the default."""
+        self.assertEqual(total_concurrency({}, 4), 4)
+        self.assertEqual(total_concurrency({"preview": EnvironmentPolicy(concurrency=8)}, 4), 4)
+        self.assertEqual(total_concurrency(
+            {"preview": EnvironmentPolicy(concurrency=8), "production": EnvironmentPolicy()}, 4
+        ), 12)
+
+    def test_single_environment_policy(self):
+        """Test a single environment keeps one queue and applies its policy to the deleter."""
+        deleter = make_deleter(env={"production": EnvironmentPolicy(concurrency=2, force=True, keep=5)})
+
+        self.assertEqual(deleter.env, "production")
+        self.assertEqual((deleter.concurrency, deleter.force, deleter.keep), (2, True, 5))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_parallel_queues_with_policies(self, mock_sleep):
+        """Test each environment is listed and deleted by its own queue with its own policy."""
+        self.add_listing("production", [
+            {"id": "p2", "environment": "production", "created_on": "2024-01-02T00:00:00Z"},
+            {"id": "p1", "environment": "production", "created_on": "2024-01-01T00:00:00Z"},
+        ])
+        self.add_listing("preview", [
+            {"id": "v2", "environment": "preview", "created_on": "2024-01-02T00:00:00Z"},
+            {"id": "v1", "environment": "preview", "created_on": "2024-01-01T00:00:00Z"},
+        ])
+        self.add_delete("p1", force=True)
+        self.add_delete("v1")
+        self.add_delete("v2")
+
+        hooks = RecordingHooks()
+        deleter = make_deleter(hooks=hooks, concurrency=3, env={
+            "preview": EnvironmentPolicy(),
+            "production": EnvironmentPolicy(concurrency=1, force=True, keep=1),
+        })
+        report = deleter.run()
+
+        self.assertEqual(report.env, "preview,production")
+        self.assertEqual(report.found, 3)
+        self.assertEqual(sorted(report.outcomes), ["p1", "v1", "v2"])
+        self.assertEqual(report.deleted_count, 3)
+        self.assertEqual(report.listing_pages, 2)
+        self.assertEqual(report.requests, {"GET": 2, "DELETE": 3})
+        self.assertIn("[production] Found 2 deployments", hooks.messages)
+
+        preview = deleter._environment_deleter("preview", deleter.environments["preview"])
+        production = deleter._environment_deleter("production", deleter.environments["production"])
+        self.assertEqual((preview.concurrency, production.concurrency), (3, 1))
+        self.assertIs(preview.circuit_breaker, deleter.circuit_breaker)
+        self.assertIs(preview.transport, deleter.transport)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_given_deployments_are_split_by_environment(self, mock_sleep):
+        """Test deployments passed to run go to their environment's queue without listing."""
+        self.add_delete("p1")
+        self.add_delete("v1")
+
+        report = make_deleter(env="production,preview").run(deployments=[
+            {"id": "p1", "environment": "production"},
+            {"id": "v1", "environment": "preview"},
+            {"id": "x1", "environment": "staging"},
+        ])
+
+        self.assertEqual(sorted(report.outcomes), ["p1", "v1"])
+        self.assertFalse(any(call.request.method == "GET" for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_failed_queue_aborts_combined_report(self, mock_sleep):
+        """Test one failing queue marks the report aborted while the others finish."""
+        self.add_listing("production", [], status=403)
+        self.add_listing("preview", [{"id": "v1", "environment": "preview"}])
+        self.add_delete("v1")
+
+        report = make_deleter(env="production,preview").run()
+
+        self.assertTrue(report.aborted)
+        self.assertTrue(report.abort_reason.startswith("production: "))
+        self.assertEqual(report.deleted_count, 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_every_queue_failing_raises(self, mock_sleep):
+        """Test the first error is raised when no queue could list its environment."""
+        self.add_listing("production", [], status=403)
+        self.add_listing("preview", [], status=403)
+
+        with self.assertRaises(PermissionDeniedError):
+            make_deleter(env="production,preview").run()
+
+    def test_state_files_per_environment(self):
+        """Test each queue gets its own state file and retry queue."""
+        deleter = make_deleter(env="production,preview", state_file="/tmp/state.json")
+        queue = deleter._environment_deleter("preview", EnvironmentPolicy())
+
+        self.assertEqual(queue.state_file, "/tmp/state.json.preview")
+        self.assertIsNot(queue.retry_queue, deleter.retry_queue)
+        self.assertIsInstance(queue.hooks, EnvironmentHooks)
+
+    def test_environment_hooks_prefix_messages(self):
+        """Test queue messages are prefixed with the environment, keeping leading blank lines."""
+        hooks = RecordingHooks()
+        EnvironmentHooks(hooks, "preview").on_message("\nStarting deletion")
+
+        self.assertEqual(hooks.messages, ["\n[preview] Starting deletion"])
+
+    def test_invalid_concurrency_and_backend(self):
+        """Test queues need a positive concurrency and a backend with environments."""
+        with self.assertRaises(ValueError):
+            make_deleter(env={"preview": EnvironmentPolicy(concurrency=0), "production": None})
+        with self.assertRaises(ValueError):
+            make_deleter(env="production", backend="workers")
+
+    def test_cli_env_list(self):
+        """Test --env accepts a comma-separated list and rejects unknown environments."""
+        parser = build_parser()
+        args = parser.parse_args(["--env", "production,preview", "--env-policy", "preview:concurrency=8"])
+
+        self.assertEqual(args.env, "production,preview")
+        self.assertEqual(args.env_policy, [{"preview": EnvironmentPolicy(concurrency=8)}])
+        with patch('sys.stderr'), self.assertRaises(SystemExit):
+            parser.parse_args(["--env", "production,staging"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,84 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import sample_page_numbers
+from tests.helpers import make_deleter
+
+
+class TestEstimate(unittest.TestCase):
+    """Tests for the pre-flight cost and duration estimate."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    def add_page(self, page, deployments):
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page={page}&per_page=25",
+            json={
+                "success": True,
+                "result": deployments,
+                "result_info": {"page": page, "per_page": 25, "total_count": 100, "total_pages": 4},
+            },
+            status=200,
+        )
+
+    def add_sample(self):
+        self.add_page(1, [
+            {"id": "p1", "environment": "production", "aliases": ["example.com"]},
+            {"id": "v1", "environment": "preview", "aliases": None},
+            {"id": "v2", "environment": "preview", "aliases": None},
+            {"id": "v3", "environment": "preview", "aliases": None},
+        ])
+        self.add_page(4, [
+            {"id": "v4", "environment": "preview", "aliases": None},
+            {"id": "v5", "environment": "preview", "aliases": None},
+            {"id": "v6", "environment": "preview", "aliases": None},
+            {"id": "p2", "environment": "production", "aliases": None},
+        ])
+
+    def test_sample_page_numbers(self):
+        """Test sampled pages are spread from the first to the last page."""
+        self.assertEqual(sample_page_numbers(1, 3), [1])
+        self.assertEqual(sample_page_numbers(2, 3), [1, 2])
+        self.assertEqual(sample_page_numbers(101, 3), [1, 51, 101])
+        self.assertEqual(sample_page_numbers(100, 1), [1])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_estimate_projects_requests_and_mix(self, mock_sleep):
+        """Test the estimate reads totals from the first page and the mix from the sample."""
+        self.add_sample()
+
+        estimate = make_deleter(concurrency=10).estimate(sample_pages=2)
+
+        self.assertEqual([c.request.url.split("?")[1] for c in responses.calls],
+                         ["page=1&per_page=25", "page=4&per_page=25"])
+        self.assertEqual(estimate.total_count, 100)
+        self.assertEqual(estimate.sampled_pages, [1, 4])
+        self.assertEqual(estimate.environment_mix, {"preview": 0.75, "production": 0.25})
+        self.assertEqual(estimate.to_delete, 100)
+        self.assertEqual(estimate.expected_aliased_failures, 12)
+        self.assertEqual(estimate.request_count, 104)
+        self.assertTrue(estimate.rate_limited)
+        self.assertAlmostEqual(estimate.deletion_duration, 25.0)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_estimate_with_retention_and_budgets(self, mock_sleep):
+        """Test retention, force, dry runs and the delete budget shape the projection."""
+        self.add_sample()
+
+        estimate = make_deleter(keep=10, force=True, dry_run=True, max_deletes=50).estimate(sample_pages=2)
+
+        # 75 preview and 25 production, keeping 10 of each, capped at 50
+        self.assertEqual(estimate.to_delete, 50)
+        self.assertEqual(estimate.expected_aliased_failures, 0)
+        self.assertEqual(estimate.delete_requests, 0)
+        self.assertFalse(estimate.rate_limited)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,254 @@
+import csv
+import json
+import os
+import tempfile
+import unittest
+from datetime import datetime, timedelta, timezone
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import main
+from deleter.src.export import (
+    CSVWriter, NDJSONWriter, deployment_record, export_format, export_inventory, open_writer,
+)
+from deleter.src.preflight import PROBE_DEPLOYMENT_ID, clear_preflight_cache
+from deleter.src.report import InventorySummary, age_bucket
+from tests.helpers import add_listing, make_deleter
+
+try:
+    import pyarrow.parquet as pq
+    HAS_PYARROW = True
+except ImportError:
+    HAS_PYARROW = False
+
+
+def days_ago(days):
+    return (datetime.now(timezone.utc) - timedelta(days=days)).isoformat().replace("+00:00", "Z")
+
+
+def deployment(deployment_id, environment, branch, created_on, aliases=None, status="success"):
+    return {
+        "id": deployment_id,
+        "environment": environment,
+        "created_on": created_on,
+        "aliases": aliases,
+        "url": f"https://{deployment_id}.site.pages.dev",
+        "latest_stage": {"name": "deploy", "status": status},
+        "deployment_trigger": {"type": "github:push", "metadata": {"branch": branch, "commit_hash": "abc123"}},
+    }
+
+
+class TestExport(unittest.TestCase):
+    """Tests for the streaming deployment inventory export."""
+
+    def setUp(self):
+        self.account_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects"
+        self.temp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def path(self, name):
+        return os.path.join(self.temp_dir.name, name)
+
+    def make_deleter(self, project="site-a"):
+        return make_deleter(project_name=project)
+
+    def add_page(self, project, page, total_pages, deployments, status=200):
+        url = f"{self.account_url}/{project}/deployments?page={page}&per_page=25"
+        if status == 200:
+            add_listing(url, deployments, page, total_pages)
+        else:
+            responses.add(responses.GET, url, status=status,
+                          json={"success": False, "errors": [{"code": 8000007, "message": "Project not found"}]})
+
+    def add_project(self):
+        self.add_page("site-a", 1, 2, [
+            deployment("a3", "preview", "feature", days_ago(0.5)),
+            deployment("a2", "production", "main", days_ago(3), aliases=["example.com"]),
+        ])
+        self.add_page("site-a", 2, 2, [
+            deployment("a1", "production", "main", days_ago(400), status="failure"),
+        ])
+
+    def test_deployment_record(self):
+        """Test listing entries are flattened to the export columns."""
+        record = deployment_record("site", deployment("d1", "preview", "dev", "2024-01-01T00:00:00Z", ["x.dev"]))
+
+        self.assertEqual(record, {
+            "project": "site", "id": "d1", "created_on": "2024-01-01T00:00:00Z", "environment": "preview",
+            "branch": "dev", "commit_hash": "abc123", "status": "success", "aliases": ["x.dev"],
+            "url": "https://d1.site.pages.dev",
+        })
+        self.assertEqual(deployment_record("w", {"id": "w1"})["aliases"], [])
+
+    def test_export_format(self):
+        """Test formats are taken from the argument or the file extension."""
+        self.assertEqual(export_format("out.jsonl"), "ndjson")
+        self.assertEqual(export_format("out.CSV"), "csv")
+        self.assertEqual(export_format("out.txt", "parquet"), "parquet")
+        with self.assertRaises(ValueError):
+            export_format("out.txt")
+        with self.assertRaises(ValueError):
+            export_format("out.csv", "xlsx")
+
+    def test_age_bucket(self):
+        """Test deployment ages fall into the expected buckets."""
+        now = datetime(2024, 6, 1, tzinfo=timezone.utc).timestamp()
+        self.assertEqual(age_bucket("2024-05-31T12:00:00Z", now), "<1d")
+        self.assertEqual(age_bucket("2024-05-20T00:00:00.123456Z", now), "7-30d")
+        self.assertEqual(age_bucket("2022-01-01T00:00:00Z", now), ">365d")
+        self.assertEqual(age_bucket(None, now), "unknown")
+        self.assertEqual(age_bucket("yesterday", now), "unknown")
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_export_ndjson_with_summary(self, mock_sleep):
+        """Test every page is streamed to NDJSON and summarised per environment, age and branch."""
+        self.add_project()
+        path = self.path("inventory.ndjson")
+
+        with open_writer(path) as writer:
+            summary = export_inventory([self.make_deleter()], writer)
+
+        with open(path) as f:
+            records = [json.loads(line) for line in f]
+        self.assertEqual([record["id"] for record in records], ["a3", "a2", "a1"])
+        self.assertEqual(records[1]["aliases"], ["example.com"])
+        self.assertFalse(os.path.exists(f"{path}.partial"))
+
+        self.assertEqual(summary.total, 3)
+        self.assertEqual(summary.listing_pages, 2)
+        self.assertEqual(summary.environments, {"preview": 1, "production": 2})
+        self.assertEqual(summary.ages, {"<1d": {"preview": 1}, "1-7d": {"production": 1}, ">365d": {"production": 1}})
+        self.assertEqual(summary.aliased, 1)
+        main_branch = summary.branches["site-a"]["main"]
+        self.assertEqual(main_branch.count, 2)
+        self.assertLess(main_branch.oldest, main_branch.newest)
+        self.assertEqual(summary.top_branches(1)[0]["branch"], "main")
+        self.assertEqual(list(summary.to_dict()["ages"]), ["<1d", "1-7d", ">365d"])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_export_several_projects_to_csv(self, mock_sleep):
+        """Test projects are exported in parallel into one file."""
+        self.add_project()
+        self.add_page("site-b", 1, 1, [deployment("b1", "preview", "dev", days_ago(10))])
+        path = self.path("inventory.csv")
+
+        deleter = self.make_deleter()
+        with CSVWriter(path) as writer:
+            summary = export_inventory([deleter, deleter._derived(project_name="site-b")], writer, concurrency=2)
+
+        with open(path, newline="") as f:
+            rows = list(csv.DictReader(f))
+        self.assertEqual(sorted(row["id"] for row in rows), ["a1", "a2", "a3", "b1"])
+        self.assertEqual(next(row for row in rows if row["id"] == "a2")["aliases"], "example.com")
+        self.assertEqual(summary.projects, {"site-a": 3, "site-b": 1})
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_failing_project_discards_the_file(self, mock_sleep):
+        """Test a project that cannot be listed doesn't stop the rest, but leaves no incomplete file."""
+        self.add_project()
+        self.add_page("gone", 1, 1, [], status=404)
+        path = self.path("inventory.csv")
+
+        deleter = self.make_deleter()
+        with CSVWriter(path) as writer:
+            summary = export_inventory([deleter, deleter._derived(project_name="gone")], writer, concurrency=2)
+
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+        self.assertEqual(summary.projects, {"site-a": 3})
+        self.assertEqual(list(summary.errors), ["gone"])
+
+    def test_failed_export_leaves_no_file(self):
+        """Test an interrupted export removes its partial file instead of leaving a truncated one."""
+        path = self.path("inventory.ndjson")
+
+        with self.assertRaises(KeyboardInterrupt):
+            with NDJSONWriter(path) as writer:
+                writer.write([{"id": "d1"}])
+                raise KeyboardInterrupt
+
+        self.assertEqual(os.listdir(self.temp_dir.name), [])
+
+    @unittest.skipUnless(HAS_PYARROW, "pyarrow is not installed")
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_export_parquet(self, mock_sleep):
+        """Test Parquet exports keep the column types, including the alias list."""
+        self.add_project()
+        path = self.path("inventory.parquet")
+
+        with open_writer(path) as writer:
+            export_inventory([self.make_deleter()], writer)
+
+        table = pq.read_table(path)
+        self.assertEqual(table.num_rows, 3)
+        self.assertEqual(table.column("aliases").to_pylist()[1], ["example.com"])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_cli_export(self, mock_sleep):
+        """Test --export writes the inventory and --export-summary the aggregates, without deleting."""
+        self.add_project()
+        self.add_page("site-b", 1, 1, [])
+        # A read-only token must not be caught out by the delete permission probe
+        clear_preflight_cache()
+        self.addCleanup(clear_preflight_cache)
+        responses.add(responses.GET, "https://api.cloudflare.com/client/v4/user/tokens/verify",
+                      json={"success": True, "result": {"status": "active"}}, status=200)
+        responses.add(responses.DELETE, f"{self.account_url}/site-a/deployments/{PROBE_DEPLOYMENT_ID}",
+                      json={"success": False, "errors": [{"code": 10000}]}, status=403)
+        path = self.path("inventory.csv")
+        summary_path = self.path("summary.json")
+
+        argv = [
+            "delete_deployments.py", "--account-id", "test_account_123", "--project-name", "site-a,site-b",
+            "--api-token", "test_token_123", "--env-file", self.path("missing"),
+            "--export", path, "--export-summary", summary_path,
+        ]
+        with patch('sys.argv', argv), patch('sys.stdout'):
+            main()
+
+        with open(summary_path) as f:
+            summary = json.load(f)
+        self.assertEqual(summary["projects"], {"site-a": 3, "site-b": 0})
+        self.assertEqual(summary["total"], 3)
+        self.assertEqual(summary["format"], "csv")
+        self.assertFalse(any(call.request.method == "DELETE" for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_cli_failed_export(self, mock_sleep):
+        """Test a failed CLI export exits with an error, leaves no file and still writes the trace."""
+        self.add_page("gone", 1, 1, [], status=404)
+        path = self.path("inventory.ndjson")
+        trace_path = self.path("export.trace.json")
+
+        argv = [
+            "delete_deployments.py", "--account-id", "test_account_123", "--project-name", "gone",
+            "--api-token", "test_token_123", "--env-file", self.path("missing"),
+            "--export", path, "--trace", trace_path,
+        ]
+        with patch('sys.argv', argv), patch('sys.stdout'), self.assertRaises(SystemExit) as context:
+            main()
+
+        self.assertEqual(context.exception.code, 1)
+        self.assertEqual(os.listdir(self.temp_dir.name), ["export.trace.json"])
+        with open(trace_path) as f:
+            self.assertIn("listing page", [event["name"] for event in json.load(f)["traceEvents"]])
+
+    def test_summary_without_dates(self):
+        """Test deployments without a creation time are still counted."""
+        summary = InventorySummary()
+        summary.add({"project": "w", "id": "w1"})
+
+        self.assertEqual(summary.ages, {"unknown": {"unknown": 1}})
+        self.assertEqual(summary.branches["w"]["(none)"].count, 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
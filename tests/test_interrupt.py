@@ -0,0 +1,163 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import install_stop_handlers
+from deleter.src.hooks import DeletionHooks
+from tests.helpers import make_deleter
+
+
+class StopAfter(DeletionHooks):
+    """Hooks that request a stop once a number of deletions have finished."""
+
+    def __init__(self, count):
+        self.count = count
+        self.deleter = None
+
+    def on_deletion_result(self, outcome, retryable):
+        self.count -= 1
+        if self.count == 0:
+            self.deleter.request_stop()
+
+
+class TestGracefulStop(unittest.TestCase):
+    """Tests for stopping a run on request or on SIGINT/SIGTERM."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        self.deployments = [{"id": f"d{i}", "environment": "preview"} for i in range(1, 6)]
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.state_file = os.path.join(self.temp_dir.name, "state.json")
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def make_deleter(self, **kwargs):
+        return make_deleter(state_file=self.state_file, **kwargs)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_stop_request_saves_progress(self, mock_sleep):
+        """Test a stop request ends the run after the current deletion and saves what is left."""
+        for deployment in self.deployments:
+            responses.add(responses.DELETE, f"{self.base_url}/deployments/{deployment['id']}",
+                          json={"success": True}, status=200)
+
+        hooks = StopAfter(2)
+        deleter = hooks.deleter = self.make_deleter(hooks=hooks)
+        report = deleter.run(deployments=self.deployments)
+
+        self.assertEqual(len(responses.calls), 2)
+        self.assertEqual(report.deleted_count, 2)
+        self.assertEqual(report.stop_reason, "interrupted")
+        self.assertEqual(report.remaining, ["d3", "d4", "d5"])
+        with open(self.state_file) as f:
+            self.assertEqual([d["id"] for d in json.load(f)["pending"]], ["d3", "d4", "d5"])
+        self.assertFalse(deleter.stop_requested)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_drain_deadline_abandons_stuck_deletions(self, mock_sleep):
+        """Test deletions still in flight at the drain deadline are counted as remaining."""
+        release = threading.Event()
+
+        def stuck(request):
+            release.wait(5)
+            return 200, {}, json.dumps({"success": True})
+
+        responses.add_callback(responses.DELETE, f"{self.base_url}/deployments/d1", callback=stuck)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": True}, status=200)
+
+        hooks = StopAfter(1)
+        deleter = hooks.deleter = self.make_deleter(hooks=hooks, concurrency=2, drain_timeout=0.1)
+        report = deleter.run(deployments=self.deployments[:2])
+
+        self.assertEqual(report.stop_reason, "interrupted")
+        self.assertEqual(report.deleted_count, 1)
+        self.assertEqual(report.remaining, ["d1"])
+
+        # Let the abandoned deletion finish before responses is torn down
+        release.set()
+        for thread in threading.enumerate():
+            if thread.name.startswith("deleter"):
+                thread.join(5)
+
+    def test_drain_deadline_lets_the_process_exit(self):
+        """Test a deletion abandoned at the drain deadline does not keep the process alive."""
+        script = f"""
+import threading
+from benchmarks.standin_server import StandinAPI, StandinServer
+from tests.helpers import make_deleter
+
+api = StandinAPI(deployments=2, latency=5.0)
+server = StandinServer(api).__enter__()
+deleter = make_deleter(base_url=server.base_url, state_file={self.state_file!r}, drain_timeout=0.2)
+threading.Timer(0.5, deleter.request_stop).start()
+report = deleter.run(deployments=api.deployments[:1])
+print(report.remaining)
+"""
+        started = time.monotonic()
+        result = subprocess.run([sys.executable, "-c", script], capture_output=True, text=True, timeout=30,
+                                cwd=os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+        elapsed = time.monotonic() - started
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "['deployment000002']")
+        # The stuck request takes 5s; the process must not wait for it
+        self.assertLess(elapsed, 4.0)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_stop_during_listing_skips_deletion(self, mock_sleep):
+        """Test a stop during the listing deletes nothing and saves no partial state."""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": True,
+                "result": self.deployments,
+                "result_info": {"page": 1, "per_page": 25, "total_count": 30, "total_pages": 2},
+            },
+            status=200,
+        )
+
+        class StopWhileListing(DeletionHooks):
+            def on_listing_page(self, page, total_pages, count):
+                deleter.request_stop()
+
+        deleter = self.make_deleter(hooks=StopWhileListing())
+        report = deleter.run()
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(report.stop_reason, "interrupted")
+        self.assertFalse(os.path.exists(self.state_file))
+
+    def test_signal_handlers(self):
+        """Test the first signal requests a stop and a second one exits."""
+        deleter = self.make_deleter()
+        received = []
+        previous = install_stop_handlers(deleter, received)
+        try:
+            os.kill(os.getpid(), signal.SIGTERM)
+            self.assertTrue(deleter.stop_requested)
+            self.assertEqual(received, [signal.SIGTERM])
+
+            with self.assertRaises(SystemExit) as cm:
+                os.kill(os.getpid(), signal.SIGINT)
+            self.assertEqual(cm.exception.code, 128 + signal.SIGINT)
+        finally:
+            for signum, handler in previous.items():
+                signal.signal(signum, handler)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,245 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.delete_deployments import CloudflareDeploymentDeleter, build_parser
+from deleter.src.errors import AuthenticationError, PermissionDeniedError
+from deleter.src.hooks import DeletionHooks
+from deleter.src.preflight import PROBE_DEPLOYMENT_ID, clear_preflight_cache
+from tests.helpers import make_deleter
+
+
+class TestPreflight(unittest.TestCase):
+    """Tests for the pre-flight credential and permission checks."""
+
+    def setUp(self):
+        self.api_url = "https://api.cloudflare.com/client/v4"
+        self.base_url = f"{self.api_url}/accounts/test_account_123/pages/projects"
+        clear_preflight_cache()
+
+    def tearDown(self):
+        clear_preflight_cache()
+
+    def make_deleter(self, project="test-project", **kwargs):
+        return make_deleter(project_name=project, preflight=True, **kwargs)
+
+    def add_verify(self, status=200, token_status="active", path="/user/tokens/verify"):
+        responses.add(
+            responses.GET,
+            f"{self.api_url}{path}",
+            json={"success": status == 200, "result": {"id": "t1", "status": token_status},
+                  "errors": [] if status == 200 else [{"code": 1000, "message": "Invalid API Token"}]},
+            status=status,
+        )
+        if path == "/user/tokens/verify" and status != 200:
+            # Not an account-owned token either
+            self.add_verify(status, token_status, path="/accounts/test_account_123/tokens/verify")
+
+    def add_probe(self, project="test-project", status=404):
+        errors = [{"code": 8000009, "message": "Deployment not found"}] if status == 404 else \
+            [{"code": 10000, "message": "Authentication error"}]
+        responses.add(
+            responses.DELETE,
+            f"{self.base_url}/{project}/deployments/{PROBE_DEPLOYMENT_ID}",
+            json={"success": False, "errors": errors},
+            status=status,
+        )
+
+    def add_pages(self, project="test-project", total_pages=2, status=200):
+        if status != 200:
+            responses.add(
+                responses.GET,
+                f"{self.base_url}/{project}/deployments?page=1&per_page=25",
+                json={"success": False, "errors": [{"code": 10000, "message": "Authentication error"}]},
+                status=status,
+            )
+            return
+        for page in range(1, total_pages + 1):
+            responses.add(
+                responses.GET,
+                f"{self.base_url}/{project}/deployments?page={page}&per_page=25",
+                json={
+                    "success": True,
+                    "result": [{"id": f"{project}-{page}", "environment": "preview"}],
+                    "result_info": {"page": page, "per_page": 25, "total_pages": total_pages},
+                },
+                status=200,
+            )
+
+    def listing_calls(self):
+        return [call for call in responses.calls if "page=" in call.request.url]
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_checks_pass(self, mock_sleep):
+        """Test valid credentials let the listing continue past the first page."""
+        self.add_verify()
+        self.add_probe()
+        self.add_pages()
+
+        deployments = self.make_deleter().get_deployments_paginated()
+
+        self.assertEqual(len(deployments), 2)
+        urls = [call.request.url for call in responses.calls]
+        self.assertIn(f"{self.api_url}/user/tokens/verify", urls)
+        self.assertIn(f"{self.base_url}/test-project/deployments/{PROBE_DEPLOYMENT_ID}", urls)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_invalid_token_explains_failed_listing(self, mock_sleep):
+        """Test a token rejected by both verify endpoints explains why the first page failed."""
+        self.add_verify(status=401)
+        self.add_pages(status=403)
+
+        with self.assertRaises(AuthenticationError) as context:
+            self.make_deleter().get_deployments_paginated()
+
+        self.assertIn("rejected the API token", str(context.exception))
+        self.assertEqual(len(self.listing_calls()), 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_account_owned_token(self, mock_sleep):
+        """Test a token unknown to the user endpoint is verified at the account's endpoint."""
+        responses.add(responses.GET, f"{self.api_url}/user/tokens/verify", status=401,
+                      json={"success": False, "errors": [{"code": 1000, "message": "Invalid API Token"}]})
+        self.add_verify(path="/accounts/test_account_123/tokens/verify")
+        self.add_probe()
+        self.add_pages()
+
+        self.assertEqual(len(self.make_deleter().get_deployments_paginated()), 2)
+        self.assertIn(f"{self.api_url}/accounts/test_account_123/tokens/verify",
+                      [call.request.url for call in responses.calls])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_rejected_check_after_successful_listing_is_inconclusive(self, mock_sleep):
+        """Test a verify failure does not override a listing the credentials just completed."""
+        messages = []
+        hooks = DeletionHooks()
+        hooks.on_message = messages.append
+        self.add_verify(status=401)
+        self.add_pages(total_pages=3)
+
+        deployments = CloudflareDeploymentDeleter(
+            account_id="test_account_123", project_name="test-project", api_token="test_token_123",
+            hooks=hooks, preflight=True,
+        ).get_deployments_paginated()
+
+        self.assertEqual(len(deployments), 3)
+        self.assertTrue(any(message.startswith("Pre-flight credential check inconclusive") for message in messages))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_inactive_token(self, mock_sleep):
+        """Test a token that verifies but is not active is reported."""
+        self.add_verify(token_status="expired")
+        self.add_pages(status=403)
+
+        with self.assertRaises(AuthenticationError) as context:
+            self.make_deleter().get_deployments_paginated()
+
+        self.assertIn("The API token is expired", str(context.exception))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_missing_edit_permission(self, mock_sleep):
+        """Test a read-only token fails before any deletion or further listing."""
+        self.add_verify()
+        self.add_probe(status=403)
+        self.add_pages()
+
+        with self.assertRaises(PermissionDeniedError) as context:
+            self.make_deleter().run()
+
+        self.assertIn("Pages:Read and Pages:Edit", str(context.exception))
+        self.assertEqual(len(self.listing_calls()), 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_dry_run_skips_permission_probe(self, mock_sleep):
+        """Test dry runs only verify the credentials."""
+        self.add_verify()
+        self.add_pages(total_pages=1)
+
+        report = self.make_deleter(dry_run=True).run()
+
+        self.assertEqual(report.deleted_count, 1)
+        self.assertFalse(any(call.request.method == "DELETE" for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_results_cached_across_projects(self, mock_sleep):
+        """Test projects on the same account and credentials reuse the checks, failures included."""
+        self.add_verify()
+        self.add_probe("site-a")
+        self.add_pages("site-a", total_pages=1)
+        self.add_pages("site-b", total_pages=1)
+
+        self.make_deleter("site-a").get_deployments_paginated()
+        self.make_deleter("site-b").get_deployments_paginated()
+
+        verify_calls = [call for call in responses.calls if call.request.url.endswith("/user/tokens/verify")]
+        self.assertEqual(len(verify_calls), 1)
+
+        clear_preflight_cache()
+        responses.reset()
+        self.add_verify(status=401)
+        for project in ("site-a", "site-b"):
+            self.add_pages(project, status=403)
+        for project in ("site-a", "site-b"):
+            with self.assertRaises(AuthenticationError):
+                self.make_deleter(project).get_deployments_paginated()
+        # The failure is checked once and reused for the second project
+        verify_calls = [call for call in responses.calls if call.request.url.endswith("/tokens/verify")]
+        self.assertEqual(len(verify_calls), 2)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_inconclusive_check_is_not_cached(self, mock_sleep):
+        """Test a network failure during the checks lets the run continue and is retried later."""
+        # The verify endpoint is not mocked, so the request fails like a network error
+        self.add_pages(total_pages=1)
+
+        self.assertEqual(len(self.make_deleter().get_deployments_paginated()), 1)
+
+        self.add_verify()
+        self.add_probe()
+        self.make_deleter().get_deployments_paginated()
+        self.assertTrue(any(call.request.url.endswith("/user/tokens/verify") and call.response is not None
+                            for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_given_deployments_are_checked_before_deleting(self, mock_sleep):
+        """Test runs that skip the listing still check before their first deletion."""
+        self.add_verify()
+        self.add_probe(status=403)
+
+        with self.assertRaises(PermissionDeniedError):
+            self.make_deleter().run(deployments=[{"id": "d1", "environment": "preview"}])
+
+        self.assertFalse(any(call.request.url.endswith("/deployments/d1") for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_global_api_key_checks_user(self, mock_sleep):
+        """Test email and global API key credentials are verified against /user."""
+        responses.add(responses.GET, f"{self.api_url}/user", status=400,
+                      json={"success": False, "errors": [{"code": 9103, "message": "Unknown X-Auth-Key"}]})
+        self.add_pages(status=403)
+
+        with self.assertRaises(AuthenticationError) as context:
+            self.make_deleter(api_token=None, email="me@example.com", api_key="key").get_deployments_paginated()
+
+        self.assertIn("rejected the email and API key", str(context.exception))
+
+    def test_cli_flag(self):
+        """Test the CLI can skip the checks."""
+        self.assertTrue(build_parser().parse_args(["--no-preflight"]).no_preflight)
+        self.assertFalse(build_parser().parse_args([]).no_preflight)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,241 @@
+import http.client
+import json
+import os
+import tempfile
+import threading
+import unittest
+import urllib.error
+import urllib.request
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.circuit_breaker import CircuitBreaker
+from deleter.src.delete_deployments import build_parser
+from deleter.src.hooks import DeletionHooks
+from deleter.src.receiver import WebhookReceiver
+from tests.helpers import FakeClock
+
+
+def deployment(deployment_id, branch, day, environment="preview"):
+    return {
+        "id": deployment_id,
+        "environment": environment,
+        "created_on": f"2024-01-{day:02d}T00:00:00Z",
+        "deployment_trigger": {"metadata": {"branch": branch}},
+    }
+
+
+class TestWebhookReceiver(unittest.TestCase):
+    """Tests for event-driven pruning through the webhook receiver."""
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.config_path = os.path.join(self.temp_dir.name, "envfile")
+        self.write_config("site-a")
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/site-a"
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def write_config(self, projects, secret=None):
+        with open(self.config_path, "w") as f:
+            f.write("CF_ACCOUNT_ID=test_account_123\n")
+            f.write("CF_API_TOKEN=test_token_123\n")
+            f.write(f"CF_PAGES_PROJECT_NAMES={projects}\n")
+            f.write("PRUNE_KEEP=1\n")
+            if secret:
+                f.write(f"PRUNE_WEBHOOK_SECRET={secret}\n")
+
+    def make_receiver(self, **kwargs):
+        receiver = WebhookReceiver(self.config_path, hooks=DeletionHooks(), clock=self.clock, **kwargs)
+        receiver.reload_config()
+        return receiver
+
+    def set_page(self, page, total_pages, deployments):
+        responses.upsert(
+            responses.GET,
+            f"{self.base_url}/deployments?page={page}&per_page=25",
+            json={
+                "success": True,
+                "result": deployments,
+                "result_info": {"page": page, "per_page": 25, "total_pages": total_pages},
+            },
+            status=200,
+        )
+
+    def add_delete(self, deployment_id):
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/{deployment_id}", json={"success": True}, status=200)
+
+    def test_debounce_and_max_delay(self):
+        """Test a branch is due once events stop for the debounce period or after the maximum delay."""
+        receiver = self.make_receiver(debounce=5.0, max_delay=12.0)
+
+        self.assertEqual(receiver.submit([{"branch": "feature-x"}]), 1)
+        self.clock.now = 4.0
+        receiver.submit([{"project": "site-a", "branch": "feature-x"}, {"branch": "main"}])
+        self.assertEqual(receiver.due_batches(), {})
+        self.assertEqual(receiver.next_due(), 9.0)
+
+        # main has been quiet long enough; feature-x keeps receiving events until its maximum delay
+        self.clock.now = 9.0
+        receiver.submit([{"branch": "feature-x"}])
+        self.assertEqual(receiver.due_batches(), {"site-a": {"main"}})
+        self.clock.now = 12.0
+        self.assertEqual(receiver.due_batches(), {"site-a": {"feature-x"}})
+        self.assertEqual(receiver.pending(), {})
+
+    def test_invalid_events(self):
+        """Test malformed events and unknown projects are rejected without queuing anything."""
+        self.write_config("site-a,site-b")
+        receiver = self.make_receiver()
+
+        for events in ([{"branch": ""}], [{"project": "site-c", "branch": "main"}], [{"branch": "main"}], ["main"]):
+            with self.subTest(events=events), self.assertRaises(ValueError):
+                receiver.submit([{"project": "site-a", "branch": "ok"}] + events)
+        self.assertEqual(receiver.pending(), {})
+
+        with self.assertRaises(ValueError):
+            WebhookReceiver(self.config_path, debounce=10.0, max_delay=5.0)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_prunes_only_superseded_deployments_of_the_branch(self, mock_sleep):
+        """Test only older deployments of the reported branch are deleted, from a warm index."""
+        receiver = self.make_receiver()
+        self.set_page(1, 2, [deployment("x2", "feature-x", 4), deployment("m2", "main", 3)])
+        self.set_page(2, 2, [deployment("x1", "feature-x", 2), deployment("m1", "main", 1)])
+        self.add_delete("x1")
+
+        report = receiver.prune_branches("site-a", {"feature-x"})
+
+        self.assertEqual(list(report.outcomes), ["x1"])
+        self.assertEqual(len(receiver._indexes["site-a"]), 3)
+
+        # Steady state: a new deployment only costs the first listing page and its deletions
+        self.set_page(1, 2, [deployment("x3", "feature-x", 5), deployment("x2", "feature-x", 4),
+                             deployment("m2", "main", 3)])
+        self.add_delete("x2")
+        calls_before = len(responses.calls)
+
+        receiver.submit([{"branch": "feature-x"}])
+        self.clock.now = 10.0
+        receiver.flush_due()
+
+        urls = [call.request.url for call in responses.calls[calls_before:]]
+        self.assertEqual(urls, [f"{self.base_url}/deployments?page=1&per_page=25", f"{self.base_url}/deployments/x2"])
+        self.assertEqual(receiver.status["site-a"]["deleted"], 1)
+        self.assertEqual(receiver.status["site-a"]["branches"], ["feature-x"])
+        self.assertTrue(receiver.status["site-a"]["ok"])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_nothing_superseded(self, mock_sleep):
+        """Test a branch within its retention window deletes nothing."""
+        receiver = self.make_receiver()
+        self.set_page(1, 1, [deployment("x1", "feature-x", 1), deployment("m1", "main", 1)])
+
+        self.assertIsNone(receiver.prune_branches("site-a", {"feature-x"}))
+        self.assertFalse(any(call.request.method == "DELETE" for call in responses.calls))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_batch_after_an_outage_is_not_blocked(self, mock_sleep):
+        """Test a batch that gave up on the API does not stop the next batch."""
+        receiver = self.make_receiver()
+        receiver._branch_deleter("site-a").circuit_breaker = CircuitBreaker(failure_threshold=1, max_trips=0)
+        responses.add(responses.GET, f"{self.base_url}/deployments?page=1&per_page=25",
+                      json={"success": False, "errors": [{"code": 10000, "message": "unavailable"}]}, status=503)
+
+        receiver.submit([{"branch": "feature-x"}])
+        self.clock.now = 10.0
+        receiver.flush_due()
+        self.assertFalse(receiver.status["site-a"]["ok"])
+
+        responses.reset()
+        self.set_page(1, 1, [deployment("x2", "feature-x", 2), deployment("x1", "feature-x", 1)])
+        self.add_delete("x1")
+
+        report = receiver.prune_branches("site-a", {"feature-x"})
+
+        self.assertEqual(report.deleted_count, 1)
+
+    def test_http_events(self):
+        """Test events are accepted over HTTP with the configured bearer token."""
+        self.write_config("site-a", secret="s3cret")
+        receiver = self.make_receiver()
+        receiver.health_port = 0
+        receiver._start_health_server()
+        self.addCleanup(receiver._server.server_close)
+        self.addCleanup(receiver._server.shutdown)
+        url = f"http://127.0.0.1:{receiver.health_port}/events"
+
+        def post(body, token="s3cret"):
+            request = urllib.request.Request(url, data=json.dumps(body).encode(), method="POST")
+            if token:
+                request.add_header("Authorization", f"Bearer {token}")
+            try:
+                with urllib.request.urlopen(request, timeout=5) as response:
+                    return response.status, json.loads(response.read())
+            except urllib.error.HTTPError as e:
+                return e.code, json.loads(e.read())
+
+        self.assertEqual(post({"branch": "main"}, token="wrong")[0], 401)
+        self.assertEqual(post({"branch": "main"}, token=None)[0], 401)
+        self.assertEqual(post({"project": "site-z", "branch": "main"})[0], 400)
+        status, body = post([{"branch": "main"}, {"branch": "feature-x"}])
+        self.assertEqual(status, 202)
+        self.assertEqual(body, {"accepted": 2, "pending": {"site-a": ["feature-x", "main"]}})
+
+        with urllib.request.urlopen(f"http://127.0.0.1:{receiver.health_port}/healthz", timeout=5) as response:
+            self.assertEqual(json.loads(response.read())["pending"], {"site-a": ["feature-x", "main"]})
+
+    def test_invalid_content_length(self):
+        """Test a malformed or negative Content-Length is rejected without reading the body."""
+        receiver = self.make_receiver()
+        receiver.health_port = 0
+        receiver._start_health_server()
+        self.addCleanup(receiver._server.server_close)
+        self.addCleanup(receiver._server.shutdown)
+
+        for length, expected in (("abc", 400), ("-1", 400), (str(10 ** 9), 413)):
+            with self.subTest(length=length):
+                connection = http.client.HTTPConnection("127.0.0.1", receiver.health_port, timeout=5)
+                self.addCleanup(connection.close)
+                connection.putrequest("POST", "/events")
+                connection.putheader("Content-Length", length)
+                connection.endheaders()
+                response = connection.getresponse()
+                self.assertEqual(response.status, expected)
+                self.assertIn("error", json.loads(response.read()))
+        self.assertEqual(receiver.pending(), {})
+
+    def test_serve_forever_stops(self):
+        """Test the receive loop exits when stopped and reports dropped events."""
+        messages = []
+        hooks = DeletionHooks()
+        hooks.on_message = messages.append
+        receiver = WebhookReceiver(self.config_path, port=0, debounce=300.0, max_delay=300.0, hooks=hooks)
+        thread = threading.Thread(target=receiver.serve_forever)
+        thread.start()
+        while receiver._server is None:
+            thread.join(0.01)
+
+        receiver.submit([{"branch": "main"}])
+        receiver.stop()
+        thread.join(5)
+
+        self.assertFalse(thread.is_alive())
+        self.assertIn("Dropping 1 pending branch events; the next event for a branch catches up", messages)
+
+    def test_cli_flags(self):
+        """Test the receiver flags are parsed."""
+        args = build_parser().parse_args(["--receiver", "--debounce", "2", "--max-batch-delay", "30"])
+
+        self.assertTrue(args.receiver)
+        self.assertEqual((args.debounce, args.max_batch_delay), (2.0, 30.0))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,138 @@
+import threading
+import time
+import unittest
+from unittest.mock import patch
+
+import responses
+
+import deleter
+from deleter.src.delete_deployments import CloudflareDeploymentDeleter
+from deleter.src.errors import DeleterError, PermissionDeniedError
+from deleter.src.hooks import ConsoleHooks, DeletionHooks
+from deleter.src.retry_queue import NOT_FOUND
+from tests.helpers import add_listing, make_deleter
+
+
+class RecordingHooks(DeletionHooks):
+    """Hooks that collect events instead of printing."""
+
+    def __init__(self):
+        self.events = []
+
+    def on_message(self, message):
+        self.events.append(("message", message))
+
+    def on_deletion_result(self, outcome, retryable):
+        self.events.append(("result", outcome.deployment_id, outcome.success))
+
+    def on_complete(self, report):
+        self.events.append(("complete", report.project_name))
+
+
+class TestLibraryAPI(unittest.TestCase):
+    """Tests for running the deleter in-process."""
+
+    def setUp(self):
+        self.account_id = "test_account_123"
+
+    def base_url(self, project_name):
+        return f"https://api.cloudflare.com/client/v4/accounts/{self.account_id}/pages/projects/{project_name}"
+
+    def make_deleter(self, project_name, hooks):
+        return make_deleter(account_id=self.account_id, project_name=project_name, hooks=hooks)
+
+    def add_listing(self, project_name, ids):
+        add_listing(f"{self.base_url(project_name)}/deployments?page=1&per_page=25",
+                    [{"id": deployment_id} for deployment_id in ids], total_count=len(ids))
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_returns_report_for_many_projects(self, mock_sleep):
+        """Test several projects can be processed in one process without printing."""
+        hooks = RecordingHooks()
+        self.add_listing("site-a", ["a1", "a2"])
+        self.add_listing("site-b", ["b1"])
+        responses.add(responses.DELETE, f"{self.base_url('site-a')}/deployments/a1", json={"success": True}, status=200)
+        responses.add(responses.DELETE, f"{self.base_url('site-a')}/deployments/a2", json={"success": False}, status=404)
+        responses.add(responses.DELETE, f"{self.base_url('site-b')}/deployments/b1", json={"success": True}, status=200)
+
+        with patch('builtins.print') as mock_print:
+            report_a = self.make_deleter("site-a", hooks).run()
+            report_b = self.make_deleter("site-b", hooks).run()
+        mock_print.assert_not_called()
+
+        self.assertEqual(report_a.found, 2)
+        self.assertEqual(report_a.deleted_count, 1)
+        self.assertEqual(report_a.failed_count, 1)
+        self.assertEqual(report_a.error_classes, {NOT_FOUND: 1})
+        self.assertEqual(report_a.outcomes["a1"].attempts, 1)
+        self.assertEqual(report_a.requests, {"GET": 1, "DELETE": 2})
+        self.assertEqual(report_a.listing_pages, 1)
+        self.assertFalse(report_a.aborted)
+        self.assertEqual(report_b.deleted_count, 1)
+        self.assertEqual(report_b.to_dict()["outcomes"][0]["deployment_id"], "b1")
+        self.assertIn(("complete", "site-a"), hooks.events)
+        self.assertIn(("result", "b1", True), hooks.events)
+
+    @responses.activate
+    def test_listing_errors_raise_typed_exceptions(self):
+        """Test a listing failure raises instead of exiting the process."""
+        responses.add(
+            responses.GET,
+            f"{self.base_url('site-a')}/deployments?page=1&per_page=25",
+            json={"success": False, "errors": [{"code": 10000, "message": "Authentication error"}]},
+            status=403,
+        )
+
+        with self.assertRaises(PermissionDeniedError) as ctx:
+            self.make_deleter("site-a", DeletionHooks()).get_deployments_paginated()
+        self.assertIsInstance(ctx.exception, DeleterError)
+        self.assertEqual(ctx.exception.status_code, 403)
+
+    def test_package_exports(self):
+        """Test the library API is importable from the top-level package."""
+        self.assertIs(deleter.CloudflareDeploymentDeleter, CloudflareDeploymentDeleter)
+        self.assertIs(deleter.PermissionDeniedError, PermissionDeniedError)
+
+
+class SlowStdout:
+    """Stdout that yields to other threads on every write, like a slow terminal."""
+
+    def __init__(self):
+        self.chunks = []
+
+    def write(self, text):
+        self.chunks.append(text)
+        time.sleep(0.0001)
+
+    def flush(self):
+        pass
+
+
+class TestConsoleHooks(unittest.TestCase):
+    """Tests for the command-line progress output."""
+
+    def test_lines_from_worker_threads_do_not_interleave(self):
+        """Test concurrent deletion workers print whole lines."""
+        hooks = ConsoleHooks()
+        stdout = SlowStdout()
+
+        def worker(name):
+            for index in range(20):
+                hooks.on_deletion_start(index + 1, 20, f"{name}-{index}")
+
+        with patch('sys.stdout', stdout):
+            threads = [threading.Thread(target=worker, args=(f"w{n}",)) for n in range(4)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        lines = "".join(stdout.chunks).splitlines()
+        self.assertEqual(len(lines), 80)
+        for line in lines:
+            self.assertRegex(line, r"^\[\d+/20\] \(\d+\.\d%\) Deleting deployment: w\d-\d+$")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,151 @@
+import json
+import os
+import tempfile
+import unittest
+from unittest.mock import patch, MagicMock
+
+import responses
+
+from deleter.src.delete_deployments import CloudflareDeploymentDeleter
+from deleter.src.retry_queue import (
+    ALIASED, NOT_FOUND, RATE_LIMITED, SERVER_ERROR, DeferredRetryQueue, classify_response,
+)
+
+
+def make_response(status_code, errors=None):
+    response = MagicMock()
+    response.status_code = status_code
+    response.json.return_value = {"success": False, "errors": errors or []}
+    return response
+
+
+class TestClassifyResponse(unittest.TestCase):
+    """Tests for grouping failed responses into error classes."""
+
+    def test_classify_response(self):
+        """Test each status and error code maps to its error class."""
+        self.assertEqual(classify_response(make_response(429)), RATE_LIMITED)
+        self.assertEqual(classify_response(make_response(502)), SERVER_ERROR)
+        self.assertEqual(classify_response(make_response(404)), NOT_FOUND)
+        self.assertEqual(
+            classify_response(make_response(400, [{"code": 8000035, "message": "Cannot delete aliased deployment"}])),
+            ALIASED,
+        )
+
+
+class TestDeferredRetryQueue(unittest.TestCase):
+    """Tests for the DeferredRetryQueue."""
+
+    def test_only_retryable_classes_are_retried(self):
+        """Test non-retryable failures are reported but never retried."""
+        sleeps = []
+        queue = DeferredRetryQueue(max_attempts=3, backoff=1.0, sleep=sleeps.append)
+        self.assertTrue(queue.add({"id": "a"}, RATE_LIMITED))
+        self.assertFalse(queue.add({"id": "b"}, ALIASED))
+
+        retried = []
+        recovered = queue.drain(lambda item: (retried.append(item["id"]) or True, None))
+
+        self.assertEqual(retried, ["a"])
+        self.assertEqual(recovered, [{"id": "a"}])
+        self.assertEqual(queue.summary(), {ALIASED: 1})
+        self.assertEqual(sleeps, [1.0])
+
+    def test_backoff_doubles_between_rounds(self):
+        """Test repeated failures back off exponentially and stop after max attempts."""
+        sleeps = []
+        queue = DeferredRetryQueue(max_attempts=3, backoff=2.0, sleep=sleeps.append)
+        queue.add({"id": "a"}, SERVER_ERROR)
+
+        recovered = queue.drain(lambda item: (False, SERVER_ERROR))
+
+        self.assertEqual(recovered, [])
+        self.assertEqual(sleeps, [2.0, 4.0, 8.0])
+        self.assertEqual(queue.failed_count(), 1)
+
+
+class TestDeleterRetries(unittest.TestCase):
+    """Tests for deferred retries during a run."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        self.deleter = CloudflareDeploymentDeleter(
+            account_id="test_account_123",
+            project_name="test-project",
+            api_token="test_token_123",
+            retry_queue=DeferredRetryQueue(sleep=lambda seconds: None),
+        )
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_retries_transient_failures_after_main_pass(self, mock_sleep):
+        """Test a server error is retried after the main pass while aliased errors are not."""
+        responses.add(
+            responses.GET,
+            f"{self.base_url}/deployments?page=1&per_page=25",
+            json={
+                "success": True,
+                "result": [{"id": "deployment1"}, {"id": "deployment2"}, {"id": "deployment3"}],
+                "result_info": {"page": 1, "per_page": 25, "total_count": 3, "total_pages": 1},
+            },
+            status=200,
+        )
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment1",
+                      json={"success": False}, status=503)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment1",
+                      json={"success": True}, status=200)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment2",
+                      json={"success": False, "errors": [{"code": 8000035, "message": "Cannot delete aliased deployment"}]},
+                      status=400)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/deployment3",
+                      json={"success": True}, status=200)
+
+        with patch('sys.stdout'):
+            self.deleter.run()
+
+        delete_urls = [c.request.url for c in responses.calls if c.request.method == "DELETE"]
+        self.assertEqual(delete_urls.count(f"{self.base_url}/deployments/deployment1"), 2)
+        self.assertEqual(delete_urls.count(f"{self.base_url}/deployments/deployment2"), 1)
+        self.assertEqual(self.deleter.retry_queue.summary(), {ALIASED: 1})
+        # The main pass never slows down after a failure
+        self.assertEqual([c.args[0] for c in mock_sleep.call_args_list], [0.5, 0.5, 0.5])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_reused_deleter_starts_each_run_with_an_empty_queue(self, mock_sleep):
+        """Test a deleter reused across runs, as the daemon does, forgets earlier runs' failures."""
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1", json={"success": False}, status=500)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": True}, status=200)
+
+        with patch('sys.stdout'):
+            first = self.deleter.run(deployments=[{"id": "d1"}])
+            second = self.deleter.run(deployments=[{"id": "d2"}])
+
+        self.assertFalse(first.outcomes["d1"].success)
+        self.assertEqual(list(second.outcomes), ["d2"])
+        self.assertEqual(self.deleter.retry_queue.summary(), {})
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_only_retryable_failures_remain(self, mock_sleep):
+        """Test a stopped run saves and reports retryable failures, not ones a retry cannot fix."""
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1",
+                      json={"success": False, "errors": [{"code": 8000035, "message": "Cannot delete aliased deployment"}]},
+                      status=400)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": False}, status=500)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            self.deleter.state_file = os.path.join(temp_dir, "state.json")
+            self.deleter.max_deletes = 2
+            with patch('sys.stdout'):
+                report = self.deleter.run(deployments=[{"id": "d1"}, {"id": "d2"}, {"id": "d3"}])
+            with open(self.deleter.state_file) as f:
+                saved = [deployment["id"] for deployment in json.load(f)["pending"]]
+
+        self.assertEqual(report.failed_count, 2)
+        self.assertEqual(report.remaining, ["d2", "d3"])
+        self.assertEqual(saved, ["d2", "d3"])
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+import unittest
+
+ROOT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+class TestStartup(unittest.TestCase):
+    """Tests that the command-line entry points start without heavy imports."""
+
+    def run_python(self, *args):
+        env = {key: value for key, value in os.environ.items() if not key.startswith(("CF_", "CLOUDFLARE_"))}
+        env["PYTHONPATH"] = ROOT_DIR
+        return subprocess.run([sys.executable, *args], cwd=ROOT_DIR, env=env, capture_output=True, text=True)
+
+    def test_import_and_parse_do_not_load_requests(self):
+        """Test importing the CLI module and parsing arguments leaves requests unloaded."""
+        result = self.run_python("-c", (
+            "import sys\n"
+            "import deleter.src.delete_deployments as module\n"
+            "module.build_parser().parse_args(['--dry-run'])\n"
+            "print('requests' in sys.modules)\n"
+        ))
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertEqual(result.stdout.strip(), "False")
+
+    def test_wrapper_version(self):
+        """Test the root wrapper reaches the CLI through its single import path."""
+        result = self.run_python(os.path.join(ROOT_DIR, "delete_deployments.py"), "--version")
+
+        self.assertEqual(result.returncode, 0, result.stderr)
+        self.assertIn("1.0.0", result.stdout)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+import json
+import socket
+import threading
+import time
+import unittest
+from unittest.mock import patch
+from urllib.parse import parse_qs, urlparse
+
+import responses
+
+from deleter.src.accounting import RequestLedger
+from deleter.src.circuit_breaker import CircuitBreaker
+from deleter.src.delete_deployments import build_parser
+from deleter.src.errors import DeadlineExceededError
+from deleter.src.retry_queue import SERVER_ERROR, DeferredRetryQueue
+from deleter.src.transport import Transport
+from tests.helpers import FakeClock, make_deleter
+
+
+class FakeResponse:
+    status_code = 200
+    text = ""
+    headers = {}
+
+    def __init__(self, body):
+        self.body = body
+
+    def json(self):
+        return self.body
+
+
+class RecordingTransport(Transport):
+    """Answer every listing with one empty page and remember the timeouts asked for."""
+
+    def __init__(self):
+        self.timeouts = []
+
+    def request(self, method, url, headers=None, params=None, timeout=None):
+        self.timeouts.append(timeout)
+        return FakeResponse({"success": True, "result": [], "result_info": {"page": 1, "total_pages": 1}})
+
+
+class TestTimeoutsAndDeadline(unittest.TestCase):
+    """Tests for request timeouts and the overall run deadline."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    def test_requests_have_timeouts(self):
+        """Test every request gets connect and read timeouts, cut short near the deadline."""
+        transport = RecordingTransport()
+        make_deleter(transport=transport).get_deployments_paginated()
+        make_deleter(transport=transport, connect_timeout=2, read_timeout=5).get_deployments_paginated()
+        make_deleter(transport=transport, read_timeout=30, deadline=3).run()
+
+        self.assertEqual(transport.timeouts[:2], [(10.0, 60.0), (2, 5)])
+        connect, read = transport.timeouts[2]
+        self.assertLessEqual(connect, 3)
+        self.assertLessEqual(read, 3)
+
+        for kwargs in ({"connect_timeout": 0}, {"read_timeout": -1}, {"hedge_percentile": 100}):
+            with self.subTest(**kwargs), self.assertRaises(ValueError):
+                make_deleter(**kwargs)
+
+    def test_stalled_listing_stops_at_deadline(self):
+        """Test a server that accepts connections but never answers cannot hang the run."""
+        server = socket.socket()
+        server.bind(("127.0.0.1", 0))
+        server.listen(16)
+        self.addCleanup(server.close)
+
+        deleter = make_deleter(
+            base_url=f"http://127.0.0.1:{server.getsockname()[1]}",
+            read_timeout=0.2,
+            deadline=1.0,
+        )
+        started = time.monotonic()
+        report = deleter.run()
+
+        self.assertLess(time.monotonic() - started, 3.0)
+        self.assertEqual(report.stop_reason, "deadline of 1s reached")
+        self.assertEqual(report.outcomes, {})
+        self.assertGreater(report.requests["GET"], 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_deadline_stops_deletions(self, mock_sleep):
+        """Test deletions are not scheduled past the deadline and are reported as remaining."""
+        deployments = [{"id": "d1", "environment": "preview"}, {"id": "d2", "environment": "preview"}]
+
+        report = make_deleter(deadline=0).run(deployments=deployments)
+
+        self.assertEqual(len(responses.calls), 0)
+        self.assertEqual(report.stop_reason, "deadline of 0s reached")
+        self.assertEqual(report.remaining, ["d1", "d2"])
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_deadline_skips_retry_rounds(self, mock_sleep):
+        """Test a retry round whose backoff would end after the deadline is not started."""
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1", json={"success": False}, status=500)
+        queue = DeferredRetryQueue(backoff=30.0, sleep=lambda seconds: self.fail("retry round started"))
+
+        deleter = make_deleter(deadline=10, retry_queue=queue)
+        report = deleter.run(deployments=[{"id": "d1"}])
+
+        self.assertEqual(len(responses.calls), 1)
+        self.assertEqual(report.outcomes["d1"].error_class, SERVER_ERROR)
+        self.assertEqual(deleter.retry_queue.summary(), {SERVER_ERROR: 1})
+
+    def test_waits_end_at_deadline(self):
+        """Test the request window and an open circuit give up at the deadline instead of waiting it out."""
+        clock = FakeClock()
+        ledger = RequestLedger(window_requests=1, window=60.0, clock=clock, sleep=clock.sleep)
+        ledger.acquire()
+        with self.assertRaises(DeadlineExceededError):
+            ledger.acquire(deadline=30.0)
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60.0, clock=clock, sleep=clock.sleep)
+        breaker.record_failure()
+        with self.assertRaises(DeadlineExceededError):
+            breaker.before_request(deadline=clock.now + 5.0)
+        self.assertEqual(clock.now, 5.0)
+
+    def test_cli_flags(self):
+        """Test the timeout, deadline and hedging flags are parsed."""
+        args = build_parser().parse_args(["--read-timeout", "20", "--deadline", "900", "--hedge-listing", "90"])
+
+        self.assertEqual((args.connect_timeout, args.read_timeout), (10.0, 20.0))
+        self.assertEqual((args.deadline, args.hedge_listing), (900.0, 90.0))
+
+
+class TestHedgedListing(unittest.TestCase):
+    """Tests for hedging slow listing requests."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        self.release = threading.Event()
+        self.addCleanup(self.release.set)
+        self.page_calls = {}
+
+    def add_listing(self, total_pages, stall_page):
+        def callback(request):
+            page = int(parse_qs(urlparse(request.url).query)["page"][0])
+            self.page_calls[page] = self.page_calls.get(page, 0) + 1
+            if page == stall_page and self.page_calls[page] == 1:
+                # The first request for this page stalls until the test ends
+                self.release.wait(10)
+            body = {
+                "success": True,
+                "result": [{"id": f"d{page}", "environment": "preview"}],
+                "result_info": {"page": page, "per_page": 25, "total_pages": total_pages},
+            }
+            return 200, {}, json.dumps(body)
+
+        responses.add_callback(responses.GET, f"{self.base_url}/deployments", callback=callback)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_slow_page_is_hedged(self, mock_sleep):
+        """Test a page slower than the percentile is requested again and the first answer wins."""
+        self.add_listing(total_pages=4, stall_page=4)
+        deleter = make_deleter(hedge_percentile=50)
+
+        started = time.monotonic()
+        deployments = deleter.get_deployments_paginated()
+
+        self.assertLess(time.monotonic() - started, 5.0)
+        self.assertEqual([d["id"] for d in deployments], ["d1", "d2", "d3", "d4"])
+        self.assertEqual(self.page_calls[4], 2)
+        self.assertEqual(deleter.hedged_requests, 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_no_hedging_without_samples_or_budget(self, mock_sleep):
+        """Test early pages and runs without request budget left are not hedged."""
+        self.add_listing(total_pages=3, stall_page=None)
+        deleter = make_deleter(hedge_percentile=50)
+        deleter.get_deployments_paginated()
+        self.assertEqual(deleter.hedged_requests, 0)
+
+        # With the budget used up, the stalled page is waited out instead
+        responses.reset()
+        self.page_calls.clear()
+        self.add_listing(total_pages=4, stall_page=4)
+        timer = threading.Timer(0.3, self.release.set)
+        timer.start()
+        self.addCleanup(timer.cancel)
+        deleter = make_deleter(hedge_percentile=50, ledger=RequestLedger(max_requests=4))
+        deleter.get_deployments_paginated()
+        self.assertEqual(deleter.hedged_requests, 0)
+        self.assertEqual(self.page_calls[4], 1)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_report_counts_hedged_requests(self, mock_sleep):
+        """Test the run report counts hedged listing requests."""
+        self.add_listing(total_pages=4, stall_page=4)
+
+        report = make_deleter(hedge_percentile=50, dry_run=True).run()
+
+        self.assertEqual(report.deleted_count, 4)
+        self.assertEqual(report.hedged_requests, 1)
+        self.assertEqual(report.to_dict()["hedged_requests"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
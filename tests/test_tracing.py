@@ -0,0 +1,209 @@
+import json
+import os
+import tempfile
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.accounting import RequestLedger
+from deleter.src.delete_deployments import build_parser
+from deleter.src.tracing import NullTracer, Tracer
+from tests.helpers import add_listing, make_deleter
+
+
+class TestTracer(unittest.TestCase):
+    """Tests for recording spans and exporting traces."""
+
+    def test_spans_nest_per_thread(self):
+        """Test spans nest on their thread and can be adopted by worker threads."""
+        tracer = Tracer()
+        with tracer.span("run", "run") as run:
+            with tracer.span("page", "listing", page=1) as page:
+                page.attributes["deployments"] = 3
+
+            def worker():
+                with tracer.within(run), tracer.span("delete", "delete"):
+                    pass
+
+            thread = threading.Thread(target=worker, name="worker")
+            thread.start()
+            thread.join()
+
+        spans = {span.name: span for span in tracer.spans}
+        self.assertIsNone(spans["run"].parent_id)
+        self.assertEqual(spans["page"].parent_id, run.span_id)
+        self.assertEqual(spans["delete"].parent_id, run.span_id)
+        self.assertEqual(spans["page"].attributes, {"page": 1, "deployments": 3})
+        self.assertGreaterEqual(spans["run"].duration, spans["page"].duration)
+        self.assertEqual(set(tracer.thread_names.values()), {"MainThread", "worker"})
+
+    def test_failed_span_records_error(self):
+        """Test a span closed by an exception records the error type."""
+        tracer = Tracer()
+        with self.assertRaises(KeyError), tracer.span("lookup", "run"):
+            raise KeyError("missing")
+
+        self.assertEqual(tracer.spans[0].attributes["error"], "KeyError")
+        self.assertEqual(tracer.otlp_payload()["resourceSpans"][0]["scopeSpans"][0]["spans"][0]["status"]["code"], 2)
+
+    def test_chrome_trace(self):
+        """Test the Chrome trace has complete events, thread names and counters in microseconds."""
+        tracer = Tracer()
+        tracer.record("pause", "wait", 1.0, 1.5, attempt=1, error_class=None)
+        tracer.counter("deletions in flight", 2)
+
+        with tempfile.TemporaryDirectory() as temp_dir:
+            path = os.path.join(temp_dir, "trace.json")
+            tracer.write_chrome_trace(path)
+            with open(path) as f:
+                events = json.load(f)["traceEvents"]
+
+        complete = [event for event in events if event["ph"] == "X"]
+        self.assertEqual(len(complete), 1)
+        self.assertEqual((complete[0]["ts"], complete[0]["dur"]), (1e6, 0.5e6))
+        self.assertEqual(complete[0]["args"], {"attempt": 1})
+        self.assertIn({"name": "thread_name", "ph": "M", "pid": 1, "tid": 1, "args": {"name": "MainThread"}}, events)
+        self.assertEqual([event["args"] for event in events if event["ph"] == "C"], [{"value": 2}])
+
+    def test_otlp_export(self):
+        """Test spans are posted to the collector as OTLP/HTTP JSON."""
+        received = []
+
+        class Collector(BaseHTTPRequestHandler):
+            def do_POST(self):
+                received.append((self.path, json.loads(self.rfile.read(int(self.headers["Content-Length"])))))
+                self.send_response(200)
+                self.end_headers()
+
+            def log_message(self, format, *args):
+                pass
+
+        server = ThreadingHTTPServer(("127.0.0.1", 0), Collector)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        self.addCleanup(server.server_close)
+        self.addCleanup(server.shutdown)
+
+        tracer = Tracer(service_name="pruner")
+        with tracer.span("run", "run"):
+            with tracer.span("GET", "http", status=200, ok=True, share=0.5):
+                pass
+        tracer.export_otlp(f"http://127.0.0.1:{server.server_address[1]}")
+
+        path, payload = received[0]
+        self.assertEqual(path, "/v1/traces")
+        resource_spans = payload["resourceSpans"][0]
+        self.assertEqual(resource_spans["resource"]["attributes"],
+                         [{"key": "service.name", "value": {"stringValue": "pruner"}}])
+        run, request = resource_spans["scopeSpans"][0]["spans"]
+        self.assertEqual(request["parentSpanId"], run["spanId"])
+        self.assertEqual(request["traceId"], tracer.trace_id)
+        self.assertEqual(request["kind"], 3)
+        self.assertLessEqual(int(run["startTimeUnixNano"]), int(request["startTimeUnixNano"]))
+        attributes = {item["key"]: item["value"] for item in request["attributes"]}
+        self.assertEqual(attributes["status"], {"intValue": "200"})
+        self.assertEqual(attributes["ok"], {"boolValue": True})
+        self.assertEqual(attributes["share"], {"doubleValue": 0.5})
+
+        with self.assertRaises(ValueError):
+            tracer.export_otlp("http://127.0.0.1:1")
+
+    def test_null_tracer(self):
+        """Test the default tracer records nothing."""
+        tracer = NullTracer()
+        with tracer.span("run", "run") as span:
+            span.attributes["deleted"] = 1
+        tracer.record("pause", "wait", 0.0, 1.0)
+        tracer.counter("deletions in flight", 1)
+
+        self.assertEqual((tracer.spans, tracer.counters), ([], []))
+
+
+class TestRunTracing(unittest.TestCase):
+    """Tests for the spans a deletion run records."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        self.tracer = Tracer()
+
+    def make_deleter(self, **kwargs):
+        return make_deleter(tracer=self.tracer, **kwargs)
+
+    def add_listing(self, ids, env=None):
+        add_listing(f"{self.base_url}/deployments",
+                    [{"id": deployment_id, "environment": env or "preview"} for deployment_id in ids])
+
+    def spans(self, name):
+        return [span for span in self.tracer.spans if span.name == name]
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_run_timeline(self, mock_sleep):
+        """Test listing pages, requests, deletions and retries nest under the run span."""
+        self.add_listing(["d1", "d2", "d3"])
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d1", json={"success": True}, status=200)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": False}, status=500)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2", json={"success": True}, status=200)
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d3", json={"success": True}, status=200)
+
+        report = self.make_deleter(concurrency=2).run()
+
+        self.assertEqual(report.deleted_count, 3)
+        [run] = self.spans("run")
+        self.assertEqual(run.attributes["deleted"], 3)
+        [page] = self.spans("listing page")
+        self.assertEqual((page.parent_id, page.attributes), (run.span_id, {"page": 1, "deployments": 3}))
+        self.assertEqual(self.spans("GET")[0].parent_id, page.span_id)
+
+        deletes = self.spans("delete")
+        self.assertEqual(len(deletes), 4)
+        [retries] = self.spans("retries")
+        main_pass = [span for span in deletes if span.parent_id == run.span_id]
+        retried = [span for span in deletes if span.parent_id == retries.span_id]
+        self.assertEqual(len(main_pass), 3)
+        self.assertEqual([span.attributes["attempt"] for span in retried], [2])
+        self.assertEqual(retried[0].attributes["deployment_id"], "d2")
+        [backoff] = self.spans("retry backoff")
+        self.assertEqual(backoff.duration, 2.0)
+
+        statuses = sorted(span.attributes["status"] for span in self.spans("DELETE"))
+        self.assertEqual(statuses, [200, 200, 200, 500])
+        self.assertEqual(max(value for name, at, value in self.tracer.counters), 2)
+
+    @responses.activate
+    def test_request_window_wait(self):
+        """Test time spent waiting for the request window shows up as a wait span."""
+        self.add_listing([])
+        deleter = self.make_deleter(ledger=RequestLedger(window_requests=1, window=0.05))
+
+        deleter.get_deployments_paginated()
+        deleter.get_deployments_paginated()
+
+        [wait] = self.spans("request window wait")
+        self.assertEqual(wait.category, "wait")
+        self.assertGreater(wait.duration, 0.01)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_environment_queues_nest_under_run(self, mock_sleep):
+        """Test each environment queue's run span nests under the combined run."""
+        for env in ("preview", "production"):
+            self.add_listing([], env=env)
+
+        self.make_deleter(env="preview,production").run()
+
+        outer, *queues = sorted(self.spans("run"), key=lambda span: span.parent_id is not None)
+        self.assertEqual(sorted(span.attributes["env"] for span in queues), ["preview", "production"])
+        self.assertTrue(all(span.parent_id == outer.span_id for span in queues))
+
+    def test_cli_flags(self):
+        """Test the tracing flags are parsed."""
+        args = build_parser().parse_args(["--trace", "run.trace.json", "--otlp-endpoint", "http://localhost:4318"])
+
+        self.assertEqual((args.trace, args.otlp_endpoint), ("run.trace.json", "http://localhost:4318"))
+
+
+if __name__ == '__main__':
+    unittest.main()
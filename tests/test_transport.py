@@ -0,0 +1,71 @@
+import importlib.util
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from benchmarks.standin_server import StandinAPI, StandinServer
+from deleter.src.transport import RequestsTransport, create_transport
+from tests.helpers import make_deleter
+
+HAS_HTTP2 = all(importlib.util.find_spec(name) for name in ("httpx", "h2"))
+
+
+class TestTransports(unittest.TestCase):
+    """Tests for transport selection and concurrent deletions."""
+
+    def test_create_transport(self):
+        """Test transports are created by name and unknown names are rejected."""
+        self.assertIsInstance(create_transport("http1", concurrency=4), RequestsTransport)
+        with self.assertRaises(ValueError):
+            create_transport("spdy")
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_concurrent_deletes_record_every_outcome(self, mock_sleep):
+        """Test deleting with several requests in flight still records each deployment once."""
+        base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+        deployments = [{"id": f"d{i}", "environment": "preview"} for i in range(12)]
+        for deployment in deployments:
+            status = 500 if deployment["id"] == "d3" else 200
+            responses.add(responses.DELETE, f"{base_url}/deployments/{deployment['id']}",
+                          json={"success": status == 200}, status=status)
+
+        report = make_deleter(concurrency=4).run(deployments=deployments)
+
+        self.assertEqual(len(report.outcomes), 12)
+        self.assertEqual(report.deleted_count, 11)
+        self.assertEqual(report.failed_count, 1)
+        self.assertFalse(report.outcomes["d3"].success)
+
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_http1_stand_in(self, mock_sleep):
+        """Test the HTTP/1.1 transport opens a connection per in-flight request."""
+        api = StandinAPI(deployments=30, latency=0.01)
+        with StandinServer(api, protocol="http1") as server:
+            transport = create_transport("http1", concurrency=4)
+            report = make_deleter(concurrency=4, transport=transport, base_url=server.base_url).run()
+            transport.close()
+
+        self.assertEqual(report.deleted_count, 30)
+        self.assertEqual(api.deployments, [])
+        self.assertGreater(api.connections, 1)
+
+    @unittest.skipUnless(HAS_HTTP2, "httpx[http2] is not installed")
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_http2_multiplexes_over_one_connection(self, mock_sleep):
+        """Test the HTTP/2 transport keeps every request on a single connection."""
+        api = StandinAPI(deployments=60, latency=0.02)
+        with StandinServer(api, protocol="h2c") as server:
+            transport = create_transport("http2")
+            report = make_deleter(concurrency=8, transport=transport, base_url=server.base_url).run()
+            transport.close()
+
+        self.assertEqual(report.deleted_count, 60)
+        self.assertEqual(report.failed_count, 0)
+        self.assertEqual(api.connections, 1)
+        self.assertGreater(api.peak_in_flight, 1)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,189 @@
+import unittest
+from unittest.mock import patch
+
+import responses
+
+from deleter.src.accounting import RequestLedger
+from deleter.src.delete_deployments import build_parser
+from deleter.src.report import VerificationResult
+from tests.helpers import add_listing, make_deleter
+
+
+class TestVerification(unittest.TestCase):
+    """Tests for checking deletions with listing counts and sampled lookups."""
+
+    def setUp(self):
+        self.base_url = "https://api.cloudflare.com/client/v4/accounts/test_account_123/pages/projects/test-project"
+
+    def make_deleter(self, **kwargs):
+        return make_deleter(verify=True, **kwargs)
+
+    def add_listing(self, ids, total_count=None):
+        add_listing(f"{self.base_url}/deployments",
+                    [{"id": deployment_id, "environment": "preview"} for deployment_id in ids],
+                    total_count=len(ids) if total_count is None else total_count)
+
+    def add_delete(self, deployment_id):
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/{deployment_id}", json={"success": True}, status=200)
+
+    def add_lookup(self, deployment_id, found=False):
+        if found:
+            responses.add(responses.GET, f"{self.base_url}/deployments/{deployment_id}",
+                          json={"success": True, "result": {"id": deployment_id}}, status=200)
+        else:
+            responses.add(responses.GET, f"{self.base_url}/deployments/{deployment_id}",
+                          json={"success": False, "errors": [{"code": 8000009, "message": "not found"}]}, status=404)
+
+    def urls(self):
+        return [(call.request.method, call.request.url) for call in responses.calls]
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_verified_run(self, mock_sleep):
+        """Test the count drops by the deletions and every sampled deployment is gone."""
+        self.add_listing(["d1", "d2", "d3"])
+        self.add_listing([])
+        for deployment_id in ("d1", "d2", "d3"):
+            self.add_delete(deployment_id)
+            self.add_lookup(deployment_id)
+
+        report = self.make_deleter().run()
+
+        verification = report.verification
+        self.assertTrue(verification.verified)
+        self.assertEqual((verification.total_before, verification.total_after, verification.expected_after), (3, 0, 0))
+        self.assertEqual((verification.sampled, verification.still_present), (3, []))
+        # One listing page and three lookups instead of a second run
+        self.assertEqual(verification.requests, 4)
+        self.assertEqual(report.to_dict()["verification"]["verified"], True)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_surviving_deployment_is_deleted_again(self, mock_sleep):
+        """Test a sampled deployment that is still there is deleted again."""
+        self.add_listing(["d1", "d2"])
+        self.add_listing([], total_count=1)
+        self.add_delete("d1")
+        self.add_delete("d2")
+        self.add_lookup("d1")
+        self.add_lookup("d2", found=True)
+
+        report = self.make_deleter().run()
+
+        verification = report.verification
+        self.assertFalse(verification.verified)
+        self.assertEqual(verification.discrepancy, 1)
+        self.assertEqual((verification.still_present, verification.redeleted), (["d2"], 1))
+        self.assertEqual(report.outcomes["d2"].attempts, 2)
+        deletes = [url for method, url in self.urls() if method == "DELETE"]
+        self.assertEqual(deletes.count(f"{self.base_url}/deployments/d2"), 2)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_new_deployments_and_unsampled_shortfall(self, mock_sleep):
+        """Test new deployments on the first page are expected, and a shortfall without sampling is reported."""
+        self.add_listing(["d1", "d2"])
+        self.add_listing(["n1"], total_count=2)
+        self.add_delete("d1")
+        self.add_delete("d2")
+
+        report = self.make_deleter(verify_sample=0).run()
+
+        verification = report.verification
+        self.assertEqual((verification.new_deployments, verification.expected_after), (1, 1))
+        self.assertEqual(verification.discrepancy, 1)
+        self.assertEqual((verification.sampled, verification.requests), (0, 1))
+        self.assertFalse(verification.verified)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_given_deployments_count_first_page(self, mock_sleep):
+        """Test a run without its own listing reads the count before deleting."""
+        self.add_listing(["d2", "d1", "keep"])
+        self.add_listing(["keep"])
+        self.add_delete("d1")
+        self.add_lookup("d1")
+        responses.add(responses.DELETE, f"{self.base_url}/deployments/d2",
+                      json={"success": False, "errors": [{"code": 8000009}]}, status=404)
+
+        report = self.make_deleter().run(deployments=[{"id": "d1"}, {"id": "d2"}])
+
+        self.assertEqual(self.urls(), [
+            ("GET", f"{self.base_url}/deployments?page=1&per_page=25"),
+            ("DELETE", f"{self.base_url}/deployments/d1"),
+            ("DELETE", f"{self.base_url}/deployments/d2"),
+            ("GET", f"{self.base_url}/deployments?page=1&per_page=25"),
+            ("GET", f"{self.base_url}/deployments/d1"),
+        ])
+        # d2 was listed before the run, so finding it already gone counts towards the drop
+        self.assertEqual((report.verification.total_before, report.verification.expected_after), (3, 1))
+        self.assertTrue(report.verification.verified)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_skipped_and_incomplete(self, mock_sleep):
+        """Test dry runs and runs without deletions skip verification, and the request budget ends it early."""
+        self.add_listing(["d1", "d2"])
+        self.assertIsNone(self.make_deleter(dry_run=True).run().verification)
+        self.assertIsNone(self.make_deleter().run(deployments=[]).verification)
+
+        responses.reset()
+        self.add_listing(["d1", "d2"])
+        self.add_listing([])
+        self.add_delete("d1")
+        self.add_delete("d2")
+        report = self.make_deleter(ledger=RequestLedger(max_requests=4)).run()
+
+        self.assertEqual(report.verification.total_after, 0)
+        self.assertEqual(report.verification.sampled, 0)
+        self.assertIn("request budget", report.verification.error)
+        self.assertFalse(report.verification.verified)
+
+    @responses.activate
+    @patch('deleter.src.delete_deployments.time.sleep')
+    def test_environment_queues_are_combined(self, mock_sleep):
+        """Test each environment queue verifies its own listing and the results are added up."""
+        for env, ids in (("preview", ["p1"]), ("production", ["r1", "r2"])):
+            responses.add(
+                responses.GET,
+                f"{self.base_url}/deployments?page=1&per_page=25&env={env}",
+                json={
+                    "success": True,
+                    "result": [{"id": deployment_id, "environment": env} for deployment_id in ids],
+                    "result_info": {"page": 1, "total_pages": 1, "total_count": len(ids)},
+                },
+                status=200,
+            )
+            responses.add(
+                responses.GET,
+                f"{self.base_url}/deployments?page=1&per_page=25&env={env}",
+                json={"success": True, "result": [], "result_info": {"page": 1, "total_pages": 1, "total_count": 0}},
+                status=200,
+            )
+            for deployment_id in ids:
+                self.add_delete(deployment_id)
+                self.add_lookup(deployment_id)
+
+        report = self.make_deleter(env="preview,production", limit=25).run()
+
+        self.assertEqual((report.verification.total_before, report.verification.total_after), (3, 0))
+        self.assertEqual(report.verification.sampled, 3)
+        self.assertTrue(report.verification.verified)
+
+    def test_merge_and_cli_flags(self):
+        """Test unknown counts stay unknown when merged, and the flags are parsed."""
+        merged = VerificationResult(total_before=0, total_after=0, expected_after=0)
+        merged.merge(VerificationResult(total_before=5, total_after=1, expected_after=1, sampled=2))
+        self.assertEqual((merged.total_after, merged.sampled), (1, 2))
+        merged.merge(VerificationResult(total_before=None, error="request budget of 3 used up"))
+        self.assertIsNone(merged.discrepancy)
+        self.assertFalse(merged.verified)
+
+        args = build_parser().parse_args(["--verify", "--verify-sample", "25"])
+        self.assertEqual((args.verify, args.verify_sample), (True, 25))
+        with self.assertRaises(ValueError):
+            self.make_deleter(verify_sample=-1)
+
+
+if __name__ == '__main__':
+    unittest.main()